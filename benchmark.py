@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google-Drive-AutoSync ベンチマークスクリプト
+認証情報なしでローカル実行できる性能測定をまとめています
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+try:
+    from fake_drive_server import FakeDriveServer, FakeDriveStore, FaultInjector, OfflineDriveSession
+    from src.drive_monitor import DriveMonitor
+    from src.file_processor import FileProcessor
+except ImportError as e:
+    print(f"ERROR: Module import error: {e}")
+    print("Please install PyDrive2: pip install PyDrive2>=1.17.0")
+    sys.exit(1)
+
+
+def print_header(title):
+    """セクションヘッダーを印刷"""
+    print(f"\n{'='*50}")
+    print(f"📊 {title}")
+    print(f"{'='*50}")
+
+
+def make_config(work_dir: Path, chunk_size_mb: int) -> dict:
+    """ベンチマーク用の設定辞書を作成"""
+    return {
+        'google_drive': {
+            'target_folder_id': 'benchmark',
+            'client_secrets_file': 'client_secrets.json',
+            'credentials_file': 'credentials.json'
+        },
+        'file_processing': {
+            'download_path': str(work_dir / "downloads"),
+            'chunk_size_mb': chunk_size_mb,
+            'min_free_space_gb': 0
+        }
+    }
+
+
+def read_io_bytes():
+    """プロセスがread系システムコールで読み込んだ累計バイト数（Linuxのみ）"""
+    io_file = Path("/proc/self/io")
+    if not io_file.exists():
+        return None
+    for line in io_file.read_text().splitlines():
+        if line.startswith("rchar:"):
+            return int(line.split()[1])
+    return None
+
+
+def generate_chunks(total_size: int, block: bytes):
+    """ダウンロードを模したチャンク列を生成"""
+    chunk_size = len(block)
+    remaining = total_size
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        yield block[:size]
+        remaining -= size
+
+
+def bench_streaming_md5(size_mb: int, chunk_size_mb: int):
+    """書き込み後にMD5を再計算する方式とストリーミング方式の比較"""
+    print_header("ストリーミングMD5ベンチマーク")
+    
+    total_size = size_mb * 1024 * 1024
+    block = os.urandom(chunk_size_mb * 1024 * 1024)
+    print(f"📦 データサイズ: {size_mb}MB / チャンク: {chunk_size_mb}MB")
+    
+    with tempfile.TemporaryDirectory() as work:
+        work_dir = Path(work)
+        processor = FileProcessor(make_config(work_dir, chunk_size_mb))
+        target = work_dir / "bench.downloading"
+        results = {}
+        
+        # 従来方式: 全体を書き込んでからファイルを読み直してMD5計算
+        io_before = read_io_bytes()
+        started_at = time.perf_counter()
+        with open(target, 'wb') as f:
+            for chunk in generate_chunks(total_size, block):
+                f.write(chunk)
+        legacy_md5 = processor._calculate_md5(target)
+        legacy_time = time.perf_counter() - started_at
+        io_after = read_io_bytes()
+        results['従来方式（再読込）'] = (legacy_time, None if io_before is None else io_after - io_before)
+        target.unlink()
+        
+        # ストリーミング方式: 書き込みと同時にMD5計算
+        io_before = read_io_bytes()
+        started_at = time.perf_counter()
+        _, stream_md5 = processor._write_stream(generate_chunks(total_size, block), target)
+        stream_time = time.perf_counter() - started_at
+        io_after = read_io_bytes()
+        results['ストリーミング方式'] = (stream_time, None if io_before is None else io_after - io_before)
+        
+        for name, (elapsed, bytes_read) in results.items():
+            read_text = "計測不可" if bytes_read is None else f"{bytes_read/1024/1024:.1f}MB"
+            print(f"⏱️ {name}: {elapsed:.2f}秒 ({size_mb/elapsed:.1f}MB/s), ディスク読込: {read_text}")
+        
+        if legacy_md5 != stream_md5:
+            print("❌ MD5が一致しません")
+            return False
+        
+        print(f"✅ MD5一致 / 短縮率: {(1 - stream_time/legacy_time)*100:.1f}%")
+        return True
+
+
+def make_e2e_config(work_dir: Path, root_id: str, args, client: str = 'pydrive2') -> dict:
+    """疑似サーバーに対するエンドツーエンド測定用の設定辞書を作成"""
+    download_path = str(work_dir / "downloads")
+    return {
+        'google_drive': {
+            'target_folders': [{'folder_id': root_id, 'download_path': download_path}],
+            'client_secrets_file': 'client_secrets.json',
+            'credentials_file': 'credentials.json',
+            'use_changes_feed': True,
+            'upload_stable_sec': 0
+        },
+        'file_processing': {
+            'download_path': download_path,
+            'chunk_size_mb': args.chunk_mb,
+            'min_free_space_gb': 0,
+            'max_workers': args.workers,
+            # 疑似ファイルは内容の種類が限られるため重複判定は無効にして転送量を測る
+            'duplicate_action': 'off'
+        },
+        'api': {
+            'requests_per_second': args.api_rps,
+            'backoff_base_sec': args.backoff_sec
+        },
+        'state': {
+            'data_dir': str(work_dir / "data")
+        },
+        'async_client': {
+            'enabled': client == 'asyncio',
+            'max_connections': args.async_connections,
+            'max_concurrent_requests': args.async_concurrency
+        }
+    }
+
+
+def count_calls(before: dict, after: dict) -> int:
+    """疑似サーバーが受けたAPI呼び出し数（バッチ内の個別リクエストを含み、バッチ自体は除く）"""
+    return sum(
+        after.get(key, 0) - before.get(key, 0)
+        for key in after if key not in ('batch', 'batch_calls', 'errors')
+    )
+
+
+def bench_end_to_end(file_count: int, args, client: str = 'pydrive2') -> Optional[float]:
+    """
+    疑似Google Driveサーバーに対して監視・ダウンロード・削除を測定
+    
+    Returns:
+        処理のスループット（ファイル/s）、処理されなかったファイルがある場合はNone
+    """
+    print_header(f"エンドツーエンドベンチマーク: {file_count}ファイル ({client})")
+    
+    root_id = 'benchmark-root'
+    store = FakeDriveStore()
+    store.populate(root_id, file_count, args.folders, args.file_kb * 1024)
+    faults = FaultInjector(args.latency_ms, args.bandwidth_mbps, args.error_rate)
+    server = FakeDriveServer(store, faults)
+    server.start()
+    print(f"📁 {file_count}ファイル / {args.folders}サブフォルダ / {args.file_kb}KB "
+          f"(遅延={args.latency_ms}ms, 帯域={args.bandwidth_mbps or '無制限'}Mbps, エラー率={args.error_rate})")
+    
+    monitor = None
+    processor = None
+    try:
+        with tempfile.TemporaryDirectory() as work:
+            config = make_e2e_config(Path(work), root_id, args, client)
+            monitor = DriveMonitor(config, OfflineDriveSession(server.url))
+            processor = FileProcessor(config, monitor)
+            
+            if args.streaming:
+                # 一覧取得と並行してダウンロード・Driveからの削除（常駐・通常実行と同じ流れ）
+                before = server.snapshot()
+                started_at = time.perf_counter()
+                found, processed = processor.process_stream(monitor.iter_new_files())
+                process_time = time.perf_counter() - started_at
+                process_calls = count_calls(before, server.snapshot())
+                label = "🔍⬇️ 監視+処理"
+            else:
+                # 初回監視（フォルダ全体の一覧取得）
+                before = server.snapshot()
+                started_at = time.perf_counter()
+                new_files = monitor.check_for_new_files()
+                scan_time = time.perf_counter() - started_at
+                scan_calls = count_calls(before, server.snapshot())
+                found = len(new_files)
+                print(f"🔍 初回監視: {scan_time:.2f}秒, 検出={found}個, "
+                      f"API呼び出し={scan_calls}回 ({scan_calls/max(1, found):.3f}回/ファイル)")
+                
+                # ダウンロード・Driveからの削除
+                before = server.snapshot()
+                started_at = time.perf_counter()
+                processed = processor.process_files(new_files)
+                process_time = time.perf_counter() - started_at
+                process_calls = count_calls(before, server.snapshot())
+                label = "⬇️ 処理"
+            
+            total_mb = processor.stats['bytes_downloaded'] / 1024 / 1024
+            if processed == found:
+                monitor.commit_page_token()
+            print(f"{label}: {process_time:.2f}秒, 成功={processed}/{found}個, "
+                  f"{total_mb/process_time:.1f}MB/s, {processed/process_time:.1f}ファイル/s, "
+                  f"API呼び出し={process_calls}回 ({process_calls/max(1, processed):.2f}回/ファイル)")
+            
+            # 変更がない状態での差分監視
+            before = server.snapshot()
+            started_at = time.perf_counter()
+            for _ in range(args.polls):
+                monitor.check_for_new_files()
+                monitor.commit_page_token()
+            poll_time = time.perf_counter() - started_at
+            poll_calls = count_calls(before, server.snapshot())
+            print(f"🔁 差分監視: {args.polls}回 {poll_time:.2f}秒 ({args.polls/poll_time:.1f}回/s), "
+                  f"API呼び出し={poll_calls/args.polls:.1f}回/監視")
+            
+            if monitor.async_client is not None:
+                client_stats = monitor.async_client.get_stats()
+                print(f"🔌 接続: 新規={client_stats['connections_opened']}回, "
+                      f"再利用={client_stats['connections_reused']}回 / {client_stats['http_requests']}リクエスト")
+            
+            errors = server.snapshot().get('errors', 0)
+            if errors:
+                api_stats = monitor.api.get_stats()
+                print(f"⚠️ 注入したエラー: {errors}回, 再試行={api_stats['retries']}回, "
+                      f"断念={api_stats['gave_up']}回, バックオフ={api_stats['backoff_seconds']:.1f}秒")
+            
+            processor.close()
+            monitor.close()
+            processor = monitor = None
+    finally:
+        if processor is not None:
+            processor.close()
+        if monitor is not None:
+            monitor.close()
+        server.stop()
+    
+    if processed != file_count:
+        print("❌ 処理されなかったファイルがあります")
+        return None
+    
+    print("✅ 完了")
+    return processed / process_time
+
+
+def main():
+    """ベンチマーク実行"""
+    parser = argparse.ArgumentParser(description="Google-Drive-AutoSync ベンチマーク")
+    parser.add_argument('--suite', choices=('md5', 'e2e', 'all'), default='md5',
+                        help="測定内容（md5: ストリーミングMD5, e2e: 疑似サーバーでのエンドツーエンド）")
+    parser.add_argument('--size-mb', type=int, default=512, help="テストデータのサイズ（MB）")
+    parser.add_argument('--chunk-mb', type=int, default=5, help="チャンクサイズ（MB）")
+    parser.add_argument('--files', default="10,1000,10000", help="e2e: ファイル数（カンマ区切り、例: 10,1000,100000）")
+    parser.add_argument('--folders', type=int, default=10, help="e2e: サブフォルダ数")
+    parser.add_argument('--file-kb', type=int, default=64, help="e2e: 1ファイルのサイズ（KB）")
+    parser.add_argument('--workers', type=int, default=4, help="e2e: ダウンロードのワーカー数")
+    parser.add_argument('--polls', type=int, default=20, help="e2e: 差分監視の回数")
+    parser.add_argument('--streaming', action='store_true',
+                        help="e2e: 一覧取得と処理を並行して測定（通常は一覧取得後に処理）")
+    parser.add_argument('--latency-ms', type=float, default=0, help="e2e: 応答遅延（ミリ秒）")
+    parser.add_argument('--bandwidth-mbps', type=float, default=0, help="e2e: 帯域上限（Mbps、0は無制限）")
+    parser.add_argument('--error-rate', type=float, default=0, help="e2e: エラーを返す割合（0〜1）")
+    parser.add_argument('--api-rps', type=float, default=0, help="e2e: 1秒あたりのリクエスト数上限（0は無制限）")
+    parser.add_argument('--backoff-sec', type=float, default=0.1, help="e2e: リトライのバックオフ基準秒数")
+    parser.add_argument('--client', choices=('pydrive2', 'asyncio', 'both'), default='pydrive2',
+                        help="e2e: Drive APIクライアント（both: 両方を測定して比較）")
+    parser.add_argument('--async-connections', type=int, default=100, help="e2e: 非同期クライアントの最大接続数")
+    parser.add_argument('--async-concurrency', type=int, default=200, help="e2e: 非同期クライアントの同時リクエスト数")
+    args = parser.parse_args()
+    
+    # ファイルごとのログは測定の邪魔になるため警告以上のみ表示
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(name)s - %(message)s')
+    
+    print("🚀 Google-Drive-AutoSync ベンチマーク開始")
+    
+    success = True
+    if args.suite in ('md5', 'all'):
+        success = bench_streaming_md5(args.size_mb, args.chunk_mb) and success
+    if args.suite in ('e2e', 'all'):
+        clients = ('pydrive2', 'asyncio') if args.client == 'both' else (args.client,)
+        for file_count in (int(count) for count in args.files.split(',')):
+            results = {client: bench_end_to_end(file_count, args, client) for client in clients}
+            success = all(result is not None for result in results.values()) and success
+            if args.client == 'both' and success:
+                print(f"\n📈 {file_count}ファイル: asyncio {results['asyncio']:.1f}ファイル/s / "
+                      f"PyDrive2 {results['pydrive2']:.1f}ファイル/s = "
+                      f"{results['asyncio'] / results['pydrive2']:.2f}倍")
+    return success
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
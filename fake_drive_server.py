@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google-Drive-AutoSync ローカル疑似Google Driveサーバー
+認証情報なしでDriveMonitor・FileProcessorを動かすためのDrive API v2互換サーバーです
+
+対応API（このプロジェクトで使用するもののみ）:
+- files.list（'ID' in parents・trashed=false・ページング）
+- files.get（メタデータ、alt=mediaでの本体取得・Rangeヘッダー対応）
+- files.delete
+- changes.getStartPageToken / changes.list
+- バッチリクエスト（/batch/drive/v2）
+
+遅延・帯域制限・エラー（429/500/503）を注入できます。
+fieldsパラメーターによる応答の絞り込みは行いません。
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import socket
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from email.parser import FeedParser
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+try:
+    import httplib2
+    from googleapiclient.discovery import build_from_document
+    from googleapiclient.discovery_cache import get_static_doc
+    from pydrive2.drive import GoogleDrive
+    from src.rate_limiter import TokenBucket
+except ImportError as e:
+    print(f"ERROR: Module import error: {e}")
+    print("Please install PyDrive2: pip install PyDrive2>=1.17.0")
+    sys.exit(1)
+
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+# 拡張子 -> MIMEタイプ（疑似ファイルの生成用）
+AUDIO_MIME_TYPES = {
+    '.wav': 'audio/wav',
+    '.mp3': 'audio/mpeg',
+    '.flac': 'audio/flac',
+    '.aac': 'audio/aac',
+}
+
+
+class FakeDriveStore:
+    """疑似Driveのファイル・変更履歴（スレッドセーフ）"""
+    
+    # ファイル本体は共通の乱数ブロックから切り出す（内容の種類数）
+    CONTENT_VARIANTS = 251
+    
+    def __init__(self, seed: int = 0):
+        """
+        初期化
+        
+        Args:
+            seed: ファイル内容・ID生成用の乱数シード
+        """
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._block = b''
+        
+        # ファイルID -> メタデータ（フォルダを含む）
+        self.items: Dict[str, dict] = {}
+        
+        # ファイルID -> (内容の種類, サイズ)
+        self._contents: Dict[str, Tuple[int, int]] = {}
+        
+        # 親フォルダID -> {子ID: None}（挿入順を保持）
+        self._children: Dict[str, Dict[str, None]] = {}
+        
+        # 変更履歴（ページトークンは履歴の位置）
+        self.changes: List[dict] = []
+        
+        self._sequence = 0
+    
+    def _new_id(self, prefix: str) -> str:
+        """ファイルIDの生成"""
+        self._sequence += 1
+        return f"{prefix}{self._sequence:08d}"
+    
+    @staticmethod
+    def _timestamp() -> str:
+        """RFC 3339形式の現在時刻"""
+        return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+    
+    def _ensure_block(self, size: int):
+        """ファイル本体の切り出し元を必要なサイズまで拡張"""
+        needed = size + self.CONTENT_VARIANTS
+        if len(self._block) < needed:
+            missing = needed - len(self._block)
+            self._block += self._random.getrandbits(missing * 8).to_bytes(missing, 'little')
+            self._md5.cache_clear()
+    
+    @lru_cache(maxsize=4096)
+    def _md5(self, variant: int, size: int) -> str:
+        """ファイル本体のMD5（内容の種類・サイズごとに1回だけ計算）"""
+        return hashlib.md5(self._block[variant:variant + size]).hexdigest()
+    
+    def content(self, file_id: str) -> Optional[bytes]:
+        """ファイル本体（存在しない場合None）"""
+        with self._lock:
+            entry = self._contents.get(file_id)
+            if entry is None:
+                return None
+            variant, size = entry
+            return self._block[variant:variant + size]
+    
+    def add_folder(self, title: str, parent_id: Optional[str] = None, folder_id: Optional[str] = None) -> str:
+        """フォルダの作成"""
+        with self._lock:
+            folder_id = folder_id or self._new_id('folder')
+            self._put(folder_id, {
+                'id': folder_id,
+                'title': title,
+                'mimeType': FOLDER_MIME_TYPE,
+                'modifiedDate': self._timestamp(),
+                'parents': [{'id': parent_id}] if parent_id else [],
+                'labels': {'trashed': False},
+            })
+            return folder_id
+    
+    def add_file(self, title: str, parent_id: str, size: int) -> str:
+        """ファイルの作成（内容は乱数ブロックから決定的に生成）"""
+        with self._lock:
+            file_id = self._new_id('file')
+            self._ensure_block(size)
+            variant = self._sequence % self.CONTENT_VARIANTS
+            self._contents[file_id] = (variant, size)
+            self._put(file_id, {
+                'id': file_id,
+                'title': title,
+                'mimeType': AUDIO_MIME_TYPES.get(Path(title).suffix.lower(), 'application/octet-stream'),
+                'fileSize': str(size),
+                'md5Checksum': self._md5(variant, size),
+                'modifiedDate': self._timestamp(),
+                'parents': [{'id': parent_id}],
+                'labels': {'trashed': False},
+            })
+            return file_id
+    
+    def _put(self, file_id: str, metadata: dict):
+        """メタデータの登録と変更履歴への記録"""
+        self.items[file_id] = metadata
+        for parent in metadata['parents']:
+            self._children.setdefault(parent['id'], {})[file_id] = None
+        self.changes.append({'kind': 'drive#change', 'fileId': file_id, 'deleted': False, 'file': metadata})
+    
+    def delete(self, file_id: str) -> bool:
+        """ファイルの削除（存在しない場合False）"""
+        with self._lock:
+            metadata = self.items.pop(file_id, None)
+            if metadata is None:
+                return False
+            for parent in metadata['parents']:
+                self._children.get(parent['id'], {}).pop(file_id, None)
+            self._contents.pop(file_id, None)
+            self.changes.append({'kind': 'drive#change', 'fileId': file_id, 'deleted': True})
+            return True
+    
+    def get(self, file_id: str) -> Optional[dict]:
+        """メタデータの取得"""
+        with self._lock:
+            return self.items.get(file_id)
+    
+    def list_children(self, parent_ids: List[str], title_terms: List[str], offset: int, limit: int) -> Tuple[list, bool]:
+        """
+        親フォルダ内のファイル一覧（ゴミ箱内は除く）
+        
+        Args:
+            parent_ids: 親フォルダIDのリスト
+            title_terms: 指定時はフォルダ・音声ファイル・名前がいずれかで始まるもののみ
+                （Driveのtitle containsと同じく先頭一致）
+            offset: 開始位置
+            limit: 最大件数
+        
+        Returns:
+            (メタデータのリスト, 続きがあるかどうか)
+        """
+        with self._lock:
+            matched = []
+            for parent_id in parent_ids:
+                for child_id in self._children.get(parent_id, {}):
+                    metadata = self.items[child_id]
+                    if metadata['labels']['trashed']:
+                        continue
+                    if title_terms and not (
+                        metadata['mimeType'] == FOLDER_MIME_TYPE
+                        or metadata['mimeType'].startswith('audio/')
+                        or any(metadata['title'].lower().startswith(term.lower()) for term in title_terms)
+                    ):
+                        continue
+                    matched.append(metadata)
+            return matched[offset:offset + limit], offset + limit < len(matched)
+    
+    def list_changes(self, token: int, limit: int) -> Tuple[list, int, bool]:
+        """
+        変更履歴の取得
+        
+        Returns:
+            (変更のリスト, 次の位置, 続きがあるかどうか)
+        """
+        with self._lock:
+            items = self.changes[token:token + limit]
+            next_token = token + len(items)
+            return items, next_token, next_token < len(self.changes)
+    
+    def populate(self, root_id: str, file_count: int, folder_count: int, file_size: int) -> List[str]:
+        """
+        監視ルートの下に疑似ファイルを作成
+        
+        Args:
+            root_id: ルートフォルダID
+            file_count: ファイル数（ルートとサブフォルダに均等に配置）
+            folder_count: サブフォルダ数
+            file_size: 1ファイルのサイズ（バイト）
+        
+        Returns:
+            ファイル・フォルダを配置したフォルダIDのリスト（ルートを含む）
+        """
+        if root_id not in self.items:
+            self.add_folder('benchmark', folder_id=root_id)
+        folder_ids = [root_id] + [self.add_folder(f"folder_{i:04d}", root_id) for i in range(folder_count)]
+        extensions = sorted(AUDIO_MIME_TYPES)
+        for i in range(file_count):
+            ext = extensions[i % len(extensions)]
+            self.add_file(f"recording_{i:06d}{ext}", folder_ids[i % len(folder_ids)], file_size)
+        return folder_ids
+
+
+class FaultInjector:
+    """遅延・帯域制限・エラーの注入設定"""
+    
+    # エラーとして返すHTTPステータス
+    ERROR_STATUSES = (429, 500, 503)
+    
+    def __init__(self, latency_ms: float = 0, bandwidth_mbps: float = 0, error_rate: float = 0,
+                 retry_after_sec: int = 1, seed: int = 0):
+        """
+        初期化
+        
+        Args:
+            latency_ms: 1リクエストごとの応答遅延（ミリ秒）
+            bandwidth_mbps: ファイル本体の送信帯域上限（全接続の合計、Mbps、0は無制限）
+            error_rate: エラーを返す割合（0〜1、バッチ内の各リクエストにも適用）
+            retry_after_sec: 429応答に付けるRetry-After（秒）
+            seed: エラー発生の乱数シード
+        """
+        self.latency = latency_ms / 1000
+        self.bandwidth = TokenBucket(bandwidth_mbps * 1024 * 1024 / 8)
+        self.error_rate = error_rate
+        self.retry_after_sec = retry_after_sec
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def pick_error(self) -> Optional[int]:
+        """注入するエラーのHTTPステータス（エラーにしない場合None）"""
+        if self.error_rate <= 0:
+            return None
+        with self._lock:
+            if self._random.random() >= self.error_rate:
+                return None
+            return self._random.choice(self.ERROR_STATUSES)
+
+
+class FakeDriveServer(ThreadingHTTPServer):
+    """疑似Google Driveサーバー"""
+    
+    daemon_threads = True
+    
+    def __init__(self, store: FakeDriveStore, faults: Optional[FaultInjector] = None,
+                 host: str = '127.0.0.1', port: int = 0, chunked: bool = False):
+        """
+        初期化
+        
+        Args:
+            store: ファイル・変更履歴
+            faults: 注入する遅延・エラー（省略時はなし）
+            host: 待ち受けアドレス
+            port: 待ち受けポート（0は空きポート）
+            chunked: ファイル本体をTransfer-Encoding: chunkedで送信する（Content-Lengthなし）
+        """
+        super().__init__((host, port), FakeDriveHandler)
+        self.store = store
+        self.faults = faults or FaultInjector()
+        self.chunked = chunked
+        self._thread = None
+        
+        # 種類ごとのリクエスト数（バッチ内のリクエストも個別に数える）
+        self._counter_lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+    
+    @property
+    def url(self) -> str:
+        """サーバーのURL"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def count(self, name: str, amount: int = 1):
+        """リクエスト数の記録"""
+        with self._counter_lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def snapshot(self) -> Dict[str, int]:
+        """リクエスト数の取得"""
+        with self._counter_lock:
+            return dict(self.counters)
+    
+    def start(self):
+        """バックグラウンドスレッドで起動"""
+        self._thread = threading.Thread(target=self.serve_forever, name='fake-drive', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """停止"""
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class FakeDriveHandler(BaseHTTPRequestHandler):
+    """Drive API v2互換のリクエスト処理"""
+    
+    # 接続を再利用できるようにする（httplib2はKeep-Aliveで接続を使い回す）
+    protocol_version = 'HTTP/1.1'
+    
+    SERVICE_PATH = '/drive/v2/'
+    BATCH_PATH = '/batch/drive/v2'
+    
+    PARENT_PATTERN = re.compile(r"'([^']+)' in parents")
+    TITLE_PATTERN = re.compile(r"title contains '([^']+)'")
+    
+    MEDIA_BLOCK_SIZE = 64 * 1024
+    
+    def setup(self):
+        """ヘッダーと本文を分けて送信しても遅延しないようNagleアルゴリズムを無効化"""
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    
+    def log_message(self, format, *args):
+        """アクセスログは出力しない"""
+    
+    def do_GET(self):
+        self._handle('GET')
+    
+    def do_DELETE(self):
+        self._handle('DELETE')
+    
+    def do_POST(self):
+        self._handle('POST')
+    
+    def _handle(self, method: str):
+        """リクエストの振り分け（遅延・エラーの注入を含む）"""
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        faults = self.server.faults
+        if faults.latency:
+            time.sleep(faults.latency)
+        
+        parsed = urlparse(self.path)
+        if method == 'POST' and parsed.path == self.BATCH_PATH:
+            self.server.count('batch')
+            error = faults.pick_error()
+            if error is not None:
+                return self._send_error(error)
+            return self._handle_batch(body)
+        
+        error = faults.pick_error()
+        if error is not None:
+            self.server.count('errors')
+            return self._send_error(error)
+        
+        query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        status, headers, payload = self._dispatch(method, parsed.path, query, self.headers.get('Range'))
+        self._send(status, headers, payload, throttle=status in (200, 206) and query.get('alt') == 'media')
+    
+    def _dispatch(self, method: str, path: str, query: dict, range_header: Optional[str]) -> Tuple[int, dict, bytes]:
+        """
+        APIの実行
+        
+        Returns:
+            (HTTPステータス, ヘッダー, 本文)
+        """
+        if not path.startswith(self.SERVICE_PATH):
+            return self._error(404, 'notFound')
+        resource = path[len(self.SERVICE_PATH):].rstrip('/')
+        store = self.server.store
+        
+        if method == 'GET' and resource == 'files':
+            self.server.count('files.list')
+            q = query.get('q', '')
+            offset = int(query.get('pageToken') or 0)
+            limit = int(query.get('maxResults') or 100)
+            items, has_more = store.list_children(
+                self.PARENT_PATTERN.findall(q), self.TITLE_PATTERN.findall(q), offset, limit
+            )
+            response = {'kind': 'drive#fileList', 'items': items}
+            if has_more:
+                response['nextPageToken'] = str(offset + limit)
+            return self._json(200, response)
+        
+        if method == 'GET' and resource == 'changes/startPageToken':
+            self.server.count('changes.getStartPageToken')
+            return self._json(200, {'startPageToken': str(len(store.changes))})
+        
+        if method == 'GET' and resource == 'changes':
+            self.server.count('changes.list')
+            token = int(query.get('pageToken') or 0)
+            if token > len(store.changes):
+                return self._error(404, 'notFound')
+            items, next_token, has_more = store.list_changes(token, int(query.get('maxResults') or 100))
+            if query.get('includeDeleted') == 'false':
+                items = [item for item in items if not item['deleted']]
+            response = {'kind': 'drive#changeList', 'items': items}
+            response['nextPageToken' if has_more else 'newStartPageToken'] = str(next_token)
+            return self._json(200, response)
+        
+        if resource.startswith('files/'):
+            file_id = unquote(resource[len('files/'):])
+            if method == 'DELETE':
+                self.server.count('files.delete')
+                if not store.delete(file_id):
+                    return self._error(404, 'notFound')
+                return 204, {}, b''
+            
+            if method == 'GET' and query.get('alt') == 'media':
+                self.server.count('files.get_media')
+                content = store.content(file_id)
+                if content is None:
+                    return self._error(404, 'notFound')
+                return self._media(content, range_header)
+            
+            if method == 'GET':
+                self.server.count('files.get')
+                metadata = store.get(file_id)
+                if metadata is None:
+                    return self._error(404, 'notFound')
+                return self._json(200, metadata)
+        
+        return self._error(404, 'notFound')
+    
+    @staticmethod
+    def _json(status: int, payload: dict) -> Tuple[int, dict, bytes]:
+        """JSON応答"""
+        return status, {'Content-Type': 'application/json; charset=UTF-8'}, json.dumps(payload).encode('utf-8')
+    
+    def _error(self, status: int, reason: str) -> Tuple[int, dict, bytes]:
+        """Drive API形式のエラー応答"""
+        status, headers, payload = self._json(status, {
+            'error': {'code': status, 'message': reason, 'errors': [{'reason': reason}]}
+        })
+        if status == 429:
+            headers['Retry-After'] = str(self.server.faults.retry_after_sec)
+        return status, headers, payload
+    
+    @staticmethod
+    def _media(content: bytes, range_header: Optional[str]) -> Tuple[int, dict, bytes]:
+        """ファイル本体の応答（bytes=start-end形式のRangeに対応）"""
+        headers = {'Content-Type': 'application/octet-stream'}
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', range_header or '')
+        if match is None:
+            return 200, headers, content
+        
+        start = int(match.group(1))
+        end = min(int(match.group(2)) if match.group(2) else len(content) - 1, len(content) - 1)
+        if start >= len(content):
+            headers['Content-Range'] = f"bytes */{len(content)}"
+            return 416, headers, b''
+        
+        headers['Content-Range'] = f"bytes {start}-{end}/{len(content)}"
+        return 206, headers, content[start:end + 1]
+    
+    def _send(self, status: int, headers: dict, payload: bytes, throttle: bool = False):
+        """応答の送信（ファイル本体は帯域上限に従って分割送信、chunked指定時はチャンク形式）"""
+        chunked = throttle and self.server.chunked
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        if chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        
+        bandwidth = self.server.faults.bandwidth
+        if not chunked and (not throttle or not bandwidth.enabled):
+            self.wfile.write(payload)
+            return
+        
+        for offset in range(0, len(payload), self.MEDIA_BLOCK_SIZE):
+            block = payload[offset:offset + self.MEDIA_BLOCK_SIZE]
+            if throttle and bandwidth.enabled:
+                bandwidth.consume(len(block))
+            self.wfile.write(f"{len(block):x}\r\n".encode('ascii') + block + b"\r\n" if chunked else block)
+        if chunked:
+            self.wfile.write(b"0\r\n\r\n")
+    
+    def _send_error(self, status: int):
+        """注入したエラーの送信"""
+        self._send(*self._error(status, 'rateLimitExceeded' if status == 429 else 'backendError'))
+    
+    def _handle_batch(self, body: bytes):
+        """multipart/mixed形式のバッチリクエストを個別に実行して応答"""
+        parser = FeedParser()
+        parser.feed(f"Content-Type: {self.headers.get('Content-Type')}\r\n\r\n")
+        parser.feed(body.decode('utf-8'))
+        message = parser.close()
+        
+        boundary = f"batch_{random.getrandbits(64):016x}"
+        parts = []
+        for part in message.get_payload():
+            request_line = part.get_payload().split('\n', 1)[0].strip()
+            method, target, _ = request_line.split(' ', 2)
+            parsed = urlparse(target)
+            query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+            
+            self.server.count('batch_calls')
+            error = self.server.faults.pick_error()
+            if error is not None:
+                self.server.count('errors')
+                status, headers, payload = self._error(error, 'rateLimitExceeded' if error == 429 else 'backendError')
+            else:
+                status, headers, payload = self._dispatch(method, parsed.path, query, None)
+            
+            content_id = part['Content-ID'].strip('<>')
+            header_lines = ''.join(f"{key}: {value}\r\n" for key, value in headers.items())
+            parts.append(
+                f"--{boundary}\r\n"
+                f"Content-Type: application/http\r\n"
+                f"Content-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {self.responses.get(status, ('',))[0]}\r\n"
+                f"{header_lines}Content-Length: {len(payload)}\r\n\r\n"
+                f"{payload.decode('utf-8')}\r\n"
+            )
+        parts.append(f"--{boundary}--\r\n")
+        
+        self._send(200, {'Content-Type': f'multipart/mixed; boundary={boundary}'}, ''.join(parts).encode('utf-8'))
+
+
+class OfflineAuth:
+    """疑似サーバーに接続するGoogleAuth互換オブジェクト（認証なし）"""
+    
+    access_token_expired = False
+    credentials = None
+    
+    def __init__(self, base_url: str, timeout: float = 60):
+        """
+        初期化
+        
+        Args:
+            base_url: 疑似サーバーのURL
+            timeout: HTTPタイムアウト（秒）
+        """
+        self.timeout = timeout
+        self.thread_local = threading.local()
+        
+        # 同梱のDiscoveryドキュメントの接続先を差し替える（バッチのURLもrootUrlから作られる）
+        document = json.loads(get_static_doc('drive', 'v2'))
+        document['rootUrl'] = base_url.rstrip('/') + '/'
+        document['baseUrl'] = document['rootUrl'] + document['servicePath']
+        self.service = build_from_document(document, http=self.Get_Http_Object())
+    
+    def Get_Http_Object(self):
+        """スレッドごとのHTTPオブジェクト"""
+        return httplib2.Http(timeout=self.timeout)
+
+
+class OfflineDriveSession:
+    """疑似サーバーに接続するDriveSession互換クラス（ベンチマーク用）"""
+    
+    def __init__(self, base_url: str):
+        """
+        初期化
+        
+        Args:
+            base_url: 疑似サーバーのURL
+        """
+        self.gauth = OfflineAuth(base_url)
+        self.drive = GoogleDrive(self.gauth)
+        self.stats = {
+            'auth_calls': 0,
+            'token_refreshes': 0,
+        }
+    
+    def ensure_token(self, force: bool = False):
+        """認証なしのため更新の回数だけ記録"""
+        if force:
+            self.stats['token_refreshes'] += 1
+    
+    def get_http(self):
+        """スレッドごとのHTTPオブジェクトを取得"""
+        thread_local = self.gauth.thread_local
+        if not getattr(thread_local, 'http', None):
+            thread_local.http = self.gauth.Get_Http_Object()
+        return thread_local.http
+    
+    def get_stats(self) -> dict:
+        """実行ごとの統計を取得"""
+        return dict(self.stats)
+
+
+def main():
+    """疑似サーバーを単体で起動"""
+    parser = argparse.ArgumentParser(description="Google-Drive-AutoSync 疑似Google Driveサーバー")
+    parser.add_argument('--host', default='127.0.0.1', help="待ち受けアドレス")
+    parser.add_argument('--port', type=int, default=8765, help="待ち受けポート")
+    parser.add_argument('--root-id', default='benchmark-root', help="監視ルートのフォルダID")
+    parser.add_argument('--files', type=int, default=100, help="作成するファイル数")
+    parser.add_argument('--folders', type=int, default=0, help="作成するサブフォルダ数")
+    parser.add_argument('--file-kb', type=int, default=256, help="1ファイルのサイズ（KB）")
+    parser.add_argument('--latency-ms', type=float, default=0, help="応答遅延（ミリ秒）")
+    parser.add_argument('--bandwidth-mbps', type=float, default=0, help="帯域上限（Mbps、0は無制限）")
+    parser.add_argument('--error-rate', type=float, default=0, help="エラーを返す割合（0〜1）")
+    args = parser.parse_args()
+    
+    store = FakeDriveStore()
+    store.populate(args.root_id, args.files, args.folders, args.file_kb * 1024)
+    faults = FaultInjector(args.latency_ms, args.bandwidth_mbps, args.error_rate)
+    server = FakeDriveServer(store, faults, args.host, args.port)
+    
+    print(f"🚀 疑似Google Driveサーバー起動: {server.url}")
+    print(f"📁 監視ルート: {args.root_id} ({args.files}ファイル, {args.folders}サブフォルダ)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("🛑 停止しました")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,11 @@ PyDrive2を使用したシンプルで実用的なGoogle Drive監視・ファイ
 import os
 import sys
 import json
+import time
+import signal
 import logging
+import argparse
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -18,26 +22,26 @@ from pathlib import Path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+from src.drive_session import DriveSession
 from src.drive_monitor import DriveMonitor
 from src.file_processor import FileProcessor
+from src.log_pipeline import LogPipeline
+from src.metrics import MetricsExporter
+from src.webhook_receiver import ChangeNotificationReceiver, WatchChannel
 
 
 def setup_logging():
-    """ログ設定の初期化"""
-    log_dir = project_root / "logs"
-    log_dir.mkdir(exist_ok=True)
-    
-    log_file = log_dir / f"autosync_{datetime.now().strftime('%Y%m%d')}.log"
-    
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file, encoding='utf-8'),
-            logging.StreamHandler()
-        ]
-    )
-    return logging.getLogger('Google-Drive-AutoSync')
+    """
+    ログ設定の初期化
+    
+    ファイル書き込みはバックグラウンドスレッドで行う（logs/autosync.jsonl、サイズでローテーション）。
+    ログレベル・ローテーション設定は設定ファイルの読み込み後にconfigureで反映する。
+    
+    Returns:
+        (ロガー, LogPipeline)
+    """
+    log_pipeline = LogPipeline(project_root / "logs")
+    return logging.getLogger('Google-Drive-AutoSync'), log_pipeline
 
 
 def load_config():
@@ -57,8 +61,7 @@ def create_state_files():
     """必要な状態ファイルを作成"""
     state_files = {
         'page_token.txt': '',
-        'last_run.txt': datetime.now().isoformat(),
-        'processed_files.txt': ''
+        'last_run.txt': datetime.now().isoformat()
     }
     
     for filename, default_content in state_files.items():
@@ -91,7 +94,7 @@ def clear_error_flag():
 
 
 def cleanup_old_logs(config):
-    """古いログファイルのクリーンアップ"""
+    """旧形式（日付別）の古いログファイルのクリーンアップ"""
     try:
         log_dir = project_root / "logs"
         if not log_dir.exists():
@@ -126,10 +129,193 @@ def cleanup_old_logs(config):
         logger.warning(f"ログクリーンアップエラー: {str(e)}")
 
 
+def update_last_run():
+    """最終実行時刻を更新"""
+    last_run_file = project_root / "data" / "last_run.txt"
+    last_run_file.write_text(datetime.now().isoformat(), encoding='utf-8')
+
+
+def run_sync_cycle(monitor, processor, logger, exporter=None):
+    """
+    1回分の監視・処理サイクル（exporter指定時は実行ごとのメトリクスを出力）
+    
+    Returns:
+        検出した新しいファイル数
+    """
+    run = exporter.start_run() if exporter is not None else None
+    try:
+        # 新しいファイルをチェックし、一覧のページが届いた順に処理を開始
+        logger.info("Google Drive監視開始")
+        found_count, processed_count = processor.process_stream(monitor.iter_new_files())
+        if run is not None:
+            run.files_found = found_count
+            run.files_processed = processed_count
+        
+        if not found_count:
+            logger.info("新しいファイルはありません")
+            monitor.commit_page_token()
+            update_last_run()
+            return 0
+        
+        # 処理結果まとめ
+        logger.info(f"処理完了: {processed_count}/{found_count}個のファイル")
+        
+        # 全件成功時のみ差分取得位置を進める（失敗分は次回再取得）
+        if processed_count == found_count:
+            monitor.commit_page_token()
+        
+        # 成功時はエラーフラグをクリア
+        clear_error_flag()
+        
+        update_last_run()
+        return found_count
+    
+    except Exception as e:
+        if run is not None:
+            run.error = str(e)
+        raise
+    
+    finally:
+        if run is not None:
+            exporter.finish_run(run)
+
+
+def install_shutdown_handlers(stop_event, logger, on_stop=None):
+    """終了シグナルで監視ループを停止するハンドラを登録"""
+    def handle_signal(signum, frame):
+        logger.info(f"終了シグナルを受信しました ({signal.Signals(signum).name})。現在の処理完了後に終了します")
+        stop_event.set()
+        if on_stop:
+            on_stop()
+    
+    for signal_name in ('SIGINT', 'SIGTERM', 'SIGBREAK'):
+        if hasattr(signal, signal_name):
+            signal.signal(getattr(signal, signal_name), handle_signal)
+
+
+def start_webhook(config, monitor, logger):
+    """
+    変更通知の受信を開始（webhook.enabledの場合のみ）
+    
+    Returns:
+        (受信サーバー, 通知チャンネル)。無効時は(None, None)
+    """
+    webhook_config = config.get('webhook', {})
+    if not webhook_config.get('enabled'):
+        return None, None
+    
+    public_url = webhook_config.get('public_url')
+    if not public_url:
+        logger.warning("webhook.public_url が未設定のため変更通知は使用しません")
+        return None, None
+    
+    channel = WatchChannel(
+        monitor,
+        public_url,
+        ttl_sec=webhook_config.get('channel_ttl_sec', 86400),
+        renew_margin_sec=webhook_config.get('renew_margin_sec', 600)
+    )
+    receiver = ChangeNotificationReceiver(
+        webhook_config.get('listen_host', '0.0.0.0'),
+        webhook_config.get('listen_port', 8080),
+        channel.token,
+        debounce_sec=webhook_config.get('debounce_sec', 5),
+        max_delay_sec=webhook_config.get('max_delay_sec', 30)
+    )
+    receiver.start()
+    return receiver, channel
+
+
+def run_daemon(config, monitor, processor, logger, exporter=None):
+    """
+    常駐モード: 認証済みセッションを保持したまま監視を繰り返す
+    
+    新しいファイルを検出した直後は短い間隔で、何もない間は間隔を指数的に延ばす。
+    変更通知が有効な場合は通知を受けた時点で（デバウンス後に）すぐ監視する。
+    """
+    daemon_config = config.get('daemon', {})
+    min_interval = daemon_config.get('min_interval_sec', 30)
+    max_interval = daemon_config.get('max_interval_sec', 900)
+    backoff_factor = daemon_config.get('backoff_factor', 2.0)
+    compact_interval = daemon_config.get('compact_interval_sec', 86400)
+    
+    receiver, channel = start_webhook(config, monitor, logger)
+    if exporter is not None:
+        exporter.start_http()
+    
+    stop_event = threading.Event()
+    install_shutdown_handlers(stop_event, logger, on_stop=receiver.interrupt if receiver else None)
+    wait = receiver.wait if receiver else stop_event.wait
+    
+    interval = min_interval
+    cycle = 0
+    last_compacted = time.monotonic()  # 起動時に圧縮済み
+    logger.info(f"常駐モード開始: 監視間隔 {min_interval}〜{max_interval}秒")
+    
+    while not stop_event.is_set():
+        cycle += 1
+        started_at = time.monotonic()
+        
+        # 通知チャンネルの登録・期限前更新
+        if channel is not None:
+            try:
+                channel.ensure_active()
+            except Exception as e:
+                logger.warning(f"変更通知チャンネル登録エラー: {e}")
+        
+        try:
+            new_count = run_sync_cycle(monitor, processor, logger, exporter)
+        except Exception as e:
+            error_message = f"システムエラー: {str(e)}"
+            logger.error(error_message)
+            create_error_flag(error_message)
+            new_count = 0
+        
+        # 新しいファイルがあれば最短間隔に戻し、なければ間隔を延ばす
+        if new_count:
+            interval = min_interval
+        else:
+            interval = min(interval * backoff_factor, max_interval)
+        
+        # 完了待ちのファイルがあれば安定確認の時間を過ぎたら再確認する
+        if monitor.has_pending_uploads():
+            interval = min(interval, max(min_interval, monitor.upload_stable_sec))
+        
+        # 保持期間を過ぎた処理済みID・ジャーナルの削除（常駐中も状態ファイルが増え続けないよう定期的に行う）
+        if compact_interval > 0 and time.monotonic() - last_compacted >= compact_interval:
+            monitor.compact_state()
+            last_compacted = time.monotonic()
+        
+        elapsed = time.monotonic() - started_at
+        logger.info(f"サイクル{cycle}完了: 処理時間={elapsed:.2f}秒, 新規={new_count}個, 次回まで{interval:.0f}秒")
+        
+        wait(interval)
+    
+    if channel is not None:
+        channel.stop()
+    if receiver is not None:
+        receiver.stop()
+    if exporter is not None:
+        exporter.stop()
+    logger.info("常駐モードを終了します")
+
+
+def parse_args():
+    """コマンドライン引数の解析"""
+    parser = argparse.ArgumentParser(description="Google Drive AutoSync")
+    parser.add_argument('--daemon', action='store_true',
+                        help="常駐して監視を繰り返す（タスクスケジューラからの定期起動の代わり）")
+    return parser.parse_args()
+
+
 def main():
     """メイン処理"""
-    logger = setup_logging()
+    args = parse_args()
+    logger, log_pipeline = setup_logging()
     logger.info("=== Google Drive AutoSync 開始 ===")
+    session = None
+    monitor = None
+    processor = None
     
     try:
         # 前回のエラー状態確認
@@ -139,6 +325,7 @@ def main():
         
         # 設定読み込み
         config = load_config()
+        log_pipeline.configure(config.get('logging', {}))
         logger.info("設定ファイル読み込み完了")
         
         # 古いログファイルのクリーンアップ
@@ -147,47 +334,27 @@ def main():
         # 状態ファイル初期化
         create_state_files()
         
-        # Google Drive監視システム初期化
-        monitor = DriveMonitor(config)
-        processor = FileProcessor(config)
-        
-        # 新しいファイルをチェック
-        logger.info("Google Drive監視開始")
-        new_files = monitor.check_for_new_files()
-        
-        if not new_files:
-            logger.info("新しいファイルはありません")
-            # 最終実行時刻を更新
-            last_run_file = project_root / "data" / "last_run.txt"
-            last_run_file.write_text(datetime.now().isoformat(), encoding='utf-8')
-            return
-        
-        # ファイル処理実行
-        logger.info(f"{len(new_files)}個のファイルを処理開始")
-        processed_count = 0
-        
-        for file_info in new_files:
-            try:
-                success = processor.process_file(file_info)
-                if success:
-                    processed_count += 1
-                    logger.info(f"ファイル処理完了: {file_info['name']}")
-                else:
-                    logger.warning(f"ファイル処理失敗: {file_info['name']}")
-                    
-            except Exception as e:
-                logger.error(f"ファイル処理エラー: {file_info['name']} - {str(e)}")
-                continue
+        # Google Drive監視システム初期化（認証は1回だけ行い全体で共有）
+        session = DriveSession(config)
+        monitor = DriveMonitor(config, session)
+        processor = FileProcessor(config, monitor)
+        monitor.compact_state()
         
-        # 処理結果まとめ
-        logger.info(f"処理完了: {processed_count}/{len(new_files)}個のファイル")
-        
-        # 成功時はエラーフラグをクリア
-        clear_error_flag()
+        # 段階別の所要時間と各統計を実行ごとに集計
+        sources = {
+            'session': session,
+            'monitor': monitor,
+            'api': monitor.api,
+            'processor': processor,
+        }
+        if monitor.async_client is not None:
+            sources['async_client'] = monitor.async_client
+        exporter = MetricsExporter(config, project_root, sources)
         
-        # 最終実行時刻を更新
-        last_run_file = project_root / "data" / "last_run.txt"
-        last_run_file.write_text(datetime.now().isoformat(), encoding='utf-8')
+        if args.daemon:
+            run_daemon(config, monitor, processor, logger, exporter)
+        else:
+            run_sync_cycle(monitor, processor, logger, exporter)
         
     except Exception as e:
         error_message = f"システムエラー: {str(e)}"
@@ -196,8 +363,26 @@ def main():
         sys.exit(1)
     
     finally:
+        if session is not None:
+            stats = session.get_stats()
+            logger.info(f"認証統計: 認証={stats['auth_calls']}回, トークン更新={stats['token_refreshes']}回")
+        if processor is not None:
+            processor.close()
+        if monitor is not None:
+            monitor.close()
+            stats = monitor.stats
+            logger.info(f"API統計: リクエスト={stats['api_requests']}回, "
+                        f"差分取得={stats['changes_polls']}回, 全件取得={stats['full_listings']}回, "
+                        f"取得量={stats['pages_fetched']}ページ/{stats['bytes_fetched']/1024:.1f}KB, "
+                        f"メタデータ取得={stats['metadata_fetches']}回 (省略={stats['metadata_calls_saved']}回), "
+                        f"バッチ={stats['batch_requests']}回/{stats['batched_calls']}件")
+            api_stats = monitor.api.get_stats()
+            logger.info(f"リトライ統計: リクエスト={api_stats['requests']}回, 再試行={api_stats['retries']}回 "
+                        f"(レート制限={api_stats['rate_limited']}回, 断念={api_stats['gave_up']}回), "
+                        f"待機={api_stats['throttle_seconds']:.1f}秒/バックオフ={api_stats['backoff_seconds']:.1f}秒")
         logger.info("=== Google Drive AutoSync 終了 ===")
+        log_pipeline.stop()
 
 
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file
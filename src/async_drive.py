@@ -0,0 +1,569 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機能:
+- asyncioによるDrive API v2クライアント（1スレッドで数百のリクエストを同時に実行）
+- ホストごとのKeep-Alive接続プール（同時接続数の上限付き）
+- 認証セッション（credentials.json）のアクセストークンを共有
+- DriveApiと同じエラー分類によるリトライと流量制限
+- リダイレクトの追従と、認証エラー（401）時のトークン更新・再送
+- 同期コード（DriveMonitor・FileProcessor）から使うためのバックグラウンドのイベントループ
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import socket
+import ssl
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, TypeVar
+from urllib.parse import quote, urlencode, urljoin, urlsplit
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from .drive_api import DriveApi
+from .metrics import MetricsRecorder
+from .rate_limiter import TokenBucket
+
+T = TypeVar('T')
+
+
+class HttpResponse(NamedTuple):
+    """HTTP応答（ヘッダー名は小文字）"""
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+class _Connection:
+    """プール内の1本の接続"""
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.response_started = False
+    
+    def close(self):
+        self.writer.close()
+
+
+class AsyncConnectionPool:
+    """
+    HTTP/1.1のKeep-Alive接続プール（イベントループのスレッドからのみ使用）
+    
+    応答を読み終えた接続はホストごとに残して次のリクエストで使い回す（TLSハンドシェイクを
+    繰り返さない）。同時に使用する接続数はmax_connectionsまでで、超えたリクエストは空きを待つ。
+    """
+    
+    READ_BLOCK_SIZE = 64 * 1024
+    
+    def __init__(self, max_connections: int = 100, timeout: float = 60.0):
+        """
+        初期化
+        
+        Args:
+            max_connections: 同時に使用する最大接続数
+            timeout: 接続・1回の読み込みのタイムアウト（秒）
+        """
+        self.max_connections = max(1, max_connections)
+        self.timeout = timeout
+        self._ssl_context = ssl.create_default_context()
+        
+        # (スキーム, ホスト, ポート) -> 待機中の接続
+        self._idle: Dict[tuple, List[_Connection]] = {}
+        self._slots = None
+        
+        self.stats = {
+            'http_requests': 0,
+            'connections_opened': 0,
+            'connections_reused': 0,
+        }
+    
+    async def request(self, method: str, url: str, headers: Optional[dict] = None, body: bytes = b'',
+                      on_data: Optional[Callable[[bytes], Optional[Awaitable]]] = None,
+                      stream_statuses: Iterable[int] = (200, 206)) -> HttpResponse:
+        """
+        リクエストを送信して応答を受信
+        
+        Args:
+            method: HTTPメソッド
+            url: URL
+            headers: 追加のヘッダー
+            body: リクエスト本文
+            on_data: 本文をチャンクごとに受け取る関数（コルーチン関数も可）。
+                指定した場合、stream_statusesの応答の本文は戻り値に含めない
+            stream_statuses: on_dataに渡す応答のステータス（それ以外の本文はエラー内容として受け取る）
+        
+        Returns:
+            応答
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        head = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}", "Accept-Encoding: identity"]
+        head += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        if body or method in ('POST', 'PUT', 'PATCH'):
+            head.append(f"Content-Length: {len(body)}")
+        payload = ("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body
+        
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+        
+        async with self._slots:
+            self.stats['http_requests'] += 1
+            connection = self._take_idle(key)
+            if connection is not None:
+                try:
+                    return await self._exchange(key, connection, method, payload, on_data, stream_statuses)
+                except ConnectionError:
+                    # 待機中にサーバーが閉じた接続は、応答を受け取る前なら新しい接続でやり直す
+                    if connection.response_started:
+                        raise
+            
+            connection = await self._open(key)
+            return await self._exchange(key, connection, method, payload, on_data, stream_statuses)
+    
+    def _take_idle(self, key: tuple) -> Optional[_Connection]:
+        """待機中の接続を取り出す（閉じられたものは捨てる）"""
+        idle = self._idle.get(key)
+        while idle:
+            connection = idle.pop()
+            if connection.reader.at_eof() or connection.writer.is_closing():
+                connection.close()
+                continue
+            self.stats['connections_reused'] += 1
+            return connection
+        return None
+    
+    async def _open(self, key: tuple) -> _Connection:
+        """新しい接続を開く"""
+        scheme, host, port = key
+        reader, writer = await self._wait(asyncio.open_connection(
+            host, port, ssl=self._ssl_context if scheme == 'https' else None
+        ))
+        sock = writer.get_extra_info('socket')
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.stats['connections_opened'] += 1
+        return _Connection(reader, writer)
+    
+    async def _wait(self, awaitable: Awaitable[T]) -> T:
+        """タイムアウト付きで待機（途中で切れた接続は通信エラーとして扱う）"""
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout)
+        except asyncio.IncompleteReadError as e:
+            raise ConnectionResetError("応答の途中で接続が閉じられました") from e
+    
+    async def _exchange(self, key: tuple, connection: _Connection, method: str, payload: bytes,
+                        on_data, stream_statuses) -> HttpResponse:
+        """1回分の送受信（最後まで読めた接続はプールに戻す）"""
+        connection.response_started = False
+        reusable = False
+        try:
+            connection.writer.write(payload)
+            await self._wait(connection.writer.drain())
+            
+            status_line = await self._wait(connection.reader.readline())
+            if not status_line:
+                raise ConnectionResetError("応答を受け取る前に接続が閉じられました")
+            connection.response_started = True
+            version, status, *_ = status_line.decode('latin-1').split(' ', 2)
+            status = int(status)
+            
+            headers = {}
+            while True:
+                line = await self._wait(connection.reader.readline())
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            
+            chunks = []
+            sink = on_data if on_data is not None and status in stream_statuses else chunks.append
+            delimited = await self._read_body(connection, method, status, headers, sink)
+            reusable = delimited and version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+            return HttpResponse(status, headers, b''.join(chunks))
+        
+        finally:
+            if reusable:
+                self._idle.setdefault(key, []).append(connection)
+            else:
+                connection.close()
+    
+    async def _read_body(self, connection: _Connection, method: str, status: int, headers: dict, sink) -> bool:
+        """
+        応答本文をsinkに渡す
+        
+        Returns:
+            本文の終わりが長さで決まっていた場合True（接続を閉じて終わる応答はFalse）
+        """
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            return True
+        
+        reader = connection.reader
+        is_coroutine = asyncio.iscoroutinefunction(sink)
+        
+        async def emit(data: bytes):
+            if is_coroutine:
+                await sink(data)
+            else:
+                sink(data)
+        
+        async def read_exactly(size: int):
+            while size > 0:
+                data = await self._wait(reader.read(min(self.READ_BLOCK_SIZE, size)))
+                if not data:
+                    raise ConnectionResetError("応答の途中で接続が閉じられました")
+                size -= len(data)
+                await emit(data)
+        
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                size = int((await self._wait(reader.readline())).split(b';')[0].strip() or b'0', 16)
+                if size == 0:
+                    # トレーラーを読み飛ばす
+                    while (await self._wait(reader.readline())) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return True
+                await read_exactly(size)
+                await self._wait(reader.readexactly(2))
+        
+        if 'content-length' in headers:
+            await read_exactly(int(headers['content-length']))
+            return True
+        
+        while True:
+            data = await self._wait(reader.read(self.READ_BLOCK_SIZE))
+            if not data:
+                return False
+            await emit(data)
+    
+    def close(self):
+        """待機中の接続をすべて閉じる"""
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
+
+
+class AsyncDriveClient:
+    """
+    Google Drive API v2の非同期クライアント
+    
+    専用スレッドのイベントループ上でリクエストを実行する。DriveMonitor・FileProcessorの
+    スレッドからはrun（完了を待つ）・submit（Futureを受け取る）でコルーチンを渡す。
+    """
+    
+    DEFAULT_BASE_URL = 'https://www.googleapis.com/drive/v2/'
+    
+    # アクセストークンの有効期限を確認する間隔（確認・更新はスレッドで行う）
+    TOKEN_CHECK_INTERVAL_SEC = 30
+    
+    # 追従するリダイレクトのステータスと最大回数
+    REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+    MAX_REDIRECTS = 5
+    
+    # ダウンロードの本文をまとめて書き込む単位（書き込みとMD5の計算はスレッドで行う）
+    WRITE_BLOCK_SIZE = 1024 * 1024
+    
+    def __init__(self, session, api: DriveApi, config: dict):
+        """
+        初期化
+        
+        Args:
+            session: 認証セッション（DriveSession、アクセストークンを共有）
+            api: リトライ判定・流量制限（同期クライアントと共有）
+            config: 設定辞書
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.session = session
+        self.api = api
+        
+        async_config = config.get('async_client', {})
+        self.concurrency = max(1, async_config.get('max_concurrent_requests', 200))
+        self.pool = AsyncConnectionPool(
+            async_config.get('max_connections', 100), async_config.get('timeout_sec', 60)
+        )
+        self._base_url = None
+        self._token_checked_at = None
+        self._token_lock = None
+        
+        # リクエストごとの所要時間
+        self.metrics = MetricsRecorder()
+        
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='async-drive', daemon=True)
+        self._thread.start()
+    
+    def submit(self, coro: Awaitable[T]) -> 'Future[T]':
+        """イベントループでコルーチンを実行（呼び出し元のスレッドは待たない）"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def run(self, coro: Awaitable[T]) -> T:
+        """イベントループでコルーチンを実行して結果を待つ"""
+        return self.submit(coro).result()
+    
+    def run_all(self, coros: Iterable[Awaitable[T]]) -> List[T]:
+        """
+        複数のコルーチンを同時に実行して全部の結果を待つ（max_concurrent_requestsまで同時実行）
+        
+        Returns:
+            結果のリスト（順序は引数と同じ、エラーは例外オブジェクト）
+        """
+        coros = list(coros)
+        
+        async def gather():
+            limit = asyncio.Semaphore(self.concurrency)
+            
+            async def limited(coro):
+                async with limit:
+                    return await coro
+            
+            return await asyncio.gather(*(limited(coro) for coro in coros), return_exceptions=True)
+        
+        return self.run(gather())
+    
+    def close(self):
+        """接続を閉じてイベントループを停止"""
+        if self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self.pool.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+    
+    def get_stats(self) -> dict:
+        """実行ごとの統計を取得"""
+        return dict(self.pool.stats)
+    
+    def _url(self, path: str, params: Optional[dict] = None) -> str:
+        """APIのURL（接続先は認証セッションのサービスと同じ）"""
+        if self._base_url is None:
+            service = getattr(self.session.gauth, 'service', None)
+            self._base_url = getattr(service, '_baseUrl', None) or self.DEFAULT_BASE_URL
+        params = {key: value for key, value in (params or {}).items() if value is not None}
+        return self._base_url + path + (f"?{urlencode(params)}" if params else '')
+    
+    def _authorization(self) -> Optional[str]:
+        """現在のアクセストークンのAuthorizationヘッダー値（認証情報がない場合None）"""
+        credentials = self.session.gauth.credentials
+        if credentials is None:
+            return None
+        return f"Bearer {credentials.access_token}"
+    
+    async def _auth_headers(self) -> dict:
+        """
+        認証ヘッダー（credentials.jsonから読み込んだトークンをDriveSessionと共有）
+        
+        有効期限の確認と更新はDriveSession.ensure_tokenに任せる（ブロッキングのためスレッドで実行）。
+        """
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        
+        async with self._token_lock:
+            now = time.monotonic()
+            if self._token_checked_at is None or now - self._token_checked_at >= self.TOKEN_CHECK_INTERVAL_SEC:
+                await asyncio.to_thread(self.session.ensure_token)
+                self._token_checked_at = time.monotonic()
+        
+        authorization = self._authorization()
+        return {'Authorization': authorization} if authorization else {}
+    
+    async def _refresh_token(self, rejected: dict):
+        """
+        401を受けたトークンを有効期限にかかわらず更新
+        
+        同時に401を受けた他のリクエストが更新済みの場合は何もしない。
+        
+        Args:
+            rejected: 401を受けたリクエストの認証ヘッダー
+        """
+        async with self._token_lock:
+            if self._authorization() != rejected.get('Authorization'):
+                return
+            self.logger.info("認証エラー（401）のためトークンを更新して再送")
+            await asyncio.to_thread(self.session.ensure_token, True)
+            self._token_checked_at = time.monotonic()
+    
+    async def _send(self, method: str, url: str, headers: dict,
+                    on_data: Optional[Callable[[bytes], Optional[Awaitable]]] = None,
+                    stream_statuses: Iterable[int] = (200, 206)) -> HttpResponse:
+        """
+        リクエストを送信（リダイレクトはLocationに従ってMAX_REDIRECTS回まで追従）
+        
+        Returns:
+            最後の応答（回数を超えた場合はリダイレクトの応答）
+        """
+        for _ in range(self.MAX_REDIRECTS):
+            response = await self.pool.request(method, url, headers, on_data=on_data, stream_statuses=stream_statuses)
+            location = response.headers.get('location')
+            if response.status not in self.REDIRECT_STATUSES or not location:
+                return response
+            url = urljoin(url, location)
+            if response.status == 303:
+                method = 'GET'
+        return await self.pool.request(method, url, headers, on_data=on_data, stream_statuses=stream_statuses)
+    
+    async def _throttle(self):
+        """流量制限（スレッドを止めずに待つ）"""
+        wait_time = self.api.reserve_request()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+    
+    @staticmethod
+    def _to_error(response: HttpResponse, url: str) -> HttpError:
+        """エラー応答をgoogleapiclientと同じHttpErrorに変換（DriveApiのエラー分類を使うため）"""
+        return HttpError(httplib2.Response(dict(response.headers, status=response.status)), response.body, uri=url)
+    
+    async def _request(self, method: str, path: str, params: Optional[dict] = None,
+                       description: Optional[str] = None) -> HttpResponse:
+        """
+        リトライ付きでリクエストを実行
+        
+        Raises:
+            リトライしないエラー、またはリトライ回数を超えた場合の最後のエラー
+        """
+        url = self._url(path, params)
+        attempt = 0
+        refreshed = False
+        while True:
+            await self._throttle()
+            headers = await self._auth_headers()
+            started_at = time.perf_counter()
+            try:
+                response = await self._send(method, url, headers)
+                if response.status == 401 and not refreshed:
+                    refreshed = True
+                    await self._refresh_token(headers)
+                    continue
+                if response.status >= 300:
+                    raise self._to_error(response, url)
+                return response
+            except Exception as e:
+                delay = self.api.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                self.logger.warning(
+                    f"{description or method + ' ' + path}: 一時的なエラーのため{delay:.1f}秒後に再試行 "
+                    f"({attempt}/{self.api.max_retries}) - {e}"
+                )
+                await asyncio.sleep(delay)
+            finally:
+                self.metrics.observe('async_request', time.perf_counter() - started_at)
+    
+    async def list_files(self, query: str, fields: Optional[str] = None, page_token: Optional[str] = None,
+                         max_results: int = 1000) -> dict:
+        """
+        files.list（1ページ分）
+        
+        Returns:
+            応答（items, nextPageToken）
+        """
+        response = await self._request('GET', 'files', {
+            'q': query, 'fields': fields, 'maxResults': max_results, 'pageToken': page_token,
+        }, description="一覧取得")
+        return json.loads(response.body)
+    
+    async def download(self, file_id: str, dest: Path, offset: int = 0, hash_md5=None,
+                       bandwidth: Optional[TokenBucket] = None, progress_interval: int = 0,
+                       on_progress: Optional[Callable[[int, object], None]] = None) -> Tuple[int, str]:
+        """
+        ファイル本体を書き込みながらMD5を計算（1回のGETで最後まで受信する）
+        
+        一時的なエラーは取得済みの位置からRange指定で再開する。
+        
+        Args:
+            file_id: ファイルID
+            dest: 書き込み先ファイルパス
+            offset: 書き込み開始位置（再開時は既存部分の末尾）
+            hash_md5: 再開時に引き継ぐMD5オブジェクト（省略時は新規）
+            bandwidth: 帯域の上限（全ダウンロード共通）
+            progress_interval: on_progressを呼ぶ間隔（バイト、0は呼ばない）
+            on_progress: 進捗の通知（書き込み済みバイト数, MD5オブジェクト）
+        
+        Returns:
+            (書き込み済みの合計バイト数, MD5ハッシュ値)
+        """
+        if hash_md5 is None:
+            hash_md5 = hashlib.md5()
+        url = self._url(f"files/{quote(file_id, safe='')}", {'alt': 'media'})
+        written = offset
+        next_progress = offset + progress_interval
+        
+        with open(dest, 'r+b' if offset else 'wb') as f:
+            f.seek(offset)
+            f.truncate()
+            buffer = bytearray()
+            
+            def write_block(data: bytes):
+                """受信した本文の書き込み・MD5の更新・進捗の通知（スレッドで実行）"""
+                nonlocal written, next_progress
+                f.write(data)
+                hash_md5.update(data)
+                written += len(data)
+                if on_progress is not None and progress_interval and written >= next_progress:
+                    f.flush()
+                    on_progress(written, hash_md5)
+                    next_progress = written + progress_interval
+            
+            async def flush():
+                if buffer:
+                    data = bytes(buffer)
+                    buffer.clear()
+                    await asyncio.to_thread(write_block, data)
+            
+            async def on_data(chunk: bytes):
+                buffer.extend(chunk)
+                if len(buffer) >= self.WRITE_BLOCK_SIZE:
+                    await flush()
+                if bandwidth is not None:
+                    wait_time = bandwidth.reserve(len(chunk))
+                    if wait_time > 0:
+                        await asyncio.sleep(wait_time)
+            
+            attempt = 0
+            refreshed = False
+            while True:
+                await self._throttle()
+                headers = await self._auth_headers()
+                if written:
+                    headers['Range'] = f"bytes={written}-"
+                # 途中から取得する場合に全体（200）が返っても書き込まない
+                accepted = (206,) if written else (200, 206)
+                resumed = bool(written)
+                started_at = time.perf_counter()
+                try:
+                    try:
+                        response = await self._send('GET', url, headers, on_data=on_data, stream_statuses=accepted)
+                    finally:
+                        # 途中で切れた場合も受信済みの部分は書き込んで続きから再開する
+                        await flush()
+                    if response.status == 401 and not refreshed:
+                        refreshed = True
+                        await self._refresh_token(headers)
+                        continue
+                    if response.status == 416 and resumed:
+                        break
+                    if response.status not in accepted:
+                        raise self._to_error(response, url)
+                    break
+                except Exception as e:
+                    delay = self.api.retry_delay(e, attempt)
+                    if delay is None:
+                        raise
+                    attempt += 1
+                    self.logger.warning(
+                        f"ダウンロード: {file_id} ({written}バイトから): 一時的なエラーのため{delay:.1f}秒後に再試行 "
+                        f"({attempt}/{self.api.max_retries}) - {e}"
+                    )
+                    await asyncio.sleep(delay)
+                finally:
+                    self.metrics.observe('async_request', time.perf_counter() - started_at)
+        
+        return written, hash_md5.hexdigest()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機能:
+- ダウンロード先フォルダ内のファイルのMD5索引（SQLite）
+- サイズ・更新日時が変わったファイルのみ再計算する差分更新
+- 処理を止めないバックグラウンドでの定期的な走査
+- MD5による既存ファイルの検索（重複ダウンロードの防止）
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+
+
+class LocalFileIndex:
+    """ローカルファイルのMD5索引クラス"""
+    
+    # 索引に含めないフォルダ（ダウンロード中の一時フォルダ）
+    SKIP_DIR_NAMES = {'.autosync_temp'}
+    
+    # 索引に含めないファイルの拡張子（ダウンロード中・配置中のファイル）
+    SKIP_SUFFIXES = ('.downloading', '.autosync')
+    
+    # 走査中に索引を保存する間隔（ファイル数、途中からでも検索に使えるようにする）
+    COMMIT_INTERVAL = 100
+    
+    def __init__(self, db_file: Path, roots: Iterable[Path]):
+        """
+        初期化
+        
+        Args:
+            db_file: SQLiteデータベースファイルパス
+            roots: 索引の対象フォルダ（ダウンロード先）
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.roots = [Path(root) for root in roots]
+        
+        self._lock = threading.Lock()
+        db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS local_files ("
+            " path TEXT PRIMARY KEY,"
+            " md5 TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_local_files_md5 ON local_files (md5)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS local_index_meta ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+        
+        # バックグラウンド走査
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def _iter_files(self, root: Path) -> Iterator[os.DirEntry]:
+        """フォルダ内のファイルを再帰的に列挙"""
+        try:
+            entries = list(os.scandir(root))
+        except OSError as e:
+            self.logger.warning(f"フォルダ読み込みエラー: {root} - {e}")
+            return
+        
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in self.SKIP_DIR_NAMES:
+                    yield from self._iter_files(Path(entry.path))
+            elif entry.is_file(follow_symlinks=False) and not entry.name.endswith(self.SKIP_SUFFIXES):
+                yield entry
+    
+    @staticmethod
+    def _hash_file(path: Path) -> str:
+        """ファイルのMD5を計算"""
+        hash_md5 = hashlib.md5()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                hash_md5.update(chunk)
+        return hash_md5.hexdigest()
+    
+    @property
+    def last_refreshed(self) -> float:
+        """最後にフォルダ全体を走査し終えた時刻（未走査は0）"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM local_index_meta WHERE key = 'last_refreshed'").fetchone()
+        return float(row[0]) if row else 0.0
+    
+    def _save(self, updates: List[tuple], removed: List[tuple], refreshed_at: Optional[float] = None):
+        """走査結果の保存"""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO local_files (path, md5, size, mtime_ns) VALUES (?, ?, ?, ?)", updates
+            )
+            self._conn.executemany("DELETE FROM local_files WHERE path = ?", removed)
+            if refreshed_at is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO local_index_meta (key, value) VALUES ('last_refreshed', ?)",
+                    (str(refreshed_at),)
+                )
+            self._conn.commit()
+    
+    def refresh(self) -> bool:
+        """
+        索引をフォルダの現状に合わせて更新
+        
+        サイズ・更新日時が索引と同じファイルはMD5を再計算しない。
+        削除されたファイルは最後までたどった場合のみ索引から除く（中断時は追加・変更分だけ保存）。
+        
+        Returns:
+            最後までたどった場合True
+        """
+        with self._lock:
+            known = {
+                row[0]: (row[1], row[2])
+                for row in self._conn.execute("SELECT path, size, mtime_ns FROM local_files")
+            }
+        
+        found = set()
+        updates = []
+        updated_count = 0
+        for root in self.roots:
+            if not root.exists():
+                continue
+            for entry in self._iter_files(root):
+                if self._stop.is_set():
+                    self._save(updates, [])
+                    return False
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                    found.add(entry.path)
+                    if known.get(entry.path) == (stat.st_size, stat.st_mtime_ns):
+                        continue
+                    updates.append((entry.path, self._hash_file(Path(entry.path)), stat.st_size, stat.st_mtime_ns))
+                except OSError as e:
+                    self.logger.warning(f"ファイル索引エラー: {entry.path} - {e}")
+                    continue
+                
+                if len(updates) >= self.COMMIT_INTERVAL:
+                    self._save(updates, [])
+                    updated_count += len(updates)
+                    updates = []
+        
+        removed = [(path,) for path in known if path not in found]
+        self._save(updates, removed, refreshed_at=time.time())
+        updated_count += len(updates)
+        
+        if updated_count or removed:
+            self.logger.info(f"ローカルファイル索引を更新: 追加・変更={updated_count}個, 削除={len(removed)}個")
+        return True
+    
+    def refresh_in_background(self, interval_sec: float, on_complete: Optional[Callable[[float], None]] = None) -> bool:
+        """
+        前回の走査からinterval_sec秒以上経っていれば別スレッドで索引を更新
+        
+        走査中も索引済みのファイルと、このツールで保存したファイル（add）は検索できる。
+        
+        Args:
+            interval_sec: 走査の間隔（秒、0は毎回）
+            on_complete: 最後までたどった場合に所要秒数を渡して呼ぶ関数
+        
+        Returns:
+            走査を開始した場合True
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return False
+        if time.time() - self.last_refreshed < interval_sec:
+            return False
+        
+        self._thread = threading.Thread(target=self._run_refresh, args=(on_complete,), name='content-index', daemon=True)
+        self._thread.start()
+        return True
+    
+    def _run_refresh(self, on_complete: Optional[Callable[[float], None]]):
+        """バックグラウンドでの走査"""
+        started_at = time.perf_counter()
+        try:
+            completed = self.refresh()
+        except Exception as e:
+            self.logger.warning(f"ローカルファイル索引の更新エラー: {e}")
+            return
+        if completed and on_complete is not None:
+            on_complete(time.perf_counter() - started_at)
+    
+    def wait_refresh(self, timeout: Optional[float] = None):
+        """バックグラウンドの走査の完了を待機"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def find(self, md5: str, size: int) -> Optional[Path]:
+        """
+        同じ内容のローカルファイルを検索
+        
+        索引作成後に変更・削除されたファイルは使用せず索引から除く。
+        
+        Returns:
+            ファイルパス、見つからない場合はNone
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size, mtime_ns FROM local_files WHERE md5 = ? AND size = ?", (md5, size)
+            ).fetchall()
+        
+        stale = []
+        result = None
+        for path, indexed_size, mtime_ns in rows:
+            try:
+                stat = os.stat(path)
+                if (stat.st_size, stat.st_mtime_ns) == (indexed_size, mtime_ns):
+                    result = Path(path)
+                    break
+            except OSError:
+                pass
+            stale.append((path,))
+        
+        if stale:
+            with self._lock:
+                self._conn.executemany("DELETE FROM local_files WHERE path = ?", stale)
+                self._conn.commit()
+        
+        return result
+    
+    def add(self, path: Path, md5: str):
+        """ダウンロード・配置したファイルを索引に追加"""
+        stat = os.stat(path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO local_files (path, md5, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                (str(path), md5, stat.st_size, stat.st_mtime_ns)
+            )
+            self._conn.commit()
+    
+    def close(self):
+        """走査を中断して接続を閉じる"""
+        self._stop.set()
+        self.wait_refresh()
+        with self._lock:
+            self._conn.close()
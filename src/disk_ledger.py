@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機能:
+- ボリュームごとのディスク容量予約（実行中の他のダウンロード分を考慮）
+- 空き容量の取得は実行ごとに1回
+"""
+
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict
+
+
+class DiskSpaceLedger:
+    """ディスク容量予約台帳（スレッドセーフ）"""
+    
+    def __init__(self, min_free_space: int):
+        """
+        初期化
+        
+        Args:
+            min_free_space: 予約後も残しておく空き容量（バイト）
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.min_free_space = min_free_space
+        
+        self._lock = threading.Lock()
+        
+        # 予約キー -> {デバイスID: 予約バイト数}
+        self._reservations: Dict[str, Dict[int, int]] = {}
+        
+        # デバイスID -> 空き容量（refresh後の初回予約時に取得）
+        self._free: Dict[int, int] = {}
+        
+        # デバイスID -> 空き容量取得後に予約した合計（解放しても戻さない）
+        self._committed: Dict[int, int] = {}
+    
+    @classmethod
+    def volume_id(cls, path: Path) -> int:
+        """パスが属するボリュームのデバイスID（未作成のパスは存在する親で判定）"""
+        return os.stat(cls._existing(path)).st_dev
+    
+    def refresh(self):
+        """
+        空き容量を取り直す（実行の開始時に呼び出す）
+        
+        書き込み中の予約は残りの書き込み量が分からないため、予約量をそのまま差し引く。
+        """
+        with self._lock:
+            self._free.clear()
+            self._committed = {}
+            for reservation in self._reservations.values():
+                for device, size in reservation.items():
+                    self._committed[device] = self._committed.get(device, 0) + size
+    
+    def reserve(self, key: str, requirements: Dict[Path, int]) -> bool:
+        """
+        容量を予約
+        
+        Args:
+            key: 予約キー（ファイルID）
+            requirements: ボリューム上のパス -> 必要なバイト数
+        
+        Returns:
+            予約できた場合True、容量が足りない場合False
+        """
+        by_device = {}
+        paths = {}
+        for path, size in requirements.items():
+            device = self.volume_id(path)
+            by_device[device] = by_device.get(device, 0) + max(0, size)
+            paths.setdefault(device, path)
+        
+        with self._lock:
+            for device, size in by_device.items():
+                if device not in self._free:
+                    self._free[device] = shutil.disk_usage(self._existing(paths[device])).free
+                
+                available = self._free[device] - self._committed.get(device, 0) - self.min_free_space
+                if size > available:
+                    self.logger.info(
+                        f"ディスク容量不足: 必要={size/1024/1024:.1f}MB, "
+                        f"予約可能={max(0, available)/1024/1024:.1f}MB ({paths[device]})"
+                    )
+                    return False
+            
+            for device, size in by_device.items():
+                self._committed[device] = self._committed.get(device, 0) + size
+            self._reservations[key] = by_device
+        
+        return True
+    
+    def is_reserved(self, key: str) -> bool:
+        """予約済みかどうか"""
+        with self._lock:
+            return key in self._reservations
+    
+    def release(self, key: str):
+        """予約の解放（ダウンロード完了・失敗時）"""
+        with self._lock:
+            self._reservations.pop(key, None)
+            
+            # 予約がなくなれば実際の空き容量が正確になるため次回の予約時に取り直す
+            if not self._reservations:
+                self._free.clear()
+                self._committed.clear()
+    
+    @staticmethod
+    def _existing(path: Path) -> Path:
+        """存在する最も近い親ディレクトリ"""
+        path = Path(path).absolute()
+        while not path.exists() and path.parent != path:
+            path = path.parent
+        return path
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機能:
+- Drive APIリクエストの共通実行層（DriveMonitor・FileProcessorで共有）
+- エラー種別によるリトライ判定（429・5xx・403レート制限・通信エラー）
+- ジッター付き指数バックオフとRetry-Afterヘッダーの尊重
+- トークンバケットによる1秒あたりのリクエスト数の上限
+- APIリソースオブジェクトの再利用
+"""
+
+import http.client
+import json
+import logging
+import random
+import socket
+import ssl
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+import httplib2
+from googleapiclient.errors import HttpError
+from pydrive2.files import ApiRequestError
+
+from .rate_limiter import TokenBucket
+
+T = TypeVar('T')
+
+
+class DriveApi:
+    """Drive APIリクエスト実行クラス（スレッドセーフ）"""
+    
+    # リトライするHTTPステータス（レート制限・サーバー側の一時的なエラー）
+    RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+    
+    # 403のうちリトライするエラー理由（それ以外の403は権限エラー）
+    RATE_LIMIT_REASONS = {'userRateLimitExceeded', 'rateLimitExceeded'}
+    
+    # リトライする通信エラー
+    NETWORK_ERRORS = (
+        ConnectionError, TimeoutError, socket.timeout, ssl.SSLError,
+        http.client.HTTPException, httplib2.HttpLib2Error,
+    )
+    
+    def __init__(self, config: dict):
+        """
+        初期化
+        
+        Args:
+            config: 設定辞書
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        
+        api_config = config.get('api', {})
+        self.max_retries = api_config.get('max_retries', 5)
+        self.backoff_base = api_config.get('backoff_base_sec', 1.0)
+        self.backoff_max = api_config.get('backoff_max_sec', 64.0)
+        
+        # 1秒あたりのリクエスト数の上限（0は無制限、バッチは中のリクエスト数として数える）
+        self.limiter = TokenBucket(api_config.get('requests_per_second', 10))
+        
+        # レート制限を受けた場合は全スレッドでこの時刻まで新しいリクエストを止める
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        
+        # サービス -> リソース名 -> リソースオブジェクト（作成コストが大きいため再利用）
+        self._resources = {}
+        
+        # 実行ごとの統計
+        self.stats = {
+            'requests': 0,
+            'retries': 0,
+            'rate_limited': 0,
+            'gave_up': 0,
+            'throttle_seconds': 0.0,
+            'backoff_seconds': 0.0,
+        }
+    
+    def resource(self, service, name: str):
+        """
+        APIリソース（files・changesなど）を取得
+        
+        service.files()は呼び出すたびにDiscoveryドキュメントからメソッドを組み立てるため、
+        作成済みのものを使い回す。
+        """
+        with self._lock:
+            resources = self._resources.get(id(service))
+            if resources is None or resources[0] is not service:
+                resources = (service, {})
+                self._resources[id(service)] = resources
+            if name not in resources[1]:
+                resources[1][name] = getattr(service, name)()
+            return resources[1][name]
+    
+    @staticmethod
+    def _unwrap(error: Exception) -> Exception:
+        """PyDrive2のApiRequestErrorから元のHttpErrorを取り出す"""
+        if isinstance(error, ApiRequestError) and error.args and isinstance(error.args[0], HttpError):
+            return error.args[0]
+        return error
+    
+    @staticmethod
+    def _error_reason(error: HttpError) -> str:
+        """HttpErrorのエラー理由（errors[0].reason）"""
+        try:
+            content = json.loads(error.content.decode('utf-8'))
+            return content.get('error', {}).get('errors', [{}])[0].get('reason', '')
+        except Exception:
+            return ''
+    
+    def classify(self, error: Exception) -> Optional[str]:
+        """
+        エラーの分類
+        
+        Returns:
+            'rate_limit'（レート制限）, 'server'（サーバーエラー）, 'network'（通信エラー）、
+            リトライしないエラーの場合はNone
+        """
+        error = self._unwrap(error)
+        if isinstance(error, HttpError):
+            status = error.resp.status
+            if status == 429 or (status == 403 and self._error_reason(error) in self.RATE_LIMIT_REASONS):
+                return 'rate_limit'
+            if status in self.RETRYABLE_STATUSES:
+                return 'server'
+            return None
+        if isinstance(error, self.NETWORK_ERRORS):
+            return 'network'
+        return None
+    
+    def is_retryable(self, error: Exception) -> bool:
+        """リトライ対象のエラーかどうか"""
+        return self.classify(error) is not None
+    
+    def _retry_after(self, error: Exception) -> Optional[float]:
+        """Retry-Afterヘッダーの秒数（日時形式・未指定はNone）"""
+        error = self._unwrap(error)
+        if not isinstance(error, HttpError):
+            return None
+        try:
+            return max(0.0, float(error.resp.get('retry-after')))
+        except (TypeError, ValueError):
+            return None
+    
+    def retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        リトライまでの待機時間を決定
+        
+        Retry-Afterがあればそれに従い、なければ上限付き指数バックオフの範囲から
+        ランダムに選ぶ（フルジッター、複数ワーカーの再試行が同時に集中しないように）。
+        レート制限の場合は全スレッドの新しいリクエストも同じ時間止める。
+        
+        Args:
+            error: 発生したエラー
+            attempt: これまでのリトライ回数
+        
+        Returns:
+            待機秒数、リトライしない場合はNone
+        """
+        kind = self.classify(error)
+        if kind is None:
+            return None
+        if attempt >= self.max_retries:
+            with self._lock:
+                self.stats['gave_up'] += 1
+            return None
+        
+        delay = self._retry_after(error)
+        if delay is None:
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        
+        with self._lock:
+            self.stats['retries'] += 1
+            self.stats['backoff_seconds'] += delay
+            if kind == 'rate_limit':
+                self.stats['rate_limited'] += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        
+        return delay
+    
+    def reserve_request(self, cost: int = 1) -> float:
+        """
+        リクエストcost回分の枠を確保し、送信までに待つ秒数を返す（待機はしない）
+        
+        レート制限による一時停止の残り時間と、流量制限の待ち時間の合計。
+        非同期クライアントはこの秒数だけイベントループ上で待つ。
+        
+        Args:
+            cost: 消費するリクエスト数（バッチは中のリクエスト数、クォータも個別に数えられるため）
+        """
+        with self._lock:
+            paused = max(0.0, self._paused_until - time.monotonic())
+        
+        wait_time = paused + self.limiter.reserve(cost)
+        with self._lock:
+            self.stats['requests'] += cost
+            self.stats['throttle_seconds'] += wait_time
+        return wait_time
+    
+    def throttle(self, cost: int = 1):
+        """リクエスト前の流量制限（レート制限による一時停止中は再開まで待機）"""
+        wait_time = self.reserve_request(cost)
+        if wait_time > 0:
+            time.sleep(wait_time)
+    
+    def call(self, func: Callable[[], T], description: str = 'APIリクエスト', cost: int = 1) -> T:
+        """
+        リトライ付きで関数を実行
+        
+        Args:
+            func: 1回分のリクエストを実行する関数
+            description: ログ出力用の説明
+            cost: 1回の実行で消費するリクエスト数（バッチは中のリクエスト数）
+        
+        Returns:
+            funcの戻り値
+        
+        Raises:
+            リトライしないエラー、またはリトライ回数を超えた場合の最後のエラー
+        """
+        attempt = 0
+        while True:
+            self.throttle(cost)
+            try:
+                return func()
+            except Exception as e:
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                self.logger.warning(
+                    f"{description}: 一時的なエラーのため{delay:.1f}秒後に再試行 "
+                    f"({attempt}/{self.max_retries}) - {e}"
+                )
+                time.sleep(delay)
+    
+    def execute(self, request, http=None, description: Optional[str] = None):
+        """
+        googleapiclientのHttpRequestをリトライ付きで実行
+        
+        Args:
+            request: HttpRequest
+            http: 使用するHTTPオブジェクト（スレッドごと）
+            description: ログ出力用の説明（省略時はメソッドID）
+        """
+        description = description or getattr(request, 'methodId', None) or 'APIリクエスト'
+        return self.call(lambda: request.execute(http=http), description)
+    
+    def get_stats(self) -> dict:
+        """実行ごとの統計を取得"""
+        with self._lock:
+            return dict(self.stats)
@@ -3,21 +3,40 @@
 """
 機能:
 - PyDrive2による簡素化された認証
-- 定期的なフォルダ監視
+- 定期的なフォルダ監視（複数ルート・サブフォルダ対応）
+- Changes APIによる差分取得（page_token.txt）
 - 音声ファイルの自動検出
-- 処理済みファイル管理
+- 処理済みファイル管理（SQLiteストア）
+- ファイルごとの処理段階のジャーナル（中断後の再開用）
+- バッチリクエストによる削除・メタデータ取得
+- アップロード中ファイルの安定待ち（ID指定での再確認）
+- 一時的なAPIエラーのリトライとリクエスト数の制限（DriveApi）
+- 非同期クライアントによる複数フォルダの一覧の同時取得（async_client有効時）
 """
 
 import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
-from pydrive2.auth import GoogleAuth
-from pydrive2.drive import GoogleDrive
+from googleapiclient.errors import HttpError
 from pydrive2.files import GoogleDriveFile
 
+from .async_drive import AsyncDriveClient
+from .drive_api import DriveApi
+from .drive_session import DriveSession
+from .folder_tree import FolderTree
+from .metrics import MetricsRecorder
+from .state_store import JournalEntry, PendingUpload, ProcessedStore
+
+
+class InvalidPageTokenError(Exception):
+    """Changes APIのページトークンが無効"""
+
 
 class DriveMonitor:
     """Google Drive監視クラス（PyDrive2版）"""
@@ -25,70 +44,142 @@ class DriveMonitor:
     # 対象ファイル形式
     AUDIO_EXTENSIONS = {'.wav', '.mp3', '.flac', '.aac'}
     
-    def __init__(self, config: dict):
+    # フォルダのMIMEタイプ
+    FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+    
+    # 一覧取得時に要求するフィールド（file_infoで使用するもののみ）
+    FILE_FIELDS = 'id,title,fileSize,md5Checksum,mimeType,modifiedDate,parents(id)'
+    LIST_FIELDS = f'nextPageToken,items({FILE_FIELDS})'
+    CHANGES_FIELDS = f'nextPageToken,newStartPageToken,items(deleted,fileId,file({FILE_FIELDS},labels(trashed)))'
+    
+    # サイズ・更新日時がこの秒数変化しなければアップロード完了とみなす（既定値）
+    DEFAULT_UPLOAD_STABLE_SEC = 60
+    
+    # メタデータキャッシュの既定有効期間（秒）
+    DEFAULT_METADATA_CACHE_TTL_SEC = 600
+    
+    # メタデータキャッシュの最大件数（超えた分は古いものから破棄）
+    MAX_METADATA_CACHE_ENTRIES = 100000
+    
+    # APIの最大ページサイズ
+    MAX_PAGE_SIZE = 1000
+    
+    # 1回の一覧取得クエリで指定する親フォルダの最大数（クエリ長の上限対策）
+    PARENTS_PER_QUERY = 50
+    
+    # 1回のバッチリクエストにまとめられる最大件数
+    BATCH_LIMIT = 100
+    
+    # 無効なページトークンとして扱うHTTPステータス
+    INVALID_TOKEN_STATUSES = {400, 404, 410}
+    
+    def __init__(self, config: dict, session: Optional[DriveSession] = None):
         """
         初期化
         
         Args:
             config: 設定辞書
+            session: 共有する認証セッション（省略時は新規作成）
         """
         self.config = config
         self.logger = logging.getLogger(self.__class__.__name__)
         self.project_root = Path(__file__).parent.parent
         
+        # 状態ファイルの保存先（相対パスはプロジェクトルート基準）
+        self.data_dir = self.project_root / config.get('state', {}).get('data_dir', 'data')
+        
         # Google Drive設定
-        self.target_folder_id = config['google_drive']['target_folder_id']
-        self.client_secrets_file = self.project_root / "config" / config['google_drive']['client_secrets_file']
-        self.credentials_file = self.project_root / "config" / config['google_drive']['credentials_file']
+        self.use_changes_feed = config['google_drive'].get('use_changes_feed', False)
+        self.page_token_file = self.data_dir / "page_token.txt"
+        self.upload_stable_sec = config['google_drive'].get(
+            'upload_stable_sec', self.DEFAULT_UPLOAD_STABLE_SEC
+        )
+        
+        # 監視フォルダツリー（サブフォルダ構成はキャッシュして差分更新）
+        self.folder_tree = FolderTree(
+            self._load_target_folders(config),
+            self.data_dir / "folder_tree.json"
+        )
+        
+        # 処理完了後に保存するページトークン
+        self._pending_page_token = None
+        
+        # メタデータキャッシュ（ファイルID -> (取得時刻, メタデータ)、取得時刻の古い順）
+        self.metadata_cache_ttl = config['google_drive'].get(
+            'metadata_cache_ttl_sec', self.DEFAULT_METADATA_CACHE_TTL_SEC
+        )
+        self._metadata_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # 処理済みファイルストア（初回のみprocessed_files.txtから移行）
+        self.processed_store = ProcessedStore(
+            self.data_dir / "state.db",
+            legacy_file=self.data_dir / "processed_files.txt",
+            retention_days=config.get('state', {}).get('retention_days', 90)
+        )
+        
+        # 並列処理時の状態更新用ロック
+        self._lock = threading.Lock()
         
-        # Google Drive認証
-        self.drive = self._authenticate()
+        # 実行ごとの統計
+        self.stats = {
+            'api_requests': 0,
+            'changes_polls': 0,
+            'full_listings': 0,
+            'pages_fetched': 0,
+            'bytes_fetched': 0,
+            'metadata_fetches': 0,
+            'metadata_calls_saved': 0,
+            'batch_requests': 0,
+            'batched_calls': 0,
+            'pending_rechecks': 0,
+        }
+        
+        # Google Drive認証（セッションは実行全体で共有）
+        self.session = session if session is not None else DriveSession(config)
+        
+        # APIリクエストの実行層（リトライ・流量制限、FileProcessorと共有）
+        self.api = DriveApi(config)
+        
+        # 非同期クライアント（有効時のみ、一覧取得とFileProcessorのダウンロードで共有）
+        self.async_client = None
+        if config.get('async_client', {}).get('enabled', False):
+            self.async_client = AsyncDriveClient(self.session, self.api, config)
+        
+        # 一覧取得・メタデータ取得・削除の所要時間
+        self.metrics = MetricsRecorder()
     
-    def _authenticate(self):
-        """PyDrive2による認証"""
-        try:
-            # settings.yamlファイルのパス
-            settings_file = self.project_root / "config" / "settings.yaml"
-            
-            # client_secrets.jsonの確認
-            if not self.client_secrets_file.exists():
-                raise FileNotFoundError(f"client_secrets.jsonが見つかりません: {self.client_secrets_file}")
-            
-            # settings.yamlの確認
-            if not settings_file.exists():
-                raise FileNotFoundError(f"settings.yamlが見つかりません: {settings_file}")
-            
-            # PyDrive2認証（settings.yamlを使用）
-            gauth = GoogleAuth(str(settings_file))
-            
-            # 既存の認証情報確認
-            if self.credentials_file.exists():
-                self.logger.info("既存の認証情報を読み込み中...")
-                gauth.LoadCredentialsFile(str(self.credentials_file))
-            
-            # 認証情報が無効または存在しない場合
-            if gauth.credentials is None:
-                self.logger.info("新規認証を実行中...")
-                gauth.LocalWebserverAuth()
-            elif gauth.access_token_expired:
-                self.logger.info("トークンを更新中...")
-                gauth.Refresh()
-            else:
-                self.logger.info("既存の認証情報を使用")
-                gauth.Authorize()
-            
-            # 認証情報を保存
-            gauth.SaveCredentialsFile(str(self.credentials_file))
-            
-            # Google Driveオブジェクトを作成
-            drive = GoogleDrive(gauth)
-            self.logger.info("Google Drive認証完了")
-            
-            return drive
-            
-        except Exception as e:
-            self.logger.error(f"Google Drive認証エラー: {e}")
-            raise
+    @property
+    def drive(self):
+        """認証済みGoogleDriveオブジェクト（共有セッションから取得）"""
+        return self.session.drive
+    
+    @staticmethod
+    def _load_target_folders(config: dict) -> List[dict]:
+        """
+        監視ルートの設定を取得
+        
+        target_foldersが未設定の場合はtarget_folder_idのみを監視する（サブフォルダは対象外）。
+        """
+        drive_config = config['google_drive']
+        default_path = config.get('file_processing', {}).get('download_path')
+        
+        target_folders = drive_config.get('target_folders')
+        if not target_folders:
+            return [{
+                'folder_id': drive_config['target_folder_id'],
+                'download_path': default_path,
+                'recursive': False,
+            }]
+        
+        return [
+            {
+                'folder_id': folder['folder_id'],
+                'download_path': folder.get('download_path', default_path),
+                'recursive': folder.get('recursive', True),
+            }
+            for folder in target_folders
+        ]
     
     def _is_target_file(self, file_obj: GoogleDriveFile) -> bool:
         """対象ファイルかどうかの判定"""
@@ -108,61 +199,433 @@ class DriveMonitor:
             if not parents:
                 return False
             
-            # 対象フォルダに存在するかチェック
-            for parent in parents:
-                if parent['id'] == self.target_folder_id:
-                    return True
-            
-            return False
+            # 監視フォルダツリー内に存在するかチェック
+            return self.folder_tree.locate(parent['id'] for parent in parents) is not None
             
         except Exception as e:
             self.logger.warning(f"ファイル判定エラー: {e}")
             return False
     
-    def _is_upload_complete(self, file_obj: GoogleDriveFile) -> bool:
+    def _is_upload_complete(self, file_obj: GoogleDriveFile, observation: PendingUpload, now: float) -> bool:
         """
         アップロード完了判定
         
-        PyDrive2では基本的に取得できるファイルは完了済み
+        サイズまたはMD5チェックサムがあり、かつサイズ・更新日時・MD5が
+        upload_stable_sec秒以上変化していなければ完了とみなす。
+        
+        Args:
+            file_obj: ファイルオブジェクト
+            observation: これまでの観測記録（_observe_uploadの結果）
+            now: 判定時刻（time.time()）
         """
-        # ファイルサイズが存在すれば完了とみなす
         file_size = file_obj.get('fileSize')
-        if file_size and int(file_size) > 0:
-            return True
-        
-        # MD5チェックサムが存在すれば完了
         md5_checksum = file_obj.get('md5Checksum')
-        if md5_checksum:
-            return True
+        if not (file_size and int(file_size) > 0) and not md5_checksum:
+            self.logger.info("アップロード完了待機中: %s", file_obj.get('title', 'Unknown'))
+            return False
+        
+        stable_for = now - observation.stable_since
+        if stable_for < self.upload_stable_sec:
+            self.logger.info(
+                f"アップロード完了待機中: {file_obj.get('title', 'Unknown')} "
+                f"(変化なし {stable_for:.0f}/{self.upload_stable_sec}秒)"
+            )
+            return False
         
-        self.logger.info(f"アップロード完了待機中: {file_obj.get('title', 'Unknown')}")
-        return False
+        return True
     
-    def _get_processed_files(self) -> set:
-        """処理済みファイルIDリストの取得"""
-        processed_file = self.project_root / "data" / "processed_files.txt"
+    @staticmethod
+    def _observe_upload(file_obj: GoogleDriveFile, previous: Optional[PendingUpload], now: float) -> PendingUpload:
+        """
+        サイズ・更新日時・MD5の観測を記録
+        
+        前回の観測から変化があれば安定開始時刻をリセットする。
+        
+        Returns:
+            最新の観測記録（変化がなければpreviousそのもの）
+        """
+        size = int(file_obj.get('fileSize') or 0)
+        modified = file_obj.get('modifiedDate', '')
+        md5 = file_obj.get('md5Checksum', '')
+        
+        if previous is not None and (previous.size, previous.modified, previous.md5) == (size, modified, md5):
+            return previous
         
+        first_seen_at = previous.first_seen_at if previous is not None else now
+        return PendingUpload(size, modified, md5, first_seen_at, now)
+    
+    def _recheck_pending(self, file_ids: List[str]) -> Dict[str, GoogleDriveFile]:
+        """
+        完了待ちファイルをID指定で再確認（フォルダの再一覧は行わない）
+        
+        削除・ゴミ箱移動・対象フォルダ外への移動が確認されたものは完了待ちから外す。
+        
+        Args:
+            file_ids: 再確認するファイルIDのリスト
+            
+        Returns:
+            引き続き対象のファイル（ファイルID -> ファイルオブジェクト）
+        """
+        if not file_ids:
+            return {}
+        
+        found = {}
+        gone = []
+        fields = f'{self.FILE_FIELDS},labels(trashed)'
+        for file_id, (metadata, error) in self._fetch_metadata(file_ids, fields).items():
+            if error is not None:
+                if isinstance(error, HttpError) and error.resp.status == 404:
+                    gone.append(file_id)
+                else:
+                    self.logger.warning(f"完了待ちファイル再確認エラー: {file_id} - {error}")
+                continue
+            
+            file_obj = GoogleDriveFile(auth=self.drive.auth, metadata=metadata, uploaded=True)
+            if metadata.get('labels', {}).get('trashed') or not self._is_target_file(file_obj):
+                gone.append(file_id)
+                continue
+            found[file_id] = file_obj
+        
+        with self._lock:
+            self.stats['pending_rechecks'] += len(file_ids)
+        
+        if gone:
+            self.processed_store.remove_pending_uploads(gone)
+            self.logger.info(f"削除・移動されたため完了待ちから除外: {len(gone)}個")
+        
+        return found
+    
+    def has_pending_uploads(self) -> bool:
+        """アップロード完了待ち（または未処理）のファイルがあるかどうか"""
+        return bool(self.processed_store.get_pending_uploads())
+    
+    def _load_page_token(self) -> Optional[str]:
+        """保存済みページトークンの読み込み"""
         try:
-            if processed_file.exists():
-                content = processed_file.read_text(encoding='utf-8')
-                return set(line.strip() for line in content.splitlines() if line.strip())
+            if self.page_token_file.exists():
+                token = self.page_token_file.read_text(encoding='utf-8').strip()
+                return token or None
         except Exception as e:
-            self.logger.warning(f"処理済みファイル読み込みエラー: {e}")
+            self.logger.warning(f"ページトークン読み込みエラー: {e}")
         
-        return set()
+        return None
     
-    def _add_processed_file(self, file_id: str):
-        """処理済みファイルIDを追加"""
-        processed_file = self.project_root / "data" / "processed_files.txt"
+    def _save_page_token(self, token: str):
+        """ページトークンの保存"""
+        try:
+            self.page_token_file.parent.mkdir(parents=True, exist_ok=True)
+            self.page_token_file.write_text(token, encoding='utf-8')
+        except Exception as e:
+            self.logger.error(f"ページトークン保存エラー: {e}")
+    
+    def _get_start_page_token(self) -> str:
+        """Changes APIの開始ページトークンを取得"""
+        changes = self.api.resource(self.drive.auth.service, 'changes')
+        response = self.api.execute(
+            changes.getStartPageToken(supportsAllDrives=True), http=self.session.get_http()
+        )
+        self.stats['api_requests'] += 1
+        return response['startPageToken']
+    
+    def _build_list_query(self, folder_ids: List[str]) -> str:
+        """
+        一覧取得クエリの作成
+        
+        サーバー側ではゴミ箱の除外のみ行い、拡張子の判定は_is_target_fileで行う。
+        titleのcontainsは先頭一致のため拡張子では絞り込めず、MIMEタイプも
+        application/octet-streamで登録された音声ファイルがあるため条件にしない。
+        """
+        parent_filter = " or ".join(f"'{folder_id}' in parents" for folder_id in folder_ids)
+        return f"({parent_filter}) and trashed=false"
+    
+    def _record_page(self, response: dict):
+        """取得したページ数・データ量を記録"""
+        self.stats['api_requests'] += 1
+        self.stats['pages_fetched'] += 1
+        self.stats['bytes_fetched'] += len(json.dumps(response, ensure_ascii=False).encode('utf-8'))
+    
+    def _iter_tree_pages(self, folder_ids: List[str], seen_folders: set) -> Iterator[List[GoogleDriveFile]]:
+        """
+        指定フォルダ内のファイルを一覧のページ単位で取得
+        
+        親フォルダをPARENTS_PER_QUERY件ずつまとめて問い合わせ、見つかったサブフォルダは
+        フォルダツリーに追加して同じ方法で順にたどる。複数の親を持つファイルは最初の1回だけ返す。
+        非同期クライアント使用時は、キューにあるフォルダの問い合わせを同時に進める。
+        
+        Args:
+            folder_ids: 取得するフォルダIDのリスト
+            seen_folders: 見つかったサブフォルダIDを追加する集合
+            
+        Yields:
+            ページ内のファイルオブジェクトのリスト
+        """
+        seen_files = set()
+        queue = list(folder_ids)
+        queued = set(queue)
+        auth = self.drive.auth
+        
+        while queue:
+            # (親フォルダIDの集合, クエリ, 次のページトークン) ごとに最後のページまでたどる
+            groups = [queue[i:i + self.PARENTS_PER_QUERY] for i in range(0, len(queue), self.PARENTS_PER_QUERY)]
+            cursors = [(set(group), self._build_list_query(group), None) for group in groups]
+            queue = []
+            
+            while cursors:
+                next_cursors = []
+                responses = self._iter_list_responses([(query, page_token) for _, query, page_token in cursors])
+                for (batch_ids, query, _), response in zip(cursors, responses):
+                    self._record_page(response)
+                    if response.get('nextPageToken'):
+                        next_cursors.append((batch_ids, query, response['nextPageToken']))
+                    
+                    yield from self._collect_page(response, auth, batch_ids, seen_files, seen_folders, queue, queued)
+                
+                cursors = next_cursors
+    
+    def _collect_page(self, response: dict, auth, batch_ids: set, seen_files: set, seen_folders: set,
+                      queue: List[str], queued: set) -> Iterator[List[GoogleDriveFile]]:
+        """
+        一覧の1ページからファイルを取り出し、サブフォルダはフォルダツリーとキューに追加
         
+        Yields:
+            ページ内のファイルオブジェクトのリスト（ファイルがない場合は何も返さない）
+        """
+        files = []
+        for metadata in response.get('items', []):
+            file_obj = GoogleDriveFile(auth=auth, metadata=metadata, uploaded=True)
+            if file_obj.get('mimeType') != self.FOLDER_MIME_TYPE:
+                if file_obj['id'] not in seen_files:
+                    seen_files.add(file_obj['id'])
+                    files.append(file_obj)
+                continue
+            
+            folder_id = file_obj['id']
+            parent_ids = [parent['id'] for parent in file_obj.get('parents', []) if parent['id'] in batch_ids]
+            self.folder_tree.update_folder(folder_id, parent_ids, file_obj.get('title', ''))
+            if not self.folder_tree.contains(folder_id):
+                continue
+            
+            seen_folders.add(folder_id)
+            if folder_id not in queued:
+                queue.append(folder_id)
+                queued.add(folder_id)
+        
+        if files:
+            yield files
+    
+    def _iter_list_responses(self, requests: List[tuple]) -> Iterator[dict]:
+        """
+        一覧の1ページ分ずつの応答を取得
+        
+        同期クライアントでは必要になった時点で1件ずつ取得し（最初のページから処理を始められる）、
+        非同期クライアントではすべて同時に取得してから順に返す。
+        
+        Args:
+            requests: (クエリ, ページトークン) のリスト
+            
+        Yields:
+            files.listの応答（requestsと同じ順）
+        """
+        if self.async_client is not None:
+            for response in self.async_client.run_all(self._list_page_async(query, token) for query, token in requests):
+                if isinstance(response, BaseException):
+                    raise response
+                yield response
+            return
+        
+        # ページ単位でリトライするためListFileは使わずに直接ページをたどる
+        files_resource = self.api.resource(self.drive.auth.service, 'files')
+        http = self.session.get_http()
+        for query, page_token in requests:
+            with self.metrics.stage('list_page'):
+                response = self.api.execute(
+                    files_resource.list(
+                        q=query,
+                        fields=self.LIST_FIELDS,
+                        maxResults=self.MAX_PAGE_SIZE,
+                        pageToken=page_token,
+                    ),
+                    http=http,
+                )
+            yield response
+    
+    async def _list_page_async(self, query: str, page_token: Optional[str]) -> dict:
+        """非同期クライアントでの一覧の1ページ分の取得"""
+        started_at = time.perf_counter()
         try:
-            # dataディレクトリを確保
-            processed_file.parent.mkdir(parents=True, exist_ok=True)
+            return await self.async_client.list_files(query, self.LIST_FIELDS, page_token, self.MAX_PAGE_SIZE)
+        finally:
+            self.metrics.observe('list_page', time.perf_counter() - started_at)
+    
+    def _iter_folder_pages(self) -> Iterator[List[GoogleDriveFile]]:
+        """監視フォルダツリー内のファイルをページ単位で全件取得（最後までたどった時点でフォルダツリーも更新）"""
+        seen_folders = set()
+        yield from self._iter_tree_pages(self.folder_tree.folder_ids(), seen_folders)
+        self.folder_tree.complete_scan(seen_folders)
+        
+        self.stats['full_listings'] += 1
+    
+    def _list_changed_files(self, page_token: str) -> List[GoogleDriveFile]:
+        """
+        前回のページトークン以降に変更されたファイルを取得
+        
+        Args:
+            page_token: 保存済みページトークン
             
-            with open(processed_file, 'a', encoding='utf-8') as f:
-                f.write(f"{file_id}\n")
-        except Exception as e:
-            self.logger.error(f"処理済みファイル追加エラー: {e}")
+        Returns:
+            対象フォルダ内で変更されたファイルのリスト
+            
+        Raises:
+            InvalidPageTokenError: ページトークンが無効な場合
+        """
+        changes = self.api.resource(self.drive.auth.service, 'changes')
+        http = self.session.get_http()
+        changed_files = {}
+        changed_folders = {}
+        
+        while page_token:
+            try:
+                with self.metrics.stage('changes_page'):
+                    response = self.api.execute(
+                        changes.list(
+                            pageToken=page_token,
+                            maxResults=self.MAX_PAGE_SIZE,
+                            includeDeleted=False,
+                            supportsAllDrives=True,
+                            includeItemsFromAllDrives=True,
+                            fields=self.CHANGES_FIELDS,
+                        ),
+                        http=http,
+                    )
+            except HttpError as e:
+                if e.resp.status in self.INVALID_TOKEN_STATUSES:
+                    raise InvalidPageTokenError(str(e)) from e
+                raise
+            self._record_page(response)
+            
+            for change in response.get('items', []):
+                file_metadata = change.get('file')
+                if change.get('deleted') or not file_metadata:
+                    continue
+                
+                # 同一ファイルは最新の変更で上書き
+                if file_metadata.get('mimeType') == self.FOLDER_MIME_TYPE:
+                    changed_folders[file_metadata['id']] = file_metadata
+                else:
+                    changed_files[file_metadata['id']] = file_metadata
+            
+            if 'newStartPageToken' in response:
+                self._pending_page_token = response['newStartPageToken']
+            page_token = response.get('nextPageToken')
+        
+        self.stats['changes_polls'] += 1
+        
+        # フォルダの変更を先に反映（新しく加わったフォルダは中身を取得）
+        new_folders = []
+        for folder_id, metadata in changed_folders.items():
+            if metadata.get('labels', {}).get('trashed'):
+                self.folder_tree.remove_folder(folder_id)
+                continue
+            parent_ids = [parent['id'] for parent in metadata.get('parents', [])]
+            if self.folder_tree.update_folder(folder_id, parent_ids, metadata.get('title', '')):
+                new_folders.append(folder_id)
+        
+        files = {}
+        if new_folders:
+            self.logger.info(f"監視対象に加わったフォルダの中身を取得: {len(new_folders)}フォルダ")
+            for page in self._iter_tree_pages(new_folders, set()):
+                files.update((file_obj['id'], file_obj) for file_obj in page)
+        
+        for file_id, metadata in changed_files.items():
+            # ゴミ箱内のファイルは対象外
+            if metadata.get('labels', {}).get('trashed'):
+                continue
+            
+            # 監視フォルダツリー内のファイルのみ
+            if self.folder_tree.locate(parent['id'] for parent in metadata.get('parents', [])) is not None:
+                files[file_id] = GoogleDriveFile(auth=self.drive.auth, metadata=metadata, uploaded=True)
+        
+        return list(files.values())
+    
+    def _iter_candidate_pages(self) -> Iterator[List[GoogleDriveFile]]:
+        """
+        監視対象の候補ファイルをページ単位で取得（差分モード時はChanges APIを優先）
+        
+        差分は同じファイルの変更を最新のものにまとめるため全ページ取得後に1回で返す。
+        """
+        if not self.use_changes_feed:
+            yield from self._iter_folder_pages()
+            return
+        
+        # フォルダツリーが未構築の場合は全件取得で構築する
+        page_token = self._load_page_token()
+        if page_token and self.folder_tree.is_built:
+            try:
+                changed_files = self._list_changed_files(page_token)
+            except InvalidPageTokenError as e:
+                self.logger.warning(f"ページトークンが無効なため全件取得に切り替え: {e}")
+            else:
+                yield changed_files
+                return
+        
+        # 全件取得中の変更を取りこぼさないよう先に開始トークンを取得
+        self._pending_page_token = self._get_start_page_token()
+        yield from self._iter_folder_pages()
+    
+    def watch_changes(self, address: str, channel_id: str, token: str, ttl_sec: int) -> dict:
+        """
+        Changes APIの変更通知チャンネルを登録
+        
+        Args:
+            address: 通知先URL
+            channel_id: チャンネルID
+            token: 通知に付与される検証用トークン
+            ttl_sec: 有効期間（秒）
+            
+        Returns:
+            チャンネル情報（resourceId, expirationを含む）
+        """
+        page_token = self._load_page_token() or self._get_start_page_token()
+        body = {
+            'id': channel_id,
+            'type': 'web_hook',
+            'address': address,
+            'token': token,
+            'expiration': int((time.time() + ttl_sec) * 1000),
+        }
+        changes = self.api.resource(self.drive.auth.service, 'changes')
+        response = self.api.execute(
+            changes.watch(
+                pageToken=page_token,
+                body=body,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True,
+            ),
+            http=self.session.get_http(),
+        )
+        self.stats['api_requests'] += 1
+        return response
+    
+    def stop_channel(self, channel_id: str, resource_id: str):
+        """変更通知チャンネルの停止"""
+        channels = self.api.resource(self.drive.auth.service, 'channels')
+        self.api.execute(
+            channels.stop(body={'id': channel_id, 'resourceId': resource_id}),
+            http=self.session.get_http(),
+        )
+        self.stats['api_requests'] += 1
+    
+    def commit_page_token(self):
+        """
+        今回の監視で取得したページトークンを保存
+        
+        全ファイルの処理が成功した後に呼び出す。失敗したファイルがある場合は
+        保存しないことで、次回の監視で同じ差分を再取得する。
+        """
+        if self._pending_page_token:
+            self._save_page_token(self._pending_page_token)
+            self.logger.debug("ページトークンを保存: %s", self._pending_page_token)
+            self._pending_page_token = None
     
     def check_for_new_files(self) -> List[dict]:
         """
@@ -171,87 +634,432 @@ class DriveMonitor:
         Returns:
             新しい音声ファイルのリスト（辞書形式）
         """
+        return [file_info for batch in self.iter_new_files() for file_info in batch]
+    
+    def iter_new_files(self) -> Iterator[List[dict]]:
+        """
+        新しいファイルを一覧のページ単位で順に取得
+        
+        最初のページが届いた時点でダウンロードを始められるよう、ページごとに処理済みの
+        確認とアップロード完了の判定を行って返す。完了待ちの観測記録とフォルダツリーは
+        最後までたどった時点で保存する。
+        
+        Yields:
+            新しい音声ファイルのリスト（辞書形式）
+        """
+        started_at = time.perf_counter()
         try:
             self.logger.info("Google Driveフォルダを監視中...")
             
-            # 処理済みファイルリスト取得
-            processed_files = self._get_processed_files()
+            pages_before = self.stats['pages_fetched']
+            bytes_before = self.stats['bytes_fetched']
             
-            # 対象フォルダ内のファイル一覧を取得
-            query = f"'{self.target_folder_id}' in parents and trashed=false"
-            file_list = self.drive.ListFile({'q': query}).GetList()
+            pending = self.processed_store.get_pending_uploads()
+            observations = {}
+            listed_ids = set()
+            listed_count = 0
             
-            new_files = []
-            self.logger.info(f"{len(file_list)}個のファイルを検出")
+            # 対象フォルダ内のファイル一覧を取得（差分モード時は変更分のみ）
+            for page in self._iter_candidate_pages():
+                listed_count += len(page)
+                listed_ids.update(file_obj['id'] for file_obj in page)
+                new_files = self._select_new_files(page, pending, observations)
+                if new_files:
+                    yield new_files
             
-            for file_obj in file_list:
-                file_id = file_obj['id']
-                file_title = file_obj.get('title', '')
-                
-                # 既に処理済みか確認
-                if file_id in processed_files:
-                    self.logger.debug(f"処理済みファイルをスキップ: {file_title}")
-                    continue
-                
-                # 対象ファイルか確認
-                if not self._is_target_file(file_obj):
-                    continue
-                
-                # アップロード完了か確認
-                if not self._is_upload_complete(file_obj):
-                    self.logger.info(f"アップロード未完了: {file_title} (後で再確認)")
-                    continue
-                
-                # ファイル情報を辞書形式で格納
-                file_info = {
-                    'id': file_id,
-                    'name': file_title,
-                    'size': file_obj.get('fileSize', '0'),
-                    'md5Checksum': file_obj.get('md5Checksum', ''),
-                    'mimeType': file_obj.get('mimeType', ''),
-                    'modifiedTime': file_obj.get('modifiedDate', ''),
-                    'parents': [{'id': parent['id']} for parent in file_obj.get('parents', [])]
-                }
-                
-                new_files.append(file_info)
-                self.logger.info(f"新規ファイル検出: {file_title}")
+            self.logger.info(f"{listed_count}個のファイルを検出")
+            self.logger.info(
+                f"一覧取得量: {self.stats['pages_fetched'] - pages_before}ページ, "
+                f"{(self.stats['bytes_fetched'] - bytes_before)/1024:.1f}KB"
+            )
+            
+            # 完了待ちのうち今回の一覧に含まれないものはID指定で再確認
+            recheck_ids = [file_id for file_id in pending if file_id not in listed_ids]
+            rechecked = self._recheck_pending(recheck_ids)
+            new_files = self._select_new_files(list(rechecked.values()), pending, observations)
             
-            return new_files
+            self.processed_store.save_pending_uploads(observations)
+            self.folder_tree.save()
+            if new_files:
+                yield new_files
             
         except Exception as e:
+            # 途中まで取得した差分の位置は保存しない（次回同じ位置から再取得）
+            self._pending_page_token = None
+            if self.api.is_retryable(e):
+                self.logger.warning(f"APIの一時的なエラーが続いたため今回の監視を中断（次回再試行）: {e}")
+                return
             self.logger.error(f"ファイルチェック中にエラー: {e}")
             raise
+        
+        finally:
+            self.metrics.observe('scan', time.perf_counter() - started_at)
     
-    def mark_file_processed(self, file_id: str):
-        """ファイルを処理済みとしてマーク"""
-        self._add_processed_file(file_id)
-        self.logger.debug(f"処理済みファイルに追加: {file_id}")
+    def _select_new_files(self, file_list: List[GoogleDriveFile], pending: Dict[str, PendingUpload],
+                          observations: Dict[str, PendingUpload]) -> List[dict]:
+        """
+        取得したファイルから処理対象を選ぶ
+        
+        Args:
+            file_list: 一覧・再確認で取得したファイル
+            pending: 前回までの完了待ちの観測記録
+            observations: 更新した観測記録を追加する辞書
+            
+        Returns:
+            アップロードが完了した新しいファイル（辞書形式）
+        """
+        # 取得したファイルのうち処理済みのものをまとめて確認
+        processed_files = self.processed_store.filter_processed(file_obj['id'] for file_obj in file_list)
+        
+        new_files = []
+        now = time.time()
+        for file_obj in file_list:
+            file_id = file_obj['id']
+            file_title = file_obj.get('title', '')
+            
+            # 既に処理済みか確認
+            if file_id in processed_files:
+                self.logger.debug("処理済みファイルをスキップ: %s", file_title)
+                continue
+            
+            # 対象ファイルか確認
+            if not self._is_target_file(file_obj):
+                continue
+            
+            # 観測記録を更新（処理済みになるまで保持）
+            observation = self._observe_upload(file_obj, pending.get(file_id), now)
+            if observation is not pending.get(file_id):
+                observations[file_id] = observation
+            
+            # アップロード完了か確認
+            if not self._is_upload_complete(file_obj, observation, now):
+                self.logger.info("アップロード未完了: %s (後で再確認)", file_title)
+                continue
+            
+            # ファイル情報を辞書形式で格納（ダウンロード・削除時に再取得しないようキャッシュ）
+            self._cache_metadata(file_obj)
+            new_files.append(self._to_file_info(file_obj))
+            self.logger.info("新規ファイル検出: %s", file_title)
+        
+        return new_files
     
-    def get_file_details(self, file_id: str) -> Optional[dict]:
-        """ファイルの詳細情報を取得"""
+    def mark_file_processed(self, file_id: str, remote_deleted: bool = False):
+        """
+        ファイルを処理済みとしてマーク
+        
+        Args:
+            file_id: ファイルID
+            remote_deleted: Google Driveから削除済みかどうか（保持期間管理に使用）
+        """
         try:
-            file_obj = self.drive.CreateFile({'id': file_id})
-            file_obj.FetchMetadata()
-            
-            return {
-                'id': file_obj['id'],
-                'name': file_obj.get('title', ''),
-                'size': file_obj.get('fileSize', '0'),
-                'md5Checksum': file_obj.get('md5Checksum', ''),
-                'mimeType': file_obj.get('mimeType', ''),
-                'modifiedTime': file_obj.get('modifiedDate', ''),
-                'parents': [{'id': parent['id']} for parent in file_obj.get('parents', [])]
-            }
+            self.processed_store.add(file_id, remote_deleted=remote_deleted)
+            self.logger.debug("処理済みファイルに追加: %s", file_id)
         except Exception as e:
-            self.logger.error(f"ファイル詳細取得エラー: {e}")
-            return None
+            self.logger.error(f"処理済みファイル追加エラー: {e}")
+    
+    def commit_processed(self) -> bool:
+        """
+        処理済みファイルの追加・処理段階の記録をまとめて保存
+        
+        Returns:
+            保存に成功した場合True
+        """
+        try:
+            self.processed_store.commit()
+            return True
+        except Exception as e:
+            self.logger.error(f"処理済みファイル保存エラー: {e}")
+            return False
+    
+    def record_file_state(self, file_id: str, state: str, file_info: Optional[dict] = None, **fields):
+        """
+        ファイルの処理段階をジャーナルに記録（保存はcommit_processedでまとめて行う）
+        
+        Args:
+            file_id: ファイルID
+            state: 処理段階（discovered, downloading, verified, finalized, remote_deleted）
+            file_info: ファイル情報（最初の記録時に指定）
+            **fields: temp_path, final_path, md5
+        """
+        try:
+            self.processed_store.record_state(file_id, state, file_info, **fields)
+        except Exception as e:
+            self.logger.error(f"処理段階の記録エラー: {file_id} ({state}) - {e}")
+    
+    def get_unfinished_files(self) -> Dict[str, JournalEntry]:
+        """前回までに処理が完了しなかったファイルのジャーナル"""
+        try:
+            return self.processed_store.get_journal()
+        except Exception as e:
+            self.logger.error(f"ジャーナル読み込みエラー: {e}")
+            return {}
+    
+    def compact_state(self):
+        """保持期間を過ぎた処理済みIDの削除"""
+        try:
+            self.processed_store.compact()
+        except Exception as e:
+            self.logger.warning(f"処理済みファイル圧縮エラー: {e}")
+    
+    def close(self):
+        """状態ストア・非同期クライアントを閉じる"""
+        self.processed_store.close()
+        if self.async_client is not None:
+            self.async_client.close()
+    
+    def get_file_details(self, file_id: str) -> Optional[dict]:
+        """ファイルの詳細情報を取得（キャッシュが有効な場合はAPIを呼ばない）"""
+        return self.get_files_details([file_id])[file_id]
+    
+    def get_files_details(self, file_ids: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """
+        複数ファイルの詳細情報をまとめて取得
+        
+        キャッシュにないものだけをバッチリクエスト（BATCH_LIMIT件ずつ）で取得する。
+        
+        Args:
+            file_ids: ファイルIDのリスト
+            
+        Returns:
+            ファイルIDごとの詳細情報（取得失敗時はNone）
+        """
+        details = {}
+        missing = []
+        for file_id in file_ids:
+            metadata = self._get_cached_metadata(file_id)
+            if metadata is not None:
+                with self._lock:
+                    self.stats['metadata_calls_saved'] += 1
+                details[file_id] = self._to_file_info(metadata)
+            else:
+                missing.append(file_id)
+        
+        if missing:
+            for file_id, (metadata, error) in self._fetch_metadata(missing, self.FILE_FIELDS).items():
+                if error is not None:
+                    self.logger.error(f"ファイル詳細取得エラー: {file_id} - {error}")
+                    details[file_id] = None
+                    continue
+                self._cache_metadata(metadata)
+                details[file_id] = self._to_file_info(metadata)
+        
+        return details
     
-    def get_drive_file(self, file_id: str) -> Optional[GoogleDriveFile]:
-        """PyDrive2のファイルオブジェクトを取得"""
+    def _fetch_metadata(self, file_ids: List[str], fields: str) -> dict:
+        """
+        メタデータをバッチリクエストで取得（キャッシュは使用しない）
+        
+        Returns:
+            ファイルID -> (メタデータ, 例外)
+        """
+        files_resource = self.api.resource(self.drive.auth.service, 'files')
+        requests = {
+            file_id: files_resource.get(fileId=file_id, fields=fields, supportsAllDrives=True)
+            for file_id in file_ids
+        }
+        with self.metrics.stage('metadata_batch'):
+            results = self._execute_batch(requests)
+        
+        with self._lock:
+            self.stats['metadata_fetches'] += sum(1 for _, error in results.values() if error is None)
+        return results
+    
+    def delete_files(self, file_ids: Iterable[str]) -> Dict[str, Optional[Exception]]:
+        """
+        複数ファイルをバッチリクエストでGoogle Driveから削除
+        
+        既に存在しないファイル（404）は削除済みとして扱う。
+        
+        Args:
+            file_ids: 削除するファイルIDのリスト
+            
+        Returns:
+            ファイルIDごとのエラー（成功時はNone）
+        """
+        files_resource = self.api.resource(self.drive.auth.service, 'files')
+        requests = {
+            file_id: files_resource.delete(fileId=file_id, supportsAllDrives=True)
+            for file_id in file_ids
+        }
+        
+        with self.metrics.stage('delete_batch'):
+            batch_results = self._execute_batch(requests)
+        
+        results = {}
+        for file_id, (_, error) in batch_results.items():
+            if isinstance(error, HttpError) and error.resp.status == 404:
+                self.logger.debug("削除対象ファイルは既に存在しません: %s", file_id)
+                error = None
+            if error is None:
+                self.invalidate_metadata(file_id)
+            results[file_id] = error
+        
+        return results
+    
+    def _execute_batch(self, requests: dict) -> dict:
+        """
+        リクエストをBATCH_LIMIT件ずつバッチで実行
+        
+        バッチ全体の一時的なエラーはバッチごと、個別のリクエストの一時的なエラー
+        （レート制限など）は失敗したものだけを次のバッチにまとめて再試行する。
+        流量制限の枠は送信のたびに中のリクエスト数だけ消費する。
+        
+        Args:
+            requests: リクエストID -> HttpRequest
+            
+        Returns:
+            リクエストID -> (レスポンス, 例外)。個別の失敗は例外として格納
+        """
+        results = {}
+        
+        def callback(request_id, response, exception):
+            results[request_id] = (response, exception)
+        
+        service = self.drive.auth.service
+        http = self.session.get_http()
+        items = list(requests.items())
+        attempt = 0
+        while items:
+            # バッチ全体の失敗はapi.callでリトライ済みのため個別の再試行から除く
+            batch_failed = set()
+            for i in range(0, len(items), self.BATCH_LIMIT):
+                chunk = items[i:i + self.BATCH_LIMIT]
+                
+                def execute_chunk():
+                    batch = service.new_batch_http_request(callback=callback)
+                    for request_id, request in chunk:
+                        batch.add(request, request_id=request_id)
+                    batch.execute(http=http)
+                
+                try:
+                    self.api.call(execute_chunk, f"バッチリクエスト({len(chunk)}件)", cost=len(chunk))
+                except Exception as e:
+                    # バッチ全体の失敗は各リクエストの失敗として返す
+                    for request_id, _ in chunk:
+                        results.setdefault(request_id, (None, e))
+                        batch_failed.add(request_id)
+                
+                with self._lock:
+                    self.stats['api_requests'] += 1
+                    self.stats['batch_requests'] += 1
+                    self.stats['batched_calls'] += len(chunk)
+            
+            # 一時的なエラーで失敗したリクエストだけを待機後に再試行
+            retry_items = []
+            delay = 0.0
+            for request_id, request in items:
+                error = results[request_id][1]
+                if error is None or request_id in batch_failed:
+                    continue
+                error_delay = self.api.retry_delay(error, attempt)
+                if error_delay is not None:
+                    retry_items.append((request_id, request))
+                    delay = max(delay, error_delay)
+            
+            if retry_items:
+                attempt += 1
+                self.logger.warning(
+                    f"バッチ内の{len(retry_items)}件が一時的なエラーのため{delay:.1f}秒後に再試行 "
+                    f"({attempt}/{self.api.max_retries})"
+                )
+                time.sleep(delay)
+                for request_id, _ in retry_items:
+                    del results[request_id]
+            items = retry_items
+        
+        return results
+    
+    def get_drive_file(self, file_id: str, file_info: Optional[dict] = None) -> Optional[GoogleDriveFile]:
+        """
+        PyDrive2のファイルオブジェクトを取得
+        
+        一覧取得時のメタデータがキャッシュにあればFetchMetadataを省略する。
+        
+        Args:
+            file_id: ファイルID
+            file_info: 呼び出し側が保持するファイル情報（キャッシュの鮮度確認用）
+            
+        Returns:
+            ファイルオブジェクト、取得失敗時はNone
+        """
+        metadata = self._get_cached_metadata(file_id, file_info)
+        if metadata is not None:
+            with self._lock:
+                self.stats['metadata_calls_saved'] += 1
+            return GoogleDriveFile(auth=self.drive.auth, metadata=metadata, uploaded=True)
+        
         try:
             file_obj = self.drive.CreateFile({'id': file_id})
-            file_obj.FetchMetadata()
+            with self.metrics.stage('metadata'):
+                self.api.call(lambda: file_obj.FetchMetadata(fields=self.FILE_FIELDS), f"メタデータ取得: {file_id}")
+            with self._lock:
+                self.stats['metadata_fetches'] += 1
+            self._cache_metadata(file_obj)
             return file_obj
         except Exception as e:
             self.logger.error(f"Driveファイル取得エラー: {e}")
-            return None
\ No newline at end of file
+            return None
+    
+    def invalidate_metadata(self, file_id: str):
+        """キャッシュ済みメタデータの破棄"""
+        with self._cache_lock:
+            self._metadata_cache.pop(file_id, None)
+    
+    def _cache_metadata(self, file_obj: GoogleDriveFile):
+        """
+        メタデータをキャッシュに保存
+        
+        常駐中も増え続けないよう、有効期限切れと最大件数を超えた分を古いものから破棄する。
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            self._metadata_cache.pop(file_obj['id'], None)
+            self._metadata_cache[file_obj['id']] = (now, dict(file_obj))
+            while self._metadata_cache:
+                cached_at, _ = next(iter(self._metadata_cache.values()))
+                if (now - cached_at <= self.metadata_cache_ttl
+                        and len(self._metadata_cache) <= self.MAX_METADATA_CACHE_ENTRIES):
+                    break
+                self._metadata_cache.popitem(last=False)
+    
+    def _get_cached_metadata(self, file_id: str, file_info: Optional[dict] = None) -> Optional[dict]:
+        """
+        有効なキャッシュ済みメタデータを取得
+        
+        有効期限切れ、または呼び出し側のmodifiedDate/MD5と異なる場合はNone
+        """
+        with self._cache_lock:
+            entry = self._metadata_cache.get(file_id)
+        if entry is None:
+            return None
+        
+        cached_at, metadata = entry
+        if time.monotonic() - cached_at > self.metadata_cache_ttl:
+            self.invalidate_metadata(file_id)
+            return None
+        
+        if file_info is not None:
+            if file_info.get('modifiedTime') and file_info['modifiedTime'] != metadata.get('modifiedDate'):
+                return None
+            if file_info.get('md5Checksum') and file_info['md5Checksum'] != metadata.get('md5Checksum'):
+                return None
+        
+        return metadata
+    
+    def _to_file_info(self, file_obj: GoogleDriveFile) -> dict:
+        """ファイルオブジェクトを辞書形式に変換（保存先はフォルダツリーから決定）"""
+        parents = [{'id': parent['id']} for parent in file_obj.get('parents', [])]
+        location = self.folder_tree.locate(parent['id'] for parent in parents)
+        root, relative_dir = location if location is not None else ({}, '')
+        
+        return {
+            'id': file_obj['id'],
+            'name': file_obj.get('title', ''),
+            'size': file_obj.get('fileSize', '0'),
+            'md5Checksum': file_obj.get('md5Checksum', ''),
+            'mimeType': file_obj.get('mimeType', ''),
+            'modifiedTime': file_obj.get('modifiedDate', ''),
+            'parents': parents,
+            'download_path': root.get('download_path'),
+            'relative_dir': relative_dir,
+        }
\ No newline at end of file
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機能:
+- PyDrive2認証セッションの共有（1回の実行につき1回だけ認証）
+- 有効期限が近づいた時だけトークンを遅延更新
+- 認証・トークン更新回数の統計
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from pydrive2.auth import GoogleAuth
+from pydrive2.drive import GoogleDrive
+
+from .metrics import MetricsRecorder
+
+
+class DriveSession:
+    """Google Drive認証セッションクラス（PyDrive2版）"""
+    
+    # 有効期限までの残り時間がこれを下回ったらトークンを更新
+    DEFAULT_REFRESH_MARGIN_SEC = 300
+    
+    def __init__(self, config: dict):
+        """
+        初期化
+        
+        Args:
+            config: 設定辞書
+        """
+        self.config = config
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.project_root = Path(__file__).parent.parent
+        
+        # 認証ファイル設定
+        drive_config = config['google_drive']
+        self.settings_file = self.project_root / "config" / "settings.yaml"
+        self.client_secrets_file = self.project_root / "config" / drive_config['client_secrets_file']
+        self.credentials_file = self.project_root / "config" / drive_config['credentials_file']
+        self.refresh_margin = timedelta(
+            seconds=drive_config.get('token_refresh_margin_sec', self.DEFAULT_REFRESH_MARGIN_SEC)
+        )
+        
+        # 実行ごとの統計
+        self.stats = {
+            'auth_calls': 0,
+            'token_refreshes': 0,
+        }
+        
+        # 認証・トークン更新の所要時間
+        self.metrics = MetricsRecorder()
+        
+        # Google Drive認証（トークン更新は複数スレッドから呼ばれるためロックで保護）
+        self._refresh_lock = threading.Lock()
+        self.gauth = None
+        self._drive = None
+        self._authenticate()
+    
+    @property
+    def drive(self) -> GoogleDrive:
+        """認証済みGoogleDriveオブジェクト（必要な場合のみトークン更新）"""
+        self.ensure_token()
+        return self._drive
+    
+    def _authenticate(self):
+        """PyDrive2による認証"""
+        started_at = time.perf_counter()
+        try:
+            self.stats['auth_calls'] += 1
+            
+            # client_secrets.jsonの確認
+            if not self.client_secrets_file.exists():
+                raise FileNotFoundError(f"client_secrets.jsonが見つかりません: {self.client_secrets_file}")
+            
+            # settings.yamlの確認
+            if not self.settings_file.exists():
+                raise FileNotFoundError(f"settings.yamlが見つかりません: {self.settings_file}")
+            
+            # PyDrive2認証（settings.yamlを使用）
+            gauth = GoogleAuth(str(self.settings_file))
+            
+            # 既存の認証情報確認
+            if self.credentials_file.exists():
+                self.logger.info("既存の認証情報を読み込み中...")
+                gauth.LoadCredentialsFile(str(self.credentials_file))
+            
+            # 認証情報が無効または存在しない場合
+            if gauth.credentials is None:
+                self.logger.info("新規認証を実行中...")
+                gauth.LocalWebserverAuth()
+            elif gauth.access_token_expired:
+                self.logger.info("トークンを更新中...")
+                gauth.Refresh()
+                self.stats['token_refreshes'] += 1
+            else:
+                self.logger.info("既存の認証情報を使用")
+                gauth.Authorize()
+            
+            # 認証情報を保存
+            gauth.SaveCredentialsFile(str(self.credentials_file))
+            
+            # Google Driveオブジェクトを作成
+            self.gauth = gauth
+            self._drive = GoogleDrive(gauth)
+            self.logger.info("Google Drive認証完了")
+        
+        except Exception as e:
+            self.logger.error(f"Google Drive認証エラー: {e}")
+            raise
+        
+        finally:
+            self.metrics.observe('auth', time.perf_counter() - started_at)
+    
+    def _token_expires_soon(self) -> bool:
+        """トークンの有効期限が近いかどうかの判定"""
+        credentials = self.gauth.credentials
+        if credentials is None:
+            return True
+        
+        token_expiry = getattr(credentials, 'token_expiry', None)
+        if token_expiry is None:
+            return credentials.access_token_expired
+        
+        # oauth2clientのtoken_expiryはUTCのnaive datetime
+        return token_expiry - datetime.utcnow() < self.refresh_margin
+    
+    def ensure_token(self, force: bool = False):
+        """
+        有効期限が近い場合のみトークンを更新
+        
+        Args:
+            force: 有効期限にかかわらず更新する（APIが401を返した場合など）
+        """
+        if not force and not self._token_expires_soon():
+            return
+        
+        with self._refresh_lock:
+            # 他スレッドが更新済みの場合は何もしない
+            if not force and not self._token_expires_soon():
+                return
+            
+            try:
+                self.logger.info("トークンを更新中..." if force else "トークンの有効期限が近いため更新中...")
+                with self.metrics.stage('token_refresh'):
+                    self.gauth.Refresh()
+                    self.gauth.SaveCredentialsFile(str(self.credentials_file))
+                self.stats['token_refreshes'] += 1
+            except Exception as e:
+                self.logger.error(f"トークン更新エラー: {e}")
+                raise
+    
+    def get_http(self):
+        """スレッドごとのHTTPオブジェクトを取得（PyDrive2のLoadAuthと同じ方式）"""
+        thread_local = self.gauth.thread_local
+        if not getattr(thread_local, 'http', None):
+            thread_local.http = self.gauth.Get_Http_Object()
+        return thread_local.http
+    
+    def get_stats(self) -> dict:
+        """実行ごとの統計を取得"""
+        return dict(self.stats)
@@ -6,67 +6,310 @@
 - ディスク容量管理
 - ファイル整合性確認
 - 自動クリーンアップ
+- 並列ダウンロード（ワーカー数・帯域の上限付き）
+- ストリーミングダウンロード（書き込みと同時にMD5計算）
+- 中断したダウンロードのRange指定による再開（一時的なAPIエラーはチャンク単位で再試行）
+- 大容量ファイルの分割並列ダウンロード
+- 優先度・サイズを考慮したダウンロード順序と実行ごとの上限
+- 実行中のダウンロード全体でのディスク容量予約
+- 保存先と同じボリュームの一時ファイルと置き換えによる最終配置
+- MD5索引による重複ダウンロードの防止（ハードリンク・スキップ）と同名ファイルの連番付与
+- 処理段階のジャーナル記録と中断後の再開（Drive削除前にジャーナルと配置済みファイルを同期）
+- 非同期クライアントによる多数ファイルの同時ダウンロード（async_client有効時）
 """
 
+import asyncio
 import os
 import hashlib
+import itertools
+import json
 import logging
 import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, List, NamedTuple, Optional, Tuple
 
+from googleapiclient.errors import HttpError
 from pydrive2.files import GoogleDriveFile
 
+from .content_index import LocalFileIndex
+from .disk_ledger import DiskSpaceLedger
+from .metrics import MetricsRecorder
+from .pipeline import ProcessingPipeline
+from .rate_limiter import TokenBucket
+from .scheduler import DownloadScheduler
+
+
+class DownloadedFile(NamedTuple):
+    """転送済みファイル（整合性確認・最終配置の前）"""
+    temp_file: Optional[Path]
+    size: int
+    md5: Optional[str]
+    final_file: Optional[Path] = None
+
 
 class FileProcessor:
     """ファイル処理クラス（PyDrive2版）"""
     
-    def __init__(self, config: dict):
+    # 保存先がdata/tempと別ボリュームの場合に保存先の下に作成する一時フォルダ名
+    VOLUME_TEMP_DIR_NAME = ".autosync_temp"
+    
+    # ローカルに同じ内容のファイルがある場合の扱い
+    DUPLICATE_ACTIONS = ('link', 'skip', 'off')
+    
+    # ボリューム間コピーの1回あたりの転送量
+    COPY_BLOCK_SIZE = 8 * 1024 * 1024
+    
+    # ジャーナルから再開する処理段階（それより前の段階は一覧から通常どおり処理する）
+    RESUMABLE_STATES = ('verified', 'finalized', 'remote_deleted')
+    
+    def __init__(self, config: dict, drive_monitor=None):
         """
         初期化
         
         Args:
             config: 設定辞書
+            drive_monitor: 共有するDriveMonitorインスタンス（省略時は初回使用時に作成）
         """
         self.config = config
         self.logger = logging.getLogger(self.__class__.__name__)
         self.project_root = Path(__file__).parent.parent
+        self.drive_monitor = drive_monitor
+        
+        # 状態ファイルの保存先（相対パスはプロジェクトルート基準）
+        self.data_dir = self.project_root / config.get('state', {}).get('data_dir', 'data')
         
         # ダウンロード設定
         self.download_path = Path(config['file_processing']['download_path'])
-        self.temp_path = self.project_root / "data" / "temp"
+        self.temp_path = self.data_dir / "temp"
+        
+        # 保存先ルート -> 同じボリューム上の一時フォルダ
+        self._temp_dirs = {}
         
         # 処理設定
         self.chunk_size = config['file_processing']['chunk_size_mb'] * 1024 * 1024
         self.min_free_space = config['file_processing']['min_free_space_gb'] * 1024 * 1024 * 1024
         
+        # 並列処理設定（帯域上限は全ワーカー共通、0は無制限）
+        self.max_workers = max(1, config['file_processing'].get('max_workers', 1))
+        max_bandwidth_mbps = config['file_processing'].get('max_bandwidth_mbps', 0)
+        self.bandwidth_limiter = TokenBucket(max_bandwidth_mbps * 1024 * 1024 / 8)
+        
+        # 分割ダウンロード設定（しきい値以上のファイルを複数接続で取得、0は無効）
+        self.segment_threshold = config['file_processing'].get('segmented_download_threshold_mb', 0) * 1024 * 1024
+        self.segment_count = config['file_processing'].get('segment_count', 4)
+        
+        # ダウンロード順序・実行ごとの上限
+        self.scheduler = DownloadScheduler(config)
+        
+        # ディスク容量の予約（同時に実行するダウンロード分をまとめて管理）
+        self.disk_ledger = DiskSpaceLedger(self.min_free_space)
+        
+        # 重複ダウンロード防止（link: 既存ファイルへのハードリンク、skip: 既存ファイルを使用、off: 無効）
+        self.duplicate_action = config['file_processing'].get('duplicate_action', 'link')
+        if self.duplicate_action not in self.DUPLICATE_ACTIONS:
+            self.logger.warning(f"不明なduplicate_actionのため重複確認を無効にします: {self.duplicate_action}")
+            self.duplicate_action = 'off'
+        
+        # ダウンロード先全体を走査して索引を更新する間隔（秒、このツールで保存したファイルは都度追加）
+        self.index_refresh_interval = config['file_processing'].get('index_refresh_interval_sec', 3600)
+        self._content_index = None
+        
+        # 同名ファイルの連番付与と配置を直列化
+        self._name_lock = threading.Lock()
+        
+        # 前回までに完了しなかったファイルのジャーナル（process_streamの開始時に読み込む）
+        self._journal = {}
+        
+        # 統計（プロセス開始からの累計、実行ごとの値は開始時点との差分で求める）
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'files_downloaded': 0,
+            'bytes_downloaded': 0,
+            'download_seconds': 0.0,
+            'finalize_seconds': 0.0,
+            'finalize_copies': 0,
+            'duplicates_reused': 0,
+            'duplicates_in_destination': 0,
+            'duplicate_bytes_saved': 0,
+            'journal_resumed': 0,
+        }
+        
+        # 転送・MD5計算・配置などの段階ごとの所要時間
+        self.metrics = MetricsRecorder()
+        
         # ディレクトリ作成
         self.download_path.mkdir(parents=True, exist_ok=True)
         self.temp_path.mkdir(parents=True, exist_ok=True)
     
-    def _check_disk_space(self, required_size: int) -> bool:
+    def _get_monitor(self):
+        """DriveMonitorインスタンスを取得（未指定時は1回だけ作成して再利用）"""
+        if self.drive_monitor is None:
+            from .drive_monitor import DriveMonitor
+            self.drive_monitor = DriveMonitor(self.config)
+        return self.drive_monitor
+    
+    def _get_destination_dir(self, file_info: dict) -> Path:
         """
-        ディスク容量チェック
+        保存先フォルダを取得
         
-        Args:
-            required_size: 必要な容量（バイト）
-            
-        Returns:
-            十分な容量があるかどうか
+        監視ルートごとのダウンロード先の下に、Drive上のサブフォルダ構成を再現する。
         """
+        base_path = Path(file_info.get('download_path') or self.download_path)
+        destination = base_path / file_info.get('relative_dir', '')
+        destination.mkdir(parents=True, exist_ok=True)
+        return destination
+    
+    def _download_roots(self) -> List[Path]:
+        """全監視ルートのダウンロード先"""
+        roots = {self.download_path}
+        for folder in self.config['google_drive'].get('target_folders', []):
+            if folder.get('download_path'):
+                roots.add(Path(folder['download_path']))
+        return sorted(roots)
+    
+    @property
+    def content_index(self) -> LocalFileIndex:
+        """ローカルファイルのMD5索引（初回使用時に作成）"""
+        if self._content_index is None:
+            self._content_index = LocalFileIndex(self.data_dir / "state.db", self._download_roots())
+        return self._content_index
+    
+    def _find_local_copy(self, file_info: dict) -> Optional[Path]:
+        """同じ内容のローカルファイルを検索（重複確認が無効・MD5なしの場合はNone）"""
+        expected_md5 = file_info.get('md5Checksum', '')
+        if self.duplicate_action == 'off' or not expected_md5:
+            return None
+        
         try:
-            # 必要容量を2.5倍で計算（安全マージン + 一時ファイル）
-            required_space = required_size * 2.5 + self.min_free_space
-            
-            # ディスク使用量を確認
-            total, used, free_space = shutil.disk_usage(self.download_path)
-            
-            if free_space < required_space:
-                self.logger.error(f"ディスク容量不足: 必要={required_space/1024/1024:.1f}MB, 使用可能={free_space/1024/1024:.1f}MB")
-                return False
-            
+            return self.content_index.find(expected_md5, int(file_info.get('size', 0)))
+        except Exception as e:
+            self.logger.warning(f"ローカルファイル索引の検索エラー: {file_info['name']} - {e}")
+            return None
+    
+    def _reuse_local_copy(self, existing: Path, file_info: dict) -> Path:
+        """
+        同じ内容のローカルファイルをダウンロードの代わりに使用
+        
+        linkの場合は保存先にハードリンクを作成する（作成できないボリュームではローカルコピー）。
+        保存先フォルダに既にある場合とskipの場合は既存ファイルをそのまま使用する。
+        
+        Returns:
+            使用するファイルパス
+        """
+        file_name = file_info['name']
+        destination = self._get_destination_dir(file_info)
+        
+        if self.duplicate_action == 'skip':
+            final_file = existing
+        elif existing.parent == destination:
+            # 保存先フォルダに別名で同じ内容があればリンクを作らずそのファイルを使用
+            final_file = existing
+            with self._stats_lock:
+                self.stats['duplicates_in_destination'] += 1
+            self.logger.info("保存先フォルダに同じ内容のファイルがあるため再利用: %s -> %s", file_name, existing.name)
+        else:
+            with self._name_lock:
+                final_file = self._unique_path(destination / file_name)
+                try:
+                    os.link(existing, final_file)
+                except OSError as e:
+                    self.logger.debug("ハードリンク作成不可のためコピー: %s - %s", final_file.name, e)
+                    self._copy_file(existing, final_file)
+            self.content_index.add(final_file, file_info['md5Checksum'])
+        
+        with self._stats_lock:
+            self.stats['duplicates_reused'] += 1
+            self.stats['duplicate_bytes_saved'] += int(file_info.get('size', 0))
+        self.logger.info("同じ内容のファイルが存在するためダウンロードを省略: %s -> %s", file_name, final_file)
+        return final_file
+    
+    @staticmethod
+    def _unique_path(path: Path) -> Path:
+        """既存ファイルと重ならないパス（同名がある場合は「名前 (n).拡張子」）"""
+        candidate = path
+        counter = 1
+        while candidate.exists():
+            candidate = path.with_name(f"{path.stem} ({counter}){path.suffix}")
+            counter += 1
+        return candidate
+    
+    def _record_download(self, size: int, elapsed: float):
+        """ダウンロード統計の記録（スレッドセーフ）"""
+        with self._stats_lock:
+            self.stats['files_downloaded'] += 1
+            self.stats['bytes_downloaded'] += size
+            self.stats['download_seconds'] += elapsed
+    
+    def _temp_dir_for(self, file_info: dict) -> Path:
+        """
+        保存先と同じボリューム上の一時フォルダを取得
+        
+        data/tempが保存先と同じボリュームならそのまま使い、別ボリュームの場合は
+        保存先ルートの下に一時フォルダを作成する（最終配置をコピーなしで行うため）。
+        """
+        base_path = Path(file_info.get('download_path') or self.download_path)
+        temp_dir = self._temp_dirs.get(base_path)
+        if temp_dir is not None:
+            return temp_dir
+        
+        base_path.mkdir(parents=True, exist_ok=True)
+        if DiskSpaceLedger.volume_id(base_path) == DiskSpaceLedger.volume_id(self.temp_path):
+            temp_dir = self.temp_path
+        else:
+            temp_dir = base_path / self.VOLUME_TEMP_DIR_NAME
+            temp_dir.mkdir(exist_ok=True)
+            self.logger.info(f"保存先と同じボリュームに一時フォルダを使用: {temp_dir}")
+        
+        self._temp_dirs[base_path] = temp_dir
+        return temp_dir
+    
+    def _temp_file_for(self, file_info: dict) -> Path:
+        """一時ファイルパス（並列実行時に衝突しないようファイルIDを付与）"""
+        return self._temp_dir_for(file_info) / f"{file_info['id']}_{file_info['name']}.downloading"
+    
+    def _space_requirements(self, file_info: dict) -> dict:
+        """
+        ダウンロードに必要なディスク容量
+        
+        ストリーミング書き込みのため一時ファイル分のみ必要（再開時は取得済み分を除く）。
+        一時ファイルと保存先が別ボリュームの場合は、コピー中に両方が存在するため
+        保存先にもファイルサイズ分が必要。
+        
+        Returns:
+            ボリューム上のパス -> 必要なバイト数
+        """
+        file_size = int(file_info.get('size', 0))
+        temp_file = self._temp_file_for(file_info)
+        entry = self._journal.get(file_info['id'])
+        if entry is not None and entry.state == 'verified' and entry.temp_path:
+            # 整合性確認済みの一時ファイルは書き込み済みのため、最終配置の分だけ必要
+            temp_file = Path(entry.temp_path)
+            written = temp_file.stat().st_size if temp_file.exists() else 0
+            remaining = max(0, file_size - written)
+        else:
+            # 分割ダウンロードの一時ファイルは最初に全体のサイズを確保するため取得済み分を差し引かない
+            partial_size = temp_file.stat().st_size if temp_file.exists() else 0
+            remaining = file_size - partial_size if partial_size < file_size else file_size
+        
+        destination = self._get_destination_dir(file_info)
+        if DiskSpaceLedger.volume_id(temp_file.parent) == DiskSpaceLedger.volume_id(destination):
+            return {destination: remaining}
+        return {temp_file.parent: remaining, destination: file_size}
+    
+    def _reserve_space(self, file_info: dict) -> bool:
+        """ディスク容量の予約（容量不足・確認エラー時はFalse）"""
+        # 配置済みから再開する場合・ローカルの既存ファイルを使う場合は容量不要
+        entry = self._journal.get(file_info['id'])
+        if entry is not None and entry.state in ('finalized', 'remote_deleted'):
             return True
-            
+        if self._find_local_copy(file_info) is not None:
+            return True
+        
+        try:
+            return self.disk_ledger.reserve(file_info['id'], self._space_requirements(file_info))
         except Exception as e:
             self.logger.error(f"ディスク容量チェックエラー: {e}")
             return False
@@ -85,7 +328,7 @@ class FileProcessor:
         
         try:
             with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(4096), b""):
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
                     hash_md5.update(chunk)
             return hash_md5.hexdigest()
         except Exception as e:
@@ -124,10 +367,355 @@ class FileProcessor:
             self.logger.error(f"整合性確認エラー: {e}")
             return False
     
+    def _write_stream(self, chunks: Iterable[bytes], dest: Path, hash_md5=None, offset: int = 0,
+                      on_chunk=None) -> Tuple[int, str]:
+        """
+        チャンク列をファイルに書き込みながらMD5を計算
+        
+        書き込み後にファイルを読み直す必要がないため、ディスクI/Oは1回で済む。
+        
+        Args:
+            chunks: ダウンロードしたデータのチャンク列
+            dest: 書き込み先ファイルパス
+            hash_md5: 再開時に引き継ぐMD5オブジェクト（省略時は新規）
+            offset: 書き込み開始位置（再開時は既存部分の末尾）
+            on_chunk: チャンク書き込み後に呼ぶ関数（書き込み済みバイト数, MD5オブジェクト）
+            
+        Returns:
+            (書き込み済みの合計バイト数, MD5ハッシュ値)
+        """
+        if hash_md5 is None:
+            hash_md5 = hashlib.md5()
+        bytes_written = offset
+        
+        with open(dest, 'r+b' if offset else 'wb') as f:
+            f.seek(offset)
+            f.truncate()
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                f.write(chunk)
+                hash_md5.update(chunk)
+                bytes_written += len(chunk)
+                self.bandwidth_limiter.consume(len(chunk))
+                if on_chunk:
+                    f.flush()
+                    on_chunk(bytes_written, hash_md5)
+        
+        return bytes_written, hash_md5.hexdigest()
+    
+    def _iter_media_ranges(self, drive_monitor, drive_file: GoogleDriveFile, start: int, stop: int):
+        """
+        HTTP Rangeヘッダーでファイル本体をチャンク単位に取得
+        
+        Args:
+            drive_monitor: DriveMonitorインスタンス
+            drive_file: PyDrive2のファイルオブジェクト
+            start: 取得開始位置（バイト）
+            stop: 取得終了位置（このバイトの手前まで、0以下はサイズ不明）
+            
+        Yields:
+            取得したデータのチャンク
+        """
+        api = drive_monitor.api
+        request = api.resource(drive_file.auth.service, 'files').get_media(fileId=drive_file['id'])
+        http = drive_monitor.session.get_http()
+        offset = start
+        
+        def fetch(range_header: str):
+            response, content = http.request(request.uri, method='GET', headers={'range': range_header})
+            # 200はRange非対応の全体応答（先頭から取得する場合のみ許容）
+            if response.status != 416 and (
+                response.status not in (200, 206) or (response.status == 200 and offset > 0)
+            ):
+                raise HttpError(response, content, uri=request.uri)
+            return response, content
+        
+        # サイズ不明（0）の場合は短い応答または416が返るまで取得
+        while stop <= 0 or offset < stop:
+            end = offset + self.chunk_size - 1
+            if stop > 0:
+                end = min(end, stop - 1)
+            requested = end - offset + 1
+            
+            # 一時的なエラーはこのチャンクだけを再試行（取得済みの部分は捨てない）
+            range_header = f'bytes={offset}-{end}'
+            response, content = api.call(
+                lambda: fetch(range_header), f"ダウンロード: {drive_file.get('title', drive_file['id'])} ({range_header})"
+            )
+            if response.status == 416:
+                break
+            if not content:
+                break
+            
+            yield content
+            offset += len(content)
+            if response.status == 200 or (stop <= 0 and len(content) < requested):
+                break
+    
+    def _resume_state_file(self, temp_file: Path) -> Path:
+        """再開情報（サイドカー）ファイルのパス"""
+        return temp_file.with_name(temp_file.name + ".json")
+    
+    def _save_resume_state(self, state_file: Path, file_info: dict, progress: dict):
+        """
+        再開情報の保存（書き込み途中で中断しても壊れないよう置き換えで保存）
+        
+        Args:
+            state_file: 再開情報ファイルパス
+            file_info: ファイル情報
+            progress: 進捗（逐次: offset/partial_md5、分割: segments）
+        """
+        state = dict(progress)
+        state['remote_md5'] = file_info.get('md5Checksum', '')
+        state['remote_modified'] = file_info.get('modifiedTime', '')
+        tmp_state_file = state_file.with_name(state_file.name + ".tmp")
+        tmp_state_file.write_text(json.dumps(state), encoding='utf-8')
+        os.replace(tmp_state_file, state_file)
+    
+    def _read_resume_state(self, temp_file: Path, file_info: dict) -> Optional[dict]:
+        """
+        再開情報の読み込み
+        
+        Returns:
+            再開情報、存在しないかリモートファイルが変更されている場合はNone
+        """
+        state_file = self._resume_state_file(temp_file)
+        if not temp_file.exists() or not state_file.exists():
+            return None
+        
+        try:
+            state = json.loads(state_file.read_text(encoding='utf-8'))
+        except Exception as e:
+            self.logger.warning(f"再開情報読み込みエラー: {file_info['name']} - {e}")
+            return None
+        
+        # リモートファイルが変更されていれば部分ファイルを破棄
+        if (state.get('remote_md5') != file_info.get('md5Checksum', '')
+                or state.get('remote_modified') != file_info.get('modifiedTime', '')):
+            self.logger.info(f"リモートファイルが変更されたため最初から再取得: {file_info['name']}")
+            return None
+        
+        return state
+    
+    def _load_resume_state(self, temp_file: Path, file_info: dict):
+        """
+        中断したダウンロードの再開位置を取得
+        
+        Python標準のMD5は内部状態を保存できないため、既存部分を1回読み直して
+        ハッシュ状態を復元し、保存済みの部分MD5と一致することを確認する。
+        
+        Args:
+            temp_file: 一時ファイルパス
+            file_info: ファイル情報
+            
+        Returns:
+            (再開位置, MD5オブジェクト)。再開できない場合は(0, None)
+        """
+        state = self._read_resume_state(temp_file, file_info)
+        if state is None or 'offset' not in state:
+            return 0, None
+        
+        try:
+            offset = int(state['offset'])
+            if temp_file.stat().st_size < offset:
+                return 0, None
+            
+            hash_md5 = hashlib.md5()
+            remaining = offset
+            with open(temp_file, 'rb') as f:
+                while remaining > 0:
+                    chunk = f.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    hash_md5.update(chunk)
+                    remaining -= len(chunk)
+            
+            if remaining or hash_md5.hexdigest() != state['partial_md5']:
+                self.logger.warning(f"部分ファイルが再開情報と一致しないため破棄: {file_info['name']}")
+                return 0, None
+            
+            return offset, hash_md5
+            
+        except Exception as e:
+            self.logger.warning(f"再開情報読み込みエラー: {file_info['name']} - {e}")
+            return 0, None
+    
+    def _discard_partial(self, temp_file: Path):
+        """部分ファイルと再開情報の削除"""
+        temp_file.unlink(missing_ok=True)
+        self._resume_state_file(temp_file).unlink(missing_ok=True)
+    
+    def _verify_digest(self, actual_size: int, actual_md5: str, expected_md5: str, expected_size: int) -> bool:
+        """
+        ダウンロード中に計算したサイズ・MD5による整合性確認
+        
+        Args:
+            actual_size: 書き込んだバイト数
+            actual_md5: 書き込み中に計算したMD5ハッシュ
+            expected_md5: 期待するMD5ハッシュ
+            expected_size: 期待するファイルサイズ
+            
+        Returns:
+            整合性確認結果
+        """
+        if actual_size != expected_size:
+            self.logger.error(f"ファイルサイズ不一致: 期待={expected_size}, 実際={actual_size}")
+            return False
+        
+        if expected_md5 and actual_md5 != expected_md5:
+            self.logger.error(f"MD5ハッシュ不一致: 期待={expected_md5}, 実際={actual_md5}")
+            return False
+        
+        return True
+    
+    def _download_sequential(self, drive_monitor, drive_file: GoogleDriveFile, temp_file: Path,
+                             file_info: dict) -> Tuple[int, str]:
+        """
+        1本の接続で先頭から順にダウンロード（中断時は続きから再開）
+        
+        Returns:
+            (書き込み済みの合計バイト数, MD5ハッシュ値)
+        """
+        file_size = int(file_info.get('size', 0))
+        
+        # 中断したダウンロードがあれば続きから再開
+        offset, hash_md5 = self._load_resume_state(temp_file, file_info)
+        if offset:
+            self.logger.info("ダウンロード再開: %s (%.1fMB から)", file_info['name'], offset / 1024 / 1024)
+        else:
+            self._discard_partial(temp_file)
+        
+        # Range指定でチャンク単位にストリーミングダウンロード（MD5を同時に計算）
+        state_file = self._resume_state_file(temp_file)
+        started_at = time.monotonic()
+        bytes_written, actual_md5 = self._write_stream(
+            self._iter_media_ranges(drive_monitor, drive_file, offset, file_size),
+            temp_file,
+            hash_md5=hash_md5,
+            offset=offset,
+            on_chunk=lambda written, md5: self._save_resume_state(
+                state_file, file_info, {'offset': written, 'partial_md5': md5.hexdigest()}
+            ),
+        )
+        elapsed = time.monotonic() - started_at
+        self._record_download(bytes_written - offset, elapsed)
+        self.metrics.observe('transfer', elapsed)
+        
+        return bytes_written, actual_md5
+    
+    def _download_segmented(self, drive_monitor, drive_file: GoogleDriveFile, temp_file: Path,
+                            file_info: dict) -> Tuple[int, str]:
+        """
+        ファイルを複数のバイト範囲に分割して並列ダウンロード
+        
+        事前に確保した一時ファイルへ各範囲を位置指定で書き込む。範囲ごとの進捗を
+        再開情報に保存するため、中断時は各範囲の続きから再開できる。
+        到着順が前後するため、MD5は整合性確認の段階で読み直して計算する。
+        
+        Returns:
+            (ファイルサイズ, None)
+        """
+        file_size = int(file_info['size'])
+        state_file = self._resume_state_file(temp_file)
+        
+        # 各範囲は [開始位置, 書き込み済み位置, 終了位置]
+        state = self._read_resume_state(temp_file, file_info)
+        segments = state.get('segments') if state else None
+        if segments and temp_file.stat().st_size == file_size:
+            done = sum(pos - start for start, pos, _ in segments)
+            self.logger.info(f"分割ダウンロード再開: {file_info['name']} ({done/1024/1024:.1f}MB 取得済み)")
+        else:
+            self._discard_partial(temp_file)
+            segment_size = -(-file_size // self.segment_count)
+            segments = [
+                [start, start, min(start + segment_size, file_size)]
+                for start in range(0, file_size, segment_size)
+            ]
+            with open(temp_file, 'wb') as f:
+                f.truncate(file_size)
+        
+        self.logger.info("分割ダウンロード: %s (%d分割)", file_info['name'], len(segments))
+        progress_lock = threading.Lock()
+        bytes_before = sum(pos - start for start, pos, _ in segments)
+        
+        def download_segment(segment: list):
+            # 範囲ごとに個別のファイルハンドル・HTTP接続を使用
+            with open(temp_file, 'r+b') as f:
+                f.seek(segment[1])
+                for chunk in self._iter_media_ranges(drive_monitor, drive_file, segment[1], segment[2]):
+                    f.write(chunk)
+                    self.bandwidth_limiter.consume(len(chunk))
+                    f.flush()
+                    with progress_lock:
+                        segment[1] += len(chunk)
+                        self._save_resume_state(state_file, file_info, {'segments': segments})
+        
+        started_at = time.monotonic()
+        pending = [segment for segment in segments if segment[1] < segment[2]]
+        with ThreadPoolExecutor(max_workers=self.segment_count, thread_name_prefix='segment') as executor:
+            # 例外は再送出し、部分ファイルは次回の再開用に残す
+            for future in [executor.submit(download_segment, segment) for segment in pending]:
+                future.result()
+        
+        elapsed = time.monotonic() - started_at
+        bytes_after = sum(pos - start for start, pos, _ in segments)
+        self._record_download(bytes_after - bytes_before, elapsed)
+        self.metrics.observe('transfer', elapsed)
+        
+        if bytes_after != file_size:
+            raise IOError(f"分割ダウンロード未完了: {bytes_after}/{file_size}バイト")
+        
+        return file_size, None
+    
+    def _admit(self, file_info: dict) -> bool:
+        """ダウンロードキューへの受け入れ判定（容量を予約し、新しいファイルはジャーナルに記録）"""
+        if not self._reserve_space(file_info):
+            return False
+        if file_info['id'] not in self._journal:
+            self._get_monitor().record_file_state(file_info['id'], 'discovered', file_info)
+        return True
+    
+    def _resume_from_journal(self, file_info: dict) -> Optional[DownloadedFile]:
+        """
+        前回中断したファイルを完了済みの段階の次から再開
+        
+        配置済みのファイルはDrive削除から、整合性確認済みの一時ファイルは最終配置から続ける。
+        Drive削除済みのファイルは処理済みマークだけ行う（ローカルファイルの有無は問わない）。
+        
+        Returns:
+            再開できる場合は転送結果、最初からダウンロードする場合はNone
+        """
+        entry = self._journal.get(file_info['id'])
+        if entry is None:
+            return None
+        
+        file_size = int(file_info.get('size', 0))
+        resumed = None
+        if entry.state in ('finalized', 'remote_deleted') and entry.final_path:
+            final_file = Path(entry.final_path)
+            if entry.state == 'remote_deleted' or final_file.exists():
+                resumed = DownloadedFile(None, file_size, entry.md5, final_file)
+        elif entry.state == 'verified' and entry.temp_path:
+            temp_file = Path(entry.temp_path)
+            if temp_file.exists() and temp_file.stat().st_size == file_size:
+                resumed = DownloadedFile(temp_file, file_size, entry.md5)
+        
+        if resumed is None:
+            self.logger.info("前回の途中結果が使えないため最初から処理: %s (%s)", file_info['name'], entry.state)
+            return None
+        
+        self.logger.info("前回の続きから再開: %s (%s)", file_info['name'], entry.state)
+        with self._stats_lock:
+            self.stats['journal_resumed'] += 1
+        return resumed
+    
     def download_file(self, drive_monitor, file_info: dict) -> Optional[Path]:
         """
         Google Driveからファイルをダウンロード（PyDrive2版）
         
+        転送と整合性確認・最終配置を続けて行う（パイプラインでは別々のワーカーで実行）。
+        
         Args:
             drive_monitor: DriveMonitorインスタンス
             file_info: ファイル情報
@@ -135,51 +723,307 @@ class FileProcessor:
         Returns:
             ダウンロード成功時はファイルパス、失敗時はNone
         """
+        downloaded = self.fetch_file(drive_monitor, file_info)
+        if downloaded is None:
+            return None
+        return self.complete_download(file_info, downloaded)
+    
+    def _fetch_locally(self, drive_monitor, file_info: dict) -> Optional[DownloadedFile]:
+        """
+        転送せずに済む場合の結果（前回の途中結果・ローカルにある同じ内容のファイル）
+        
+        Returns:
+            転送結果、ダウンロードが必要な場合はNone
+        """
+        # 前回の途中まで進んでいれば続きから（配置済みのファイルを重複として再配置しないよう先に確認）
+        resumed = self._resume_from_journal(file_info)
+        if resumed is not None:
+            return resumed
+        
+        # 同じ内容のファイルがローカルにあれば転送しない
+        existing = self._find_local_copy(file_info)
+        if existing is not None:
+            try:
+                final_file = self._reuse_local_copy(existing, file_info)
+                drive_monitor.record_file_state(file_info['id'], 'finalized', file_info, final_path=final_file)
+                return DownloadedFile(None, int(file_info.get('size', 0)), file_info.get('md5Checksum'), final_file)
+            except Exception as e:
+                self.logger.warning(f"既存ファイルの再利用に失敗したためダウンロード: {file_info['name']} - {e}")
+        
+        return None
+    
+    def fetch_file(self, drive_monitor, file_info: dict) -> Optional[DownloadedFile]:
+        """
+        ファイルを一時ファイルに転送（ネットワークの段階）
+        
+        ディスク容量の予約は整合性確認・最終配置が終わるまで保持する。
+        
+        Args:
+            drive_monitor: DriveMonitorインスタンス
+            file_info: ファイル情報
+            
+        Returns:
+            転送結果、失敗時はNone
+        """
         file_id = file_info['id']
         file_name = file_info['name']
         file_size = int(file_info.get('size', 0))
-        expected_md5 = file_info.get('md5Checksum', '')
         
-        self.logger.info(f"ダウンロード開始: {file_name} ({file_size/1024/1024:.1f}MB)")
+        local = self._fetch_locally(drive_monitor, file_info)
+        if local is not None:
+            return local
         
-        # ディスク容量チェック
-        if not self._check_disk_space(file_size):
+        self.logger.info("ダウンロード開始: %s (%.1fMB)", file_name, file_size / 1024 / 1024)
+        
+        # ディスク容量の予約（process_files経由の場合は計画時に予約済み）
+        if not self.disk_ledger.is_reserved(file_id) and not self._reserve_space(file_info):
             return None
         
-        # 一時ファイルパス
-        temp_file = self.temp_path / f"{file_name}.downloading"
-        final_file = self.download_path / file_name
+        temp_file = self._temp_file_for(file_info)
         
         try:
-            # PyDrive2のファイルオブジェクトを取得
-            drive_file = drive_monitor.get_drive_file(file_id)
+            # PyDrive2のファイルオブジェクトを取得（一覧取得時のメタデータを再利用）
+            drive_file = drive_monitor.get_drive_file(file_id, file_info)
             if not drive_file:
                 self.logger.error(f"ファイル取得失敗: {file_name}")
+                self.disk_ledger.release(file_id)
                 return None
             
-            # PyDrive2でダウンロード実行
-            self.logger.info(f"ダウンロード中: {file_name}")
-            drive_file.GetContentFile(str(temp_file))
+            self.logger.info("ダウンロード中: %s", file_name)
+            drive_monitor.record_file_state(file_id, 'downloading', file_info, temp_path=temp_file)
+            if self.segment_threshold and file_size >= self.segment_threshold and self.segment_count > 1:
+                bytes_written, actual_md5 = self._download_segmented(drive_monitor, drive_file, temp_file, file_info)
+            else:
+                bytes_written, actual_md5 = self._download_sequential(drive_monitor, drive_file, temp_file, file_info)
+            return DownloadedFile(temp_file, bytes_written, actual_md5)
             
-            # ファイル整合性確認
-            if expected_md5 and not self._verify_file_integrity(temp_file, expected_md5, file_size):
+        except Exception as e:
+            # 部分ファイルは次回の再開用に残す
+            self.logger.error(f"ダウンロードエラー: {file_name} - {e} (次回は続きから再開)")
+            self.disk_ledger.release(file_id)
+            return None
+    
+    async def fetch_file_async(self, drive_monitor, file_info: dict) -> Optional[DownloadedFile]:
+        """
+        ファイルを一時ファイルに転送（非同期クライアント版、イベントループ上で多数を同時に実行）
+        
+        1回のGETで最後まで受信し、再開情報はchunk_sizeごとに保存する。
+        分割ダウンロードの対象は従来どおりスレッドで取得する。
+        
+        Args:
+            drive_monitor: DriveMonitorインスタンス（async_clientを使用）
+            file_info: ファイル情報
+            
+        Returns:
+            転送結果、失敗時はNone
+        """
+        file_id = file_info['id']
+        file_name = file_info['name']
+        file_size = int(file_info.get('size', 0))
+        
+        if self.segment_threshold and file_size >= self.segment_threshold and self.segment_count > 1:
+            return await asyncio.to_thread(self.fetch_file, drive_monitor, file_info)
+        
+        # ファイル操作・空き容量の取得・状態の記録はイベントループを止めないようスレッドで行う
+        local = await asyncio.to_thread(self._fetch_locally, drive_monitor, file_info)
+        if local is not None:
+            return local
+        
+        self.logger.info("ダウンロード開始: %s (%.1fMB)", file_name, file_size / 1024 / 1024)
+        
+        if not self.disk_ledger.is_reserved(file_id) and not await asyncio.to_thread(self._reserve_space, file_info):
+            return None
+        
+        try:
+            temp_file = await asyncio.to_thread(self._temp_file_for, file_info)
+            await asyncio.to_thread(
+                drive_monitor.record_file_state, file_id, 'downloading', file_info, temp_path=temp_file
+            )
+            
+            # 中断したダウンロードがあれば続きから再開（既存部分の読み直しもスレッドで行う）
+            offset, hash_md5 = await asyncio.to_thread(self._load_resume_state, temp_file, file_info)
+            if offset:
+                self.logger.info("ダウンロード再開: %s (%.1fMB から)", file_name, offset / 1024 / 1024)
+            else:
+                await asyncio.to_thread(self._discard_partial, temp_file)
+            
+            state_file = self._resume_state_file(temp_file)
+            started_at = time.monotonic()
+            bytes_written, actual_md5 = await drive_monitor.async_client.download(
+                file_id,
+                temp_file,
+                offset=offset,
+                hash_md5=hash_md5,
+                bandwidth=self.bandwidth_limiter if self.bandwidth_limiter.enabled else None,
+                progress_interval=self.chunk_size,
+                on_progress=lambda written, md5: self._save_resume_state(
+                    state_file, file_info, {'offset': written, 'partial_md5': md5.hexdigest()}
+                ),
+            )
+            elapsed = time.monotonic() - started_at
+            self._record_download(bytes_written - offset, elapsed)
+            self.metrics.observe('transfer', elapsed)
+            return DownloadedFile(temp_file, bytes_written, actual_md5)
+            
+        except Exception as e:
+            # 部分ファイルは次回の再開用に残す
+            self.logger.error(f"ダウンロードエラー: {file_name} - {e} (次回は続きから再開)")
+            self.disk_ledger.release(file_id)
+            return None
+    
+    def complete_download(self, file_info: dict, downloaded: DownloadedFile) -> Optional[Path]:
+        """
+        転送済みファイルの整合性確認と最終配置（ディスクの段階）
+        
+        Args:
+            file_info: ファイル情報
+            downloaded: fetch_fileの結果
+            
+        Returns:
+            配置したファイルパス、失敗時はNone
+        """
+        if downloaded.final_file is not None:
+            return downloaded.final_file
+        
+        monitor = self._get_monitor()
+        file_name = file_info['name']
+        file_size = int(file_info.get('size', 0))
+        expected_md5 = file_info.get('md5Checksum', '')
+        temp_file = downloaded.temp_file
+        final_file = self._get_destination_dir(file_info) / file_name
+        
+        try:
+            # 分割ダウンロードは到着順が前後するため読み直して計算
+            actual_md5 = downloaded.md5
+            if actual_md5 is None and (expected_md5 or self.duplicate_action != 'off'):
+                with self.metrics.stage('md5'):
+                    actual_md5 = self._calculate_md5(temp_file)
+            
+            # ファイル整合性確認（逐次ダウンロードは転送時点で計算済み）
+            if expected_md5 and not self._verify_digest(downloaded.size, actual_md5, expected_md5, file_size):
                 self.logger.error(f"ファイル整合性確認失敗: {file_name}")
-                temp_file.unlink(missing_ok=True)
+                self._discard_partial(temp_file)
                 return None
             
-            # 最終ファイルに移動
-            if final_file.exists():
-                final_file.unlink()  # 既存ファイルがあれば削除
+            self._resume_state_file(temp_file).unlink(missing_ok=True)
+            monitor.record_file_state(file_info['id'], 'verified', temp_path=temp_file, md5=actual_md5)
             
-            temp_file.rename(final_file)
-            self.logger.info(f"ダウンロード完了: {file_name}")
+            # 最終ファイルに配置（同名の別ファイルがあれば連番を付与）
+            with self._name_lock:
+                final_file = self._unique_path(final_file)
+                self._finalize(temp_file, final_file)
+            monitor.record_file_state(file_info['id'], 'finalized', final_path=final_file)
+            if actual_md5 and self.duplicate_action != 'off':
+                self.content_index.add(final_file, actual_md5)
+            self.logger.info("ダウンロード完了: %s", final_file.name)
             
             return final_file
             
         except Exception as e:
-            self.logger.error(f"ダウンロードエラー: {file_name} - {e}")
-            temp_file.unlink(missing_ok=True)
+            self.logger.error(f"整合性確認・配置エラー: {file_name} - {e}")
             return None
+        
+        finally:
+            # 書き込みが終わったファイルは実際の空き容量に反映されるため予約を解放
+            self.disk_ledger.release(file_info['id'])
+    
+    def _finalize(self, temp_file: Path, final_file: Path):
+        """
+        一時ファイルを最終ファイルとして配置
+        
+        同じボリュームならos.replaceで置き換える（コピーなし・既存ファイルが消える瞬間がない）。
+        別ボリュームの場合は保存先に一時名でコピーしてから置き換える。
+        """
+        started_at = time.monotonic()
+        try:
+            os.replace(temp_file, final_file)
+            copied = False
+        except OSError as e:
+            # 別ボリュームへの移動はEXDEV（WindowsではERROR_NOT_SAME_DEVICE）になる
+            self.logger.debug("置き換え不可のためコピーで配置: %s - %s", final_file.name, e)
+            staging_file = final_file.with_name(f".{final_file.name}.autosync")
+            try:
+                self._copy_file(temp_file, staging_file)
+                os.replace(staging_file, final_file)
+            except Exception:
+                staging_file.unlink(missing_ok=True)
+                raise
+            temp_file.unlink()
+            copied = True
+        
+        elapsed = time.monotonic() - started_at
+        self.metrics.observe('finalize', elapsed)
+        with self._stats_lock:
+            self.stats['finalize_seconds'] += elapsed
+            self.stats['finalize_copies'] += int(copied)
+        self.logger.info("最終配置: %s (%s, %.3f秒)", final_file.name, 'コピー' if copied else '置き換え', elapsed)
+    
+    def _copy_file(self, src: Path, dest: Path):
+        """
+        ボリューム間のファイルコピー
+        
+        copy_file_range（Linux）でカーネル内コピーを行い、使用できない場合は
+        shutil.copyfile（sendfile等のOS別の高速経路）を使用する。
+        """
+        copy_file_range = getattr(os, 'copy_file_range', None)
+        if copy_file_range is not None:
+            try:
+                with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+                    while copy_file_range(fsrc.fileno(), fdst.fileno(), self.COPY_BLOCK_SIZE):
+                        pass
+                    os.fsync(fdst.fileno())
+                return
+            except OSError as e:
+                self.logger.debug("copy_file_range使用不可: %s", e)
+        
+        shutil.copyfile(src, dest)
+        with open(dest, 'rb+') as fdst:
+            os.fsync(fdst.fileno())
+    
+    def _persist_before_delete(self, monitor, files: List[Path]) -> bool:
+        """
+        Driveから削除する前に配置済みファイルとジャーナルをディスクへ同期
+        
+        ファイルごとではなく削除のバッチごとにまとめて同期する（ディレクトリは1回ずつ）。
+        
+        Args:
+            monitor: DriveMonitorインスタンス
+            files: 配置済みファイルのリスト
+        
+        Returns:
+            同期に成功した場合True（失敗時はDriveから削除しない）
+        """
+        started_at = time.perf_counter()
+        try:
+            # Windowsは書き込み可能なハンドルでなければ同期できない
+            flags = os.O_RDWR if os.name == 'nt' else os.O_RDONLY
+            directories = set()
+            for path in files:
+                if not path.exists():
+                    continue
+                fd = os.open(path, flags)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                directories.add(path.parent)
+            
+            # 最終配置の置き換え（ディレクトリエントリ）も確定させる（Windowsはディレクトリを開けない）
+            if os.name != 'nt':
+                for directory in directories:
+                    fd = os.open(directory, os.O_RDONLY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+        except OSError as e:
+            self.logger.error(f"配置済みファイルの同期エラー: {e}")
+            return False
+        
+        try:
+            return monitor.commit_processed()
+        finally:
+            self.metrics.observe('journal_sync', time.perf_counter() - started_at)
     
     def cleanup_file(self, file_path: Path):
         """
@@ -207,8 +1051,10 @@ class FileProcessor:
         try:
             drive_file = drive_monitor.get_drive_file(file_id)
             if drive_file:
-                drive_file.Delete()
-                self.logger.info(f"Google Driveからファイル削除: {file_name}")
+                with self.metrics.stage('delete'):
+                    drive_monitor.api.call(drive_file.Delete, f"ファイル削除: {file_name}")
+                drive_monitor.invalidate_metadata(file_id)
+                self.logger.info("Google Driveからファイル削除: %s", file_name)
             else:
                 self.logger.warning(f"削除対象ファイルが見つかりません: {file_name}")
         except Exception as e:
@@ -219,6 +1065,8 @@ class FileProcessor:
         """
         ファイルの完全処理（ダウンロード→クリーンアップ）
         
+        1ファイルを順に処理する。複数ファイルはprocess_streamで段階ごとに並行して処理する。
+        
         Args:
             file_info: ファイル情報
             
@@ -229,9 +1077,8 @@ class FileProcessor:
         file_name = file_info['name']
         
         try:
-            # DriveMonitorインスタンスを取得
-            from .drive_monitor import DriveMonitor
-            monitor = DriveMonitor(self.config)
+            # 共有DriveMonitorインスタンスを取得（ファイルごとに再認証しない）
+            monitor = self._get_monitor()
             
             # 1. ファイルダウンロード
             downloaded_file = self.download_file(monitor, file_info)
@@ -239,21 +1086,20 @@ class FileProcessor:
                 return False
             
             # 2. Google Driveからファイル削除（オプション）
-            try:
-                self.delete_from_drive(monitor, file_id, file_name)
-            except Exception as e:
-                self.logger.warning(f"Google Driveファイル削除をスキップ: {file_name} - {str(e)}")
-                # 削除失敗しても処理は継続
-            
-            # 3. ローカルファイルクリーンアップ（オプション）
-            # 注意: ファイルを保持したい場合はコメントアウト
-            # self.cleanup_file(downloaded_file)
-            self.logger.info(f"ダウンロードファイルを保持: {downloaded_file}")
-            
-            # 4. 処理済みマーク
-            monitor.mark_file_processed(file_id)
+            if not self._persist_before_delete(monitor, [downloaded_file]):
+                self.logger.error(f"処理状態を保存できないためDriveからの削除を中止: {file_name}")
+                return False
+            delete_error = None
+            entry = self._journal.get(file_id)
+            if entry is None or entry.state != 'remote_deleted':
+                try:
+                    self.delete_from_drive(monitor, file_id, file_name)
+                    monitor.record_file_state(file_id, 'remote_deleted')
+                except Exception as e:
+                    delete_error = e
             
-            self.logger.info(f"ファイル処理完了: {file_name}")
+            self._finish_file(monitor, file_info, downloaded_file, delete_error)
+            monitor.commit_processed()
             return True
             
         except Exception as e:
@@ -261,4 +1107,174 @@ class FileProcessor:
             # エラー時はローカルファイルだけクリーンアップ
             if 'downloaded_file' in locals() and downloaded_file:
                 self.cleanup_file(downloaded_file)
-            return False
\ No newline at end of file
+            return False
+    
+    def _finish_file(self, monitor, file_info: dict, downloaded_file: Path, delete_error: Optional[Exception]):
+        """
+        Drive削除後の完了処理（ローカルファイルの扱いと処理済みマーク）
+        
+        Args:
+            monitor: DriveMonitorインスタンス
+            file_info: ファイル情報
+            downloaded_file: ダウンロードしたファイルパス
+            delete_error: Drive削除時のエラー（成功時はNone）
+        """
+        file_name = file_info['name']
+        if delete_error is not None:
+            self.logger.warning(f"Google Driveファイル削除をスキップ: {file_name} - {str(delete_error)}")
+            # 削除失敗しても処理は継続
+        
+        # 3. ローカルファイルクリーンアップ（オプション）
+        # 注意: ファイルを保持したい場合はコメントアウト
+        # self.cleanup_file(downloaded_file)
+        self.logger.info("ダウンロードファイルを保持: %s", downloaded_file)
+        
+        # 4. 処理済みマーク
+        monitor.mark_file_processed(file_info['id'], remote_deleted=delete_error is None)
+        
+        self.logger.info("ファイル処理完了: %s", file_name)
+    
+    def finish_batch(self, items: List[Tuple[dict, Path]]) -> int:
+        """
+        ダウンロード済みファイルをDriveからバッチで削除し、ファイルごとに完了処理
+        
+        Args:
+            items: (ファイル情報, ダウンロードしたファイルパス) のリスト
+            
+        Returns:
+            完了処理でエラーになったファイル数
+        """
+        if not items:
+            return 0
+        
+        monitor = self._get_monitor()
+        if not self._persist_before_delete(monitor, [downloaded_file for _, downloaded_file in items]):
+            raise IOError("処理状態を保存できないためDriveからの削除を中止")
+        
+        # 前回Driveから削除済みのファイルは処理済みマークだけ行う
+        delete_ids = [file_info['id'] for file_info, _ in items
+                      if getattr(self._journal.get(file_info['id']), 'state', None) != 'remote_deleted']
+        if delete_ids:
+            self.logger.info(f"Google Driveから一括削除: {len(delete_ids)}個")
+        results = monitor.delete_files(delete_ids) if delete_ids else {}
+        
+        failures = 0
+        for file_info, downloaded_file in items:
+            delete_error = results.get(file_info['id'])
+            if delete_error is None:
+                self.logger.info("Google Driveからファイル削除: %s", file_info['name'])
+                monitor.record_file_state(file_info['id'], 'remote_deleted')
+            try:
+                self._finish_file(monitor, file_info, downloaded_file, delete_error)
+            except Exception as e:
+                self.logger.error(f"ファイル処理中にエラー: {file_info['name']} - {e}")
+                failures += 1
+        
+        # 処理済みマークとジャーナルからの削除を確定
+        monitor.commit_processed()
+        return failures
+    
+    def process_files(self, file_infos: List[dict]) -> int:
+        """
+        複数ファイルの処理（一覧取得済みのファイルをまとめて処理）
+        
+        Args:
+            file_infos: ファイル情報のリスト
+            
+        Returns:
+            処理に成功したファイル数
+        """
+        return self.process_stream([file_infos])[1]
+    
+    def process_stream(self, batches: Iterable[List[dict]]) -> Tuple[int, int]:
+        """
+        一覧の取得と並行してファイルを処理
+        
+        ダウンロード（max_workers）・整合性確認と最終配置・Driveからの削除をそれぞれ
+        別のワーカーで実行する。スケジューラの順序で処理し、上限を超えたファイルは次回に回す。
+        
+        Args:
+            batches: 新しいファイルのリストを順に返すイテラブル（DriveMonitor.iter_new_filesなど）
+            
+        Returns:
+            (検出したファイル数, 処理に成功したファイル数)
+        """
+        # ワーカー間で共有するため先に作成しておく
+        monitor = self._get_monitor()
+        
+        # 前回中断したファイルは一覧より先に処理する（Drive削除済みのファイルは一覧に現れない）
+        self._journal = monitor.get_unfinished_files()
+        resumed = [entry.file_info for entry in self._journal.values()
+                   if entry.state in self.RESUMABLE_STATES and entry.file_info.get('id')]
+        if resumed:
+            self.logger.info(f"前回中断したファイルを再開: {len(resumed)}個")
+            batches = itertools.chain([resumed], batches)
+        
+        # ダウンロード先の既存ファイルを索引に反映（処理は待たずにバックグラウンドで走査）
+        if self.duplicate_action != 'off':
+            try:
+                self.content_index.refresh_in_background(
+                    self.index_refresh_interval,
+                    on_complete=lambda seconds: self.metrics.observe('index_refresh', seconds)
+                )
+            except Exception as e:
+                self.logger.warning(f"ローカルファイル索引の更新エラー: {e}")
+        
+        # 追加順にディスク容量を予約し、入りきらないファイルは次回に回す
+        self.disk_ledger.refresh()
+        run = self.scheduler.start_run(
+            admit=self._admit,
+            on_defer=lambda file_info: self.disk_ledger.release(file_info['id']),
+            max_queued=self.config.get('pipeline', {}).get('download_queue_size', 1000)
+        )
+        pipeline = ProcessingPipeline(self.config, self, monitor, run)
+        
+        with self._stats_lock:
+            stats_before = dict(self.stats)
+        started_at = time.monotonic()
+        try:
+            processed_count = pipeline.execute(batches)
+        finally:
+            wall_seconds = time.monotonic() - started_at
+            if run.total:
+                self.metrics.observe('process_files', wall_seconds)
+                for wait in run.queue_waits:
+                    self.metrics.observe('queue_wait', wait)
+                self._log_throughput(wall_seconds, stats_before)
+                run.log_summary()
+            monitor.commit_processed()
+        
+        return run.total, processed_count
+    
+    def close(self):
+        """ローカルファイル索引を閉じる"""
+        if self._content_index is not None:
+            self._content_index.close()
+            self._content_index = None
+    
+    def _log_throughput(self, wall_seconds: float, stats_before: dict):
+        """
+        今回の実行分の全体スループットと逐次実行換算のスループットをログ出力
+        
+        Args:
+            wall_seconds: 実行の所要時間
+            stats_before: 実行開始時点の統計
+        """
+        with self._stats_lock:
+            run_stats = {key: value - stats_before[key] for key, value in self.stats.items()}
+        
+        total_mb = run_stats['bytes_downloaded'] / 1024 / 1024
+        download_seconds = run_stats['download_seconds']
+        if total_mb <= 0 or wall_seconds <= 0:
+            return
+        
+        throughput = total_mb / wall_seconds
+        sequential = total_mb / download_seconds if download_seconds > 0 else 0.0
+        self.logger.info(
+            f"スループット: {throughput:.2f}MB/s (逐次換算: {sequential:.2f}MB/s, "
+            f"合計: {total_mb:.1f}MB, ワーカー数={self.max_workers})"
+        )
+        self.logger.info(
+            f"最終配置時間: 合計{run_stats['finalize_seconds']:.2f}秒 "
+            f"(ボリューム間コピー: {run_stats['finalize_copies']}個)"
+        )
\ No newline at end of file
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機能:
+- 複数の監視ルートフォルダとサブフォルダのインデックス
+- フォルダIDからルート・相対パスへのO(1)参照
+- ディスクへのキャッシュ（data/folder_tree.json）と差分更新
+"""
+
+import json
+import logging
+import os
+import posixpath
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class FolderTree:
+    """監視フォルダツリークラス"""
+    
+    # ローカルのフォルダ名に使用できない文字（Windows基準）
+    INVALID_NAME_CHARS = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+    
+    def __init__(self, roots: List[dict], cache_file: Path):
+        """
+        初期化
+        
+        Args:
+            roots: 監視ルートのリスト（folder_id, download_path, recursive）
+            cache_file: キャッシュファイルパス
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.roots = {root['folder_id']: root for root in roots}
+        self.cache_file = cache_file
+        
+        # フォルダID -> (親フォルダID, フォルダ名)（ルート自身は含まない）
+        self._folders: Dict[str, Tuple[str, str]] = {}
+        
+        # フォルダID -> (ルートID, ルートからの相対パス)（ルート自身を含む）
+        self._locations: Dict[str, Tuple[str, str]] = {}
+        
+        # 全件取得でツリーを構築済みかどうか
+        self.is_built = False
+        self._dirty = False
+        
+        self._load()
+        self._rebuild_locations()
+    
+    def _signature(self) -> list:
+        """キャッシュの有効性判定用（ルート構成が変わったら再構築）"""
+        return sorted([folder_id, bool(root.get('recursive'))] for folder_id, root in self.roots.items())
+    
+    def _load(self):
+        """キャッシュファイルの読み込み"""
+        if not self.cache_file.exists():
+            return
+        
+        try:
+            cache = json.loads(self.cache_file.read_text(encoding='utf-8'))
+            if cache.get('roots') != self._signature():
+                self.logger.info("監視ルートが変更されたためフォルダツリーを再構築します")
+                return
+            
+            self._folders = {folder_id: tuple(entry) for folder_id, entry in cache.get('folders', {}).items()}
+            self.is_built = True
+            self.logger.debug("フォルダツリーを読み込み: %dフォルダ", len(self._folders))
+        except Exception as e:
+            self.logger.warning(f"フォルダツリー読み込みエラー: {e}")
+    
+    def save(self):
+        """変更がある場合のみキャッシュファイルに保存"""
+        if not self._dirty or not self.is_built:
+            return
+        
+        try:
+            cache = {'roots': self._signature(), 'folders': self._folders}
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_name(self.cache_file.name + ".tmp")
+            tmp_file.write_text(json.dumps(cache, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+        except Exception as e:
+            self.logger.warning(f"フォルダツリー保存エラー: {e}")
+    
+    @classmethod
+    def _safe_name(cls, title: str) -> str:
+        """Driveのフォルダ名をローカルで使用できる名前に変換"""
+        name = cls.INVALID_NAME_CHARS.sub('_', title).rstrip(' .')
+        return name if name and name not in ('.', '..') else '_'
+    
+    def _rebuild_locations(self):
+        """全フォルダのルート・相対パスを再計算"""
+        locations = {root_id: (root_id, '') for root_id in self.roots}
+        
+        for folder_id in self._folders:
+            chain = []
+            current = folder_id
+            while current not in locations:
+                entry = self._folders.get(current)
+                if entry is None or current in chain:
+                    break  # 親が不明（ツリー外）または循環
+                chain.append(current)
+                current = entry[0]
+            else:
+                root_id, relative_dir = locations[current]
+                for chained_id in reversed(chain):
+                    relative_dir = posixpath.join(relative_dir, self._safe_name(self._folders[chained_id][1]))
+                    locations[chained_id] = (root_id, relative_dir)
+        
+        self._locations = locations
+    
+    def folder_ids(self) -> List[str]:
+        """ツリー内の全フォルダID（ルートを含む）"""
+        return list(self._locations)
+    
+    def contains(self, folder_id: str) -> bool:
+        """ツリー内のフォルダかどうか"""
+        return folder_id in self._locations
+    
+    def locate(self, parent_ids: Iterable[str]) -> Optional[Tuple[dict, str]]:
+        """
+        親フォルダIDからファイルの保存先を取得
+        
+        Args:
+            parent_ids: ファイルの親フォルダIDのリスト
+        
+        Returns:
+            (ルート設定, ルートからの相対パス)、監視対象外の場合はNone
+        """
+        for parent_id in parent_ids:
+            location = self._locations.get(parent_id)
+            if location is not None:
+                root_id, relative_dir = location
+                return self.roots[root_id], relative_dir
+        return None
+    
+    def update_folder(self, folder_id: str, parent_ids: List[str], title: str) -> bool:
+        """
+        フォルダの追加・移動・名前変更を反映
+        
+        再帰対象のルート配下にない親へ移動した場合はツリーから削除する。
+        
+        Returns:
+            新しくツリーに加わった場合True（配下のファイルの取得が必要）
+        """
+        if folder_id in self.roots:
+            return False
+        
+        parent_id = next(
+            (parent_id for parent_id in parent_ids
+             if parent_id in self._locations and self.roots[self._locations[parent_id][0]].get('recursive')),
+            None
+        )
+        if parent_id is None:
+            self.remove_folder(folder_id)
+            return False
+        
+        entry = (parent_id, title)
+        previous = self._folders.get(folder_id)
+        if previous == entry:
+            return False
+        
+        self._folders[folder_id] = entry
+        self._dirty = True
+        
+        # 新規フォルダは親の位置から求める（移動・名前変更は配下も変わるため再計算）
+        if previous is None:
+            root_id, parent_dir = self._locations[parent_id]
+            self._locations[folder_id] = (root_id, posixpath.join(parent_dir, self._safe_name(title)))
+            return True
+        
+        self._rebuild_locations()
+        return False
+    
+    def remove_folder(self, folder_id: str):
+        """フォルダと配下のサブフォルダをツリーから削除"""
+        if folder_id not in self._folders:
+            return
+        
+        removed = {folder_id}
+        changed = True
+        while changed:
+            changed = False
+            for child_id, (parent_id, _) in self._folders.items():
+                if parent_id in removed and child_id not in removed:
+                    removed.add(child_id)
+                    changed = True
+        
+        for removed_id in removed:
+            del self._folders[removed_id]
+        self._dirty = True
+        self._rebuild_locations()
+        self.logger.info(f"監視対象外になったフォルダを除外: {len(removed)}フォルダ")
+    
+    def complete_scan(self, seen_ids: Iterable[str]):
+        """
+        全件取得の結果でツリーを確定
+        
+        ツリー内の全フォルダの子を取得した結果に含まれなかったフォルダは、
+        削除・ゴミ箱移動・監視対象外への移動が行われたものとして削除する。
+        """
+        seen_ids = set(seen_ids)
+        missing = [folder_id for folder_id in self._folders if folder_id not in seen_ids]
+        for folder_id in missing:
+            self.remove_folder(folder_id)
+        
+        if not self.is_built:
+            self.is_built = True
+            self._dirty = True
+            self.logger.info(f"フォルダツリーを構築: {len(self._folders)}サブフォルダ")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機能:
+- キュー経由のログ出力（ファイル書き込み・書式化はバックグラウンドスレッドで実行）
+- JSON Lines形式のログファイル（1行1レコード）
+- サイズによるログファイルのローテーション（log_rotation_mb・log_backup_count）
+- 設定ファイルのログレベルの反映
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+from datetime import datetime
+from pathlib import Path
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """ログレコードを1行のJSONに変換"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    ログレコードを書式化せずにキューへ渡すハンドラ
+    
+    標準のQueueHandlerは別プロセスへ渡せるよう呼び出し元のスレッドでメッセージを
+    組み立てるが、同じプロセス内のスレッドが受け取るため書式化もバックグラウンドに任せる。
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class LogPipeline:
+    """バックグラウンドスレッドでのログ出力"""
+    
+    LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    
+    def __init__(self, log_dir: Path, file_name: str = 'autosync.jsonl'):
+        """
+        初期化（設定ファイルの読み込み前から既定値で出力を開始する）
+        
+        Args:
+            log_dir: ログフォルダ
+            file_name: ログファイル名（ローテーション時は .1, .2, ... を付けて残す）
+        """
+        log_dir.mkdir(parents=True, exist_ok=True)
+        self.log_file = log_dir / file_name
+        
+        # ファイルはJSON Lines形式、コンソールは従来どおりのテキスト形式
+        self.file_handler = logging.handlers.RotatingFileHandler(
+            self.log_file, maxBytes=10 * 1024 * 1024, backupCount=30, encoding='utf-8'
+        )
+        self.file_handler.setFormatter(JsonLinesFormatter())
+        self.console_handler = logging.StreamHandler()
+        self.console_handler.setFormatter(logging.Formatter(self.LOG_FORMAT))
+        
+        self._queue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(
+            self._queue, self.file_handler, self.console_handler, respect_handler_level=True
+        )
+        
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(DeferredQueueHandler(self._queue))
+        root.setLevel(logging.INFO)
+        self._listener.start()
+    
+    def configure(self, logging_config: dict):
+        """
+        設定ファイルのlogging項目を反映
+        
+        レベル未満のログはロガーの段階で捨てられるため、%形式の引数で渡した
+        メッセージは組み立てられない。
+        
+        Args:
+            logging_config: logging設定（level, log_rotation_mb, log_backup_count）
+        """
+        level_name = str(logging_config.get('level', 'INFO')).upper()
+        level = logging.getLevelName(level_name)
+        if not isinstance(level, int):
+            logging.getLogger(self.__class__.__name__).warning("不明なログレベルのためINFOを使用: %s", level_name)
+            level = logging.INFO
+        logging.getLogger().setLevel(level)
+        
+        # 0はローテーションなし
+        self.file_handler.maxBytes = int(logging_config.get('log_rotation_mb', 10) * 1024 * 1024)
+        self.file_handler.backupCount = logging_config.get('log_backup_count', 30)
+    
+    def stop(self):
+        """キューに残ったログを書き出して停止"""
+        self._listener.stop()
+        self.file_handler.close()
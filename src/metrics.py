@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機能:
+- 処理段階ごとの所要時間の記録（一覧取得・メタデータ取得・転送・MD5・削除など）
+- 実行ごとのJSONサマリー（data/metrics.jsonl に1実行1行で追記）
+- Prometheus形式での出力（テキストファイル、常駐モードではHTTPエンドポイント）
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class MetricsRecorder:
+    """処理段階ごとの所要時間・件数の記録（スレッドセーフ）"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        
+        # 段階名 -> 所要時間（秒）のリスト（drainまでの分）
+        self._durations: Dict[str, List[float]] = {}
+    
+    @contextmanager
+    def stage(self, name: str):
+        """withブロックの所要時間を段階として記録"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started_at)
+    
+    def observe(self, name: str, seconds: float):
+        """段階の所要時間を記録"""
+        with self._lock:
+            self._durations.setdefault(name, []).append(seconds)
+    
+    def drain(self) -> Dict[str, List[float]]:
+        """記録した所要時間を取り出して消去（実行ごとの集計用）"""
+        with self._lock:
+            durations, self._durations = self._durations, {}
+        return durations
+
+
+def summarize_durations(durations: List[float]) -> dict:
+    """所要時間のリストから件数・合計・パーセンタイルを計算"""
+    ordered = sorted(durations)
+    
+    def percentile(p: float) -> float:
+        # 最近傍順位法（件数が少なくても実際に観測した値を返す）
+        index = max(0, -(-len(ordered) * p // 100) - 1)
+        return ordered[int(index)]
+    
+    total = sum(ordered)
+    return {
+        'count': len(ordered),
+        'total_sec': round(total, 6),
+        'mean_sec': round(total / len(ordered), 6),
+        'p50_sec': round(percentile(50), 6),
+        'p95_sec': round(percentile(95), 6),
+        'p99_sec': round(percentile(99), 6),
+        'max_sec': round(ordered[-1], 6),
+    }
+
+
+class SyncRun:
+    """1回の監視・処理サイクルの計測"""
+    
+    def __init__(self, counters_before: Dict[str, float]):
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+        self.counters_before = counters_before
+        self.files_found = 0
+        self.files_processed = 0
+        self.error: Optional[str] = None
+    
+    def elapsed(self) -> float:
+        """開始からの経過秒数"""
+        return time.perf_counter() - self._started
+
+
+class MetricsExporter:
+    """実行ごとのメトリクスの集計・出力"""
+    
+    # Prometheusのメトリクス名の接頭辞
+    PREFIX = 'autosync'
+    
+    # Prometheusに出力するパーセンタイル
+    QUANTILES = (('0.5', 'p50_sec'), ('0.95', 'p95_sec'), ('0.99', 'p99_sec'))
+    
+    def __init__(self, config: dict, project_root: Path, sources: dict):
+        """
+        初期化
+        
+        Args:
+            config: 設定辞書
+            project_root: 相対パスの基準フォルダ
+            sources: 集計対象（名前 -> statsとmetricsを持つオブジェクト）
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.sources = sources
+        
+        metrics_config = config.get('metrics', {})
+        self.enabled = metrics_config.get('enabled', True)
+        summary_file = metrics_config.get('summary_file', 'data/metrics.jsonl')
+        self.summary_file = project_root / summary_file if summary_file else None
+        textfile = metrics_config.get('prometheus_textfile', '')
+        self.prometheus_textfile = project_root / textfile if textfile else None
+        self.http_host = metrics_config.get('http_host', '127.0.0.1')
+        self.http_port = metrics_config.get('http_port', 0)
+        
+        # プロセス起動後の累計（Prometheusのcounter・summaryの_sum/_count用）
+        self._lock = threading.Lock()
+        self._stage_totals: Dict[str, List[float]] = {}
+        self._counter_totals: Dict[str, float] = {}
+        self._runs = {'success': 0, 'error': 0}
+        self._prometheus_text = ''
+        self._server = None
+        
+        # 前回の実行終了時の統計（初回は起動・認証の分も最初の実行に含める）
+        self._baseline: Dict[str, float] = {}
+    
+    def _collect_counters(self) -> Dict[str, float]:
+        """各オブジェクトの統計（数値のみ）を「名前.項目」形式で取得"""
+        counters = {}
+        for source_name, source in self.sources.items():
+            stats = source.get_stats() if hasattr(source, 'get_stats') else dict(source.stats)
+            for key, value in stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    counters[f"{source_name}.{key}"] = value
+        return counters
+    
+    def _drain_durations(self) -> Dict[str, List[float]]:
+        """各オブジェクトに記録された所要時間を取り出す"""
+        durations = {}
+        for source in self.sources.values():
+            recorder = getattr(source, 'metrics', None)
+            if isinstance(recorder, MetricsRecorder):
+                for name, values in recorder.drain().items():
+                    durations.setdefault(name, []).extend(values)
+        return durations
+    
+    def start_run(self) -> SyncRun:
+        """
+        実行の計測を開始
+        
+        所要時間・統計は前回の実行終了時からの分を集計する（実行の間の通知チャンネル
+        更新や、初回の起動・認証もそれぞれ次の実行に含める）。
+        """
+        return SyncRun(dict(self._baseline))
+    
+    def finish_run(self, run: SyncRun):
+        """実行の計測を終了してサマリーを出力（出力エラーで処理を止めない）"""
+        if not self.enabled:
+            # 記録は各オブジェクトに溜まり続けるため出力しない場合も取り出して捨てる
+            self._drain_durations()
+            return
+        
+        try:
+            summary = self._build_summary(run)
+            self._write_summary(summary)
+            self._update_prometheus(summary)
+            self.logger.info(self._format_log(summary))
+        except Exception as e:
+            self.logger.warning(f"メトリクス出力エラー: {e}")
+    
+    def _build_summary(self, run: SyncRun) -> dict:
+        """実行ごとのサマリーを作成"""
+        duration = run.elapsed()
+        durations = self._drain_durations()
+        counters_after = self._collect_counters()
+        self._baseline = counters_after
+        counters = {
+            key: round(value - run.counters_before.get(key, 0), 6)
+            for key, value in counters_after.items()
+            if value != run.counters_before.get(key, 0)
+        }
+        stages = {name: summarize_durations(values) for name, values in sorted(durations.items()) if values}
+        
+        # 一括処理の経過時間あたりのダウンロード量（並列ワーカーの転送は重なるため合計時間は使わない）
+        wall_sec = stages.get('process_files', {}).get('total_sec', 0)
+        downloaded = counters.get('processor.bytes_downloaded', 0)
+        
+        with self._lock:
+            for name, values in durations.items():
+                totals = self._stage_totals.setdefault(name, [0, 0.0])
+                totals[0] += len(values)
+                totals[1] += sum(values)
+            for key, value in counters.items():
+                self._counter_totals[key] = self._counter_totals.get(key, 0) + value
+            self._runs['error' if run.error else 'success'] += 1
+        
+        return {
+            'started_at': run.started_at.isoformat(timespec='seconds'),
+            'duration_sec': round(duration, 3),
+            'files_found': run.files_found,
+            'files_processed': run.files_processed,
+            'error': run.error,
+            'download_mb_per_sec': round(downloaded / 1024 / 1024 / wall_sec, 3) if wall_sec > 0 else None,
+            'stages': stages,
+            'counters': counters,
+        }
+    
+    def _write_summary(self, summary: dict):
+        """サマリーをJSON Lines形式で追記"""
+        if self.summary_file is None:
+            return
+        self.summary_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.summary_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+    
+    @staticmethod
+    def _metric_name(key: str) -> str:
+        """統計の項目名をPrometheusのメトリクス名に使える形に変換"""
+        return ''.join(c if c.isalnum() else '_' for c in key).lower()
+    
+    def _render_prometheus(self, summary: dict) -> str:
+        """Prometheusのテキスト形式を作成"""
+        prefix = self.PREFIX
+        lines = [
+            f"# HELP {prefix}_stage_seconds Duration of sync stages (quantiles of the last run, totals since start).",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        with self._lock:
+            stage_totals = {name: tuple(totals) for name, totals in self._stage_totals.items()}
+            counter_totals = dict(self._counter_totals)
+            runs = dict(self._runs)
+        
+        for name in sorted(stage_totals):
+            stage = summary['stages'].get(name)
+            if stage:
+                for quantile, key in self.QUANTILES:
+                    lines.append(f'{prefix}_stage_seconds{{stage="{name}",quantile="{quantile}"}} {stage[key]}')
+            count, total = stage_totals[name]
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {total:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {count}')
+        
+        lines += [
+            f"# HELP {prefix}_events_total Counters reported by the sync components (totals since start).",
+            f"# TYPE {prefix}_events_total counter",
+        ]
+        for key in sorted(counter_totals):
+            source, _, name = key.partition('.')
+            lines.append(
+                f'{prefix}_events_total{{source="{source}",name="{self._metric_name(name)}"}} {counter_totals[key]:g}'
+            )
+        
+        lines += [
+            f"# HELP {prefix}_runs_total Sync runs since start.",
+            f"# TYPE {prefix}_runs_total counter",
+        ]
+        for result, count in sorted(runs.items()):
+            lines.append(f'{prefix}_runs_total{{result="{result}"}} {count}')
+        
+        lines += [
+            f"# HELP {prefix}_last_run_duration_seconds Duration of the last sync run.",
+            f"# TYPE {prefix}_last_run_duration_seconds gauge",
+            f"{prefix}_last_run_duration_seconds {summary['duration_sec']}",
+            f"# HELP {prefix}_last_run_files Files found and processed by the last sync run.",
+            f"# TYPE {prefix}_last_run_files gauge",
+            f'{prefix}_last_run_files{{state="found"}} {summary["files_found"]}',
+            f'{prefix}_last_run_files{{state="processed"}} {summary["files_processed"]}',
+            f"# HELP {prefix}_last_run_timestamp_seconds Start time of the last sync run.",
+            f"# TYPE {prefix}_last_run_timestamp_seconds gauge",
+            f"{prefix}_last_run_timestamp_seconds {datetime.fromisoformat(summary['started_at']).timestamp():.0f}",
+        ]
+        return "\n".join(lines) + "\n"
+    
+    def _update_prometheus(self, summary: dict):
+        """Prometheus形式の出力を更新（テキストファイルは置き換えで書き込む）"""
+        if self.prometheus_textfile is None and self._server is None:
+            return
+        
+        text = self._render_prometheus(summary)
+        with self._lock:
+            self._prometheus_text = text
+        
+        if self.prometheus_textfile is not None:
+            self.prometheus_textfile.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.prometheus_textfile.with_name(self.prometheus_textfile.name + ".tmp")
+            tmp_file.write_text(text, encoding='utf-8')
+            os.replace(tmp_file, self.prometheus_textfile)
+    
+    @staticmethod
+    def _format_log(summary: dict) -> str:
+        """ログ出力用の段階別所要時間"""
+        stages = ", ".join(
+            f"{name}={stage['total_sec']:.2f}秒/{stage['count']}回(p95={stage['p95_sec']*1000:.0f}ms)"
+            for name, stage in summary['stages'].items()
+        )
+        return f"段階別所要時間: {stages or 'なし'}"
+    
+    def _make_handler(self):
+        """/metricsに最新のPrometheus形式を返すハンドラクラスを作成"""
+        exporter = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                with exporter._lock:
+                    body = exporter._prometheus_text.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                exporter.logger.debug("メトリクス要求: %s " + format, self.address_string(), *args)
+        
+        return MetricsHandler
+    
+    def start_http(self):
+        """PrometheusのHTTPエンドポイントを起動（http_portが0の場合は何もしない）"""
+        if not self.enabled or not self.http_port:
+            return
+        
+        self._server = ThreadingHTTPServer((self.http_host, self.http_port), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='metrics-http', daemon=True).start()
+        self.logger.info(f"メトリクスのHTTPエンドポイントを開始: http://{self.http_host}:{self.http_port}/metrics")
+    
+    def stop(self):
+        """HTTPエンドポイントの停止"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機能:
+- 一覧取得・ダウンロード・整合性確認・Drive削除を段階ごとのワーカーで並行実行
+- 最初の一覧ページが届いた時点でダウンロードを開始
+- 段階の間は上限付きキューで接続（後段が遅れると前段が待つ）
+- Drive削除は届いたものをまとめてバッチで実行（一覧取得が終わるまでは保留、上限に達したらダウンロードを一時停止）
+- 非同期クライアント使用時はダウンロード段階を1本のイベントループで多数同時に実行
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from .scheduler import ScheduledRun
+
+# 削除キューに入れる一覧取得完了の合図
+LISTING_DONE = object()
+
+
+class ProcessingPipeline:
+    """ファイル処理パイプライン（1回の実行分）"""
+    
+    def __init__(self, config: dict, processor, monitor, run: ScheduledRun):
+        """
+        初期化
+        
+        Args:
+            config: 設定辞書
+            processor: FileProcessorインスタンス（各段階の処理）
+            monitor: DriveMonitorインスタンス
+            run: ダウンロードキュー（一覧の取得に合わせてファイルを追加する）
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.processor = processor
+        self.monitor = monitor
+        self.run = run
+        
+        pipeline_config = config.get('pipeline', {})
+        self.download_workers = processor.max_workers
+        
+        # 非同期クライアント使用時はスレッドの代わりにイベントループ上のタスクでダウンロードする
+        self.async_client = getattr(monitor, 'async_client', None)
+        if self.async_client is not None:
+            self.download_workers = self.async_client.concurrency
+        self.verify_workers = max(1, pipeline_config.get('verify_workers', 1))
+        
+        # 整合性確認待ち（転送済みの一時ファイル）・削除待ちの上限。超えると前段が待つ
+        self._verify_queue = queue.Queue(maxsize=max(1, pipeline_config.get('verify_queue_size', 8)))
+        self._delete_queue = queue.Queue(maxsize=max(1, pipeline_config.get('delete_queue_size', 200)))
+        
+        # 削除のバッチが埋まるまで待つ最大時間（後続のファイルをまとめて1回で削除する）
+        self.delete_batch_wait = pipeline_config.get('delete_batch_wait_sec', 2.0)
+        
+        # 一覧取得中に保留する削除待ちの上限（超えると一覧取得の完了まで前段を止める、0は無制限）
+        self.max_held_deletes = pipeline_config.get('max_held_deletes', 1000)
+        self._listing_done = threading.Event()
+        
+        self._lock = threading.Lock()
+        self.succeeded = 0
+        self.failed = 0
+    
+    def execute(self, batches: Iterable[List[dict]]) -> int:
+        """
+        パイプラインを実行
+        
+        一覧の取得は呼び出し元のスレッドで行い、取得したページから順にダウンロードキューに
+        追加する。一覧取得でエラーが発生した場合も、追加済みのファイルは処理を終えてから
+        エラーを送出する。
+        
+        Args:
+            batches: 新しいファイルのリストを順に返すイテラブル（一覧のページ単位）
+        
+        Returns:
+            処理に成功したファイル数
+        """
+        self.logger.info(
+            f"パイプライン開始: ダウンロード={self.download_workers}{'（非同期）' if self.async_client else ''}, "
+            f"整合性確認={self.verify_workers}, 削除=1"
+        )
+        
+        download_threads = 1 if self.async_client is not None else self.download_workers
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='delete') as deleter, \
+                ThreadPoolExecutor(max_workers=self.verify_workers, thread_name_prefix='verify') as verifiers, \
+                ThreadPoolExecutor(max_workers=download_threads, thread_name_prefix='download') as downloaders:
+            delete_future = deleter.submit(self._delete_worker)
+            verify_futures = [verifiers.submit(self._verify_worker) for _ in range(self.verify_workers)]
+            if self.async_client is not None:
+                download_futures = [downloaders.submit(self.async_client.run, self._download_async())]
+            else:
+                download_futures = [downloaders.submit(self._download_worker) for _ in range(self.download_workers)]
+            
+            # 後段から順に終了させる（各段階は前段の終了後にキューを空にしてから終わる）
+            try:
+                for batch in batches:
+                    self.run.add(batch)
+            finally:
+                self._listing_done.set()
+                self._delete_queue.put(LISTING_DONE)
+                self.run.close()
+                self._wait(download_futures)
+                for _ in verify_futures:
+                    self._verify_queue.put(None)
+                self._wait(verify_futures)
+                self._delete_queue.put(None)
+                self._wait([delete_future])
+        
+        return self.succeeded
+    
+    def _wait(self, futures: list):
+        """段階のワーカーの終了を待つ（予期しないエラーでも後段の終了処理を続ける）"""
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                self.logger.error(f"パイプラインのワーカーが異常終了: {e}")
+    
+    def _record(self, success: bool, count: int = 1):
+        """処理結果の集計"""
+        with self._lock:
+            if success:
+                self.succeeded += count
+            else:
+                self.failed += count
+    
+    def _download_worker(self):
+        """ダウンロード段階: キューから取り出したファイルを一時ファイルに転送"""
+        for file_info in iter(self.run.next_file, None):
+            started_at = time.perf_counter()
+            try:
+                downloaded = self.processor.fetch_file(self.monitor, file_info)
+            except Exception as e:
+                self.logger.error(f"ファイル処理エラー: {file_info['name']} - {e}")
+                downloaded = None
+            
+            if downloaded is None:
+                self.logger.warning(f"ファイル処理失敗: {file_info['name']}")
+                self._record(False)
+                continue
+            
+            # 整合性確認が遅れている場合はここで待つ（転送済みの一時ファイルを溜め込まない）
+            self._verify_queue.put((file_info, downloaded, started_at))
+    
+    async def _download_async(self):
+        """
+        ダウンロード段階（非同期クライアント）: download_workers個のタスクで同時に転送
+        
+        キューからの取り出しと整合性確認への受け渡しは待機を伴うため、それぞれ専用の
+        スレッドで行う（イベントループを止めない）。
+        """
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue(maxsize=self.download_workers)
+        
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='download-feed') as feeder, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix='download-handoff') as handoff:
+            
+            async def feed():
+                try:
+                    while (file_info := await loop.run_in_executor(feeder, self.run.next_file)) is not None:
+                        await pending.put(file_info)
+                finally:
+                    for _ in range(self.download_workers):
+                        await pending.put(None)
+            
+            async def transfer():
+                while (file_info := await pending.get()) is not None:
+                    started_at = time.perf_counter()
+                    try:
+                        downloaded = await self.processor.fetch_file_async(self.monitor, file_info)
+                    except Exception as e:
+                        self.logger.error(f"ファイル処理エラー: {file_info['name']} - {e}")
+                        downloaded = None
+                    
+                    if downloaded is None:
+                        self.logger.warning(f"ファイル処理失敗: {file_info['name']}")
+                        self._record(False)
+                        continue
+                    
+                    await loop.run_in_executor(handoff, self._verify_queue.put, (file_info, downloaded, started_at))
+            
+            await asyncio.gather(feed(), *(transfer() for _ in range(self.download_workers)))
+    
+    def _verify_worker(self):
+        """整合性確認段階: MD5の照合と最終配置"""
+        for file_info, downloaded, started_at in iter(self._verify_queue.get, None):
+            try:
+                final_file = self.processor.complete_download(file_info, downloaded)
+            except Exception as e:
+                self.logger.error(f"ファイル処理エラー: {file_info['name']} - {e}")
+                final_file = None
+            
+            if final_file is None:
+                self.logger.warning(f"ファイル処理失敗: {file_info['name']}")
+                self._record(False)
+                continue
+            
+            self._delete_queue.put((file_info, final_file, started_at))
+    
+    def _next_delete_batch(self) -> Optional[list]:
+        """
+        削除待ちをバッチ上限までまとめて取り出す
+        
+        最初の1件が届いてからdelete_batch_wait秒までは後続を待つ。
+        
+        Returns:
+            削除待ちのリスト（一覧取得完了の合図を含む場合あり）、終了時はNone
+        """
+        item = self._delete_queue.get()
+        if item is None:
+            return None
+        
+        batch = [item]
+        deadline = time.monotonic() + self.delete_batch_wait
+        while len(batch) < self.monitor.BATCH_LIMIT and item is not LISTING_DONE:
+            try:
+                item = self._delete_queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item is None:
+                # 終了の合図は次の取り出しで返す
+                self._delete_queue.put(None)
+                break
+            batch.append(item)
+        return batch
+    
+    def _delete_worker(self):
+        """
+        削除段階: Driveからの一括削除と処理済みマーク
+        
+        一覧取得中にDriveから削除すると後続ページの位置がずれてファイルを取りこぼすため、
+        一覧取得が終わるまでは受け取ったファイルを保留する。保留がmax_held_deletesに達した場合は
+        削除キューの取り出しを止め、整合性確認・ダウンロードを待たせて一覧取得の完了を待つ。
+        """
+        held = []
+        for batch in iter(self._next_delete_batch, None):
+            held.extend(item for item in batch if item is not LISTING_DONE)
+            if not self._listing_done.is_set():
+                if not self.max_held_deletes or len(held) < self.max_held_deletes:
+                    continue
+                
+                # 前段を止めても一覧取得は進むようダウンロードキューの上限を外す
+                self.logger.info(f"Drive削除の保留が{len(held)}個に達したため一覧取得の完了までダウンロードを一時停止")
+                self.run.release_limit()
+                self._listing_done.wait()
+            
+            while held:
+                items, held = held[:self.monitor.BATCH_LIMIT], held[self.monitor.BATCH_LIMIT:]
+                self._delete_items(items)
+        
+        if held:
+            self._delete_items(held)
+    
+    def _delete_items(self, items: list):
+        """Driveからの一括削除と処理済みマーク（結果を集計）"""
+        try:
+            failures = self.processor.finish_batch([(file_info, final_file) for file_info, final_file, _ in items])
+        except Exception as e:
+            self.logger.error(f"Google Drive一括削除エラー: {e}")
+            failures = len(items)
+        
+        self._record(True, len(items) - failures)
+        self._record(False, failures)
+        now = time.perf_counter()
+        for _, _, started_at in items:
+            self.processor.metrics.observe('file', now - started_at)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機能:
+- トークンバケット方式の流量制限
+- 複数スレッドで共有可能な帯域・リクエスト数の上限管理
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """トークンバケット（スレッドセーフ）"""
+    
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        初期化
+        
+        Args:
+            rate: 1秒あたりに補充されるトークン数（0以下は無制限）
+            capacity: バケットの最大トークン数（省略時はrateと同じ）
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        """制限が有効かどうか"""
+        return self.rate > 0
+    
+    def _refill(self):
+        """経過時間に応じてトークンを補充"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+    
+    def reserve(self, amount: float = 1) -> float:
+        """
+        トークンを消費し、使用できるまでの待ち時間を返す（待機はしない）
+        
+        容量を超える量を要求された場合は前借りとして扱い、その分だけ待ち時間が延びる。
+        イベントループなど、呼び出し元でスレッドを止めずに待つ場合に使用する。
+        
+        Args:
+            amount: 消費するトークン数
+        
+        Returns:
+            待つべき秒数
+        """
+        if not self.enabled or amount <= 0:
+            return 0.0
+        
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+    
+    def consume(self, amount: float = 1) -> float:
+        """
+        トークンを消費（不足時は補充されるまで待機）
+        
+        Args:
+            amount: 消費するトークン数
+        
+        Returns:
+            待機した秒数
+        """
+        wait_time = self.reserve(amount)
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機能:
+- ダウンロード順序の決定（小さい順・更新日時の古い順・拡張子ごとの優先度）
+- 1回の実行あたりのダウンロード量・時間の上限
+- ファイルごとのキュー待ち時間の記録
+- 一覧の取得中から処理を始められる追加式のキュー（上限数を超える追加は待機）
+- 並び順を指定した場合は一覧の取得完了までダウンロードを保留して全体に適用
+"""
+
+import heapq
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+
+class ScheduledRun:
+    """1回の実行分のダウンロードキュー（スレッドセーフ）"""
+    
+    def __init__(self, sort_key: Callable[[dict], tuple], max_bytes: int = 0, max_seconds: float = 0,
+                 admit: Optional[Callable[[dict], bool]] = None,
+                 on_defer: Optional[Callable[[dict], None]] = None,
+                 max_queued: int = 0, hold_until_closed: bool = False):
+        """
+        初期化
+        
+        ファイルはaddで一覧の取得に合わせて順に追加し、キューにある中から並び順の先頭を
+        取り出す。サイズ上限と受け入れ判定（ディスク容量の予約など）は追加時に行い、
+        上限を超えるファイルは次回に回す。ただし最初の1個はサイズ上限より大きくても
+        受け入れる（上限より大きいファイルがいつまでも処理されないのを防ぐ）。
+        hold_until_closedの場合はcloseまで取り出しを保留し、全ファイルを並び順に
+        受け入れ判定する（並び順とサイズ上限を一覧全体に対して適用する）。
+        
+        Args:
+            sort_key: 並び替えキー（キュー内で小さいものから取り出す、同じなら追加順）
+            max_bytes: 開始するファイルの合計サイズ上限（0は無制限）
+            max_seconds: この秒数を過ぎたら新しいファイルを開始しない（0は無制限）
+            admit: ファイルを受け入れるかどうかの判定（Falseなら次回に回す）
+            on_defer: 受け入れ後に時間上限で次回に回したファイルの通知（予約の解放用）
+            max_queued: キューに入れておく最大数（超えるとaddが取り出しを待つ、0は無制限）
+            hold_until_closed: closeまでファイルを取り出さない（max_queuedは適用しない）
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.sort_key = sort_key
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.admit = admit
+        self.on_defer = on_defer
+        self.max_queued = 0 if hold_until_closed else max_queued
+        self.hold_until_closed = hold_until_closed
+        
+        # closeまで保留しているファイル（hold_until_closedの場合）
+        self._held = []
+        
+        # (並び替えキー, 追加順, 追加時刻, ファイル情報)
+        self._queue = []
+        self._sequence = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._started_at = time.monotonic()
+        self._planned_bytes = 0
+        self._admitted = 0
+        self._seen_ids = set()
+        
+        self.total = 0
+        self.started = 0
+        self.deferred = []
+        self.queue_waits = []
+    
+    def _expired(self, now: float) -> bool:
+        """時間上限を過ぎたかどうか"""
+        return bool(self.max_seconds) and now - self._started_at >= self.max_seconds
+    
+    def add(self, file_infos: Iterable[dict]):
+        """
+        ファイルをキューに追加（max_queuedに達している場合は空きが出るまで待つ）
+        
+        追加済みのIDは無視する（前回から再開したファイルが一覧にも含まれる場合など）。
+        hold_until_closedの場合はcloseまで保留する。
+        
+        Args:
+            file_infos: ファイル情報のリスト
+        """
+        if self.hold_until_closed:
+            self._held.extend(file_infos)
+            return
+        self._enqueue(file_infos)
+    
+    def _enqueue(self, file_infos: Iterable[dict]):
+        """受け入れ判定を行ってキューに追加"""
+        for file_info in file_infos:
+            if file_info['id'] in self._seen_ids:
+                continue
+            self._seen_ids.add(file_info['id'])
+            self.total += 1
+            size = int(file_info.get('size', 0))
+            if self._expired(time.monotonic()) or (
+                    self.max_bytes and self._admitted and self._planned_bytes + size > self.max_bytes):
+                self.deferred.append(file_info)
+                continue
+            if self.admit is not None and not self.admit(file_info):
+                self.logger.info("容量不足のため次回に処理: %s", file_info['name'])
+                self.deferred.append(file_info)
+                continue
+            self._planned_bytes += size
+            self._admitted += 1
+            
+            with self._condition:
+                while (self.max_queued and len(self._queue) >= self.max_queued
+                       and not self._expired(time.monotonic())):
+                    self._condition.wait(timeout=1.0)
+                if self._expired(time.monotonic()):
+                    self._defer(file_info)
+                    continue
+                heapq.heappush(self._queue, (self.sort_key(file_info), self._sequence, time.monotonic(), file_info))
+                self._sequence += 1
+                self._condition.notify()
+    
+    def release_limit(self):
+        """max_queuedによる追加の待機を解除（以降は上限なしで追加する）"""
+        with self._condition:
+            self.max_queued = 0
+            self._condition.notify_all()
+    
+    def close(self):
+        """追加の終了（キューが空になったらnext_fileはNoneを返す）"""
+        if self._held:
+            held, self._held = self._held, []
+            self._enqueue(sorted(held, key=self.sort_key))
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+    
+    def _defer(self, file_info: dict):
+        """受け入れ済みのファイルを次回に回す（ロック取得済みで呼び出す）"""
+        self.deferred.append(file_info)
+        if self.on_defer is not None:
+            self.on_defer(file_info)
+    
+    def next_file(self) -> Optional[dict]:
+        """
+        次に処理するファイルを取得（キューが空の場合は追加か終了まで待つ）
+        
+        時間上限を過ぎた場合は残りを次回に回す。
+        
+        Returns:
+            ファイル情報、これ以上開始しない場合はNone
+        """
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                if self._expired(now):
+                    if self._queue:
+                        self.logger.info(f"時間上限（{self.max_seconds}秒）に達したため残り{len(self._queue)}個は次回に処理")
+                        for _, _, _, file_info in sorted(self._queue):
+                            self._defer(file_info)
+                        self._queue.clear()
+                        self._condition.notify_all()
+                    return None
+                if self._queue:
+                    break
+                if self._closed:
+                    return None
+                self._condition.wait(timeout=1.0)
+            
+            _, _, enqueued_at, file_info = heapq.heappop(self._queue)
+            wait = now - enqueued_at
+            self.started += 1
+            self.queue_waits.append(wait)
+            self._condition.notify_all()
+        
+        self.logger.info("キュー待ち時間: %s %.2f秒", file_info['name'], wait)
+        return file_info
+    
+    def log_summary(self):
+        """キュー待ち時間と次回に回したファイル数をログ出力"""
+        if self.queue_waits:
+            average = sum(self.queue_waits) / len(self.queue_waits)
+            self.logger.info(
+                f"スケジュール結果: 開始={self.started}/{self.total}個, "
+                f"キュー待ち時間 平均={average:.2f}秒 最大={max(self.queue_waits):.2f}秒"
+            )
+        if self.deferred:
+            deferred_mb = sum(int(file_info.get('size', 0)) for file_info in self.deferred) / 1024 / 1024
+            self.logger.info(f"上限により次回に回したファイル: {len(self.deferred)}個 ({deferred_mb:.1f}MB)")
+
+
+class DownloadScheduler:
+    """ダウンロードスケジューラクラス"""
+    
+    # 並び順のポリシー
+    POLICIES = ('listing', 'smallest_first', 'oldest_first')
+    
+    def __init__(self, config: dict):
+        """
+        初期化
+        
+        Args:
+            config: 設定辞書
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        
+        scheduler_config = config.get('scheduler', {})
+        self.policy = scheduler_config.get('policy', 'listing')
+        if self.policy not in self.POLICIES:
+            self.logger.warning(f"不明なスケジュールポリシーのため取得順で処理します: {self.policy}")
+            self.policy = 'listing'
+        
+        # 拡張子の優先順（先頭ほど優先、リストにない拡張子は最後）
+        self.extension_priority = [ext.lower() for ext in scheduler_config.get('extension_priority', [])]
+        
+        self.max_bytes = int(scheduler_config.get('max_bytes_per_run_mb', 0) * 1024 * 1024)
+        self.max_seconds = scheduler_config.get('max_seconds_per_run', 0)
+    
+    def _sort_key(self, file_info: dict):
+        """並び替えキー（拡張子の優先度 → ポリシー）"""
+        ext = Path(file_info.get('name', '')).suffix.lower()
+        priority = (self.extension_priority.index(ext) if ext in self.extension_priority
+                    else len(self.extension_priority))
+        
+        if self.policy == 'smallest_first':
+            return priority, int(file_info.get('size', 0))
+        if self.policy == 'oldest_first':
+            # modifiedTimeはRFC 3339形式のため文字列比較で時刻順になる
+            return priority, file_info.get('modifiedTime', '')
+        return priority,
+    
+    def start_run(self, admit: Optional[Callable[[dict], bool]] = None,
+                  on_defer: Optional[Callable[[dict], None]] = None,
+                  max_queued: int = 0) -> ScheduledRun:
+        """
+        1回の実行分の空のキューを作成（ファイルは一覧の取得に合わせてaddで追加する）
+        
+        listingポリシーでは一覧の取得中から取得順にダウンロードを始める。それ以外では
+        並び順・サイズ上限を一覧全体に適用するため、取得が終わるまでダウンロードを始めない。
+        
+        Args:
+            admit: ファイルを受け入れるかどうかの判定（並び順に呼ばれる）
+            on_defer: 受け入れ後に次回に回したファイルの通知
+            max_queued: キューに入れておく最大数（0は無制限、listing以外では適用しない）
+        
+        Returns:
+            ダウンロードキュー
+        """
+        self.logger.debug("スケジュール作成: ポリシー=%s", self.policy)
+        hold = self.policy != 'listing' or bool(self.extension_priority)
+        return ScheduledRun(self._sort_key, self.max_bytes, self.max_seconds, admit, on_defer, max_queued,
+                            hold_until_closed=hold)
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機能:
+- SQLite（WALモード）による処理済みファイルIDの管理
+- インデックスによる高速な存在確認（全件読み込み不要）
+- 実行ごとのまとめてコミット
+- Driveから削除済みのIDの保持期間管理と圧縮
+- アップロード中ファイルの観測記録（サイズ・更新日時の安定判定用）
+- ファイルごとの処理段階のジャーナル（中断後は完了した段階の次から再開）
+- processed_files.txtからの一回限りの移行
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+
+class PendingUpload(NamedTuple):
+    """アップロード完了待ちファイルの観測記録"""
+    size: int
+    modified: str
+    md5: str
+    first_seen_at: float
+    stable_since: float
+
+
+class JournalEntry(NamedTuple):
+    """処理中ファイルのジャーナル記録"""
+    state: str
+    file_info: dict
+    temp_path: Optional[str]
+    final_path: Optional[str]
+    md5: Optional[str]
+    updated_at: float
+
+
+class ProcessedStore:
+    """処理済みファイルストアクラス"""
+    
+    # 1回のクエリで確認するIDの最大数（SQLiteの変数上限より小さくする）
+    LOOKUP_BATCH_SIZE = 500
+    
+    # 未コミットの追加がこの件数に達したら自動コミット
+    AUTO_COMMIT_SIZE = 100
+    
+    # 保持期間切れで削除した件数がこれを超えたらVACUUMで圧縮
+    VACUUM_THRESHOLD = 10000
+    
+    # ジャーナルの処理段階（この順に進む。doneは処理済みIDへの追加で表し、ジャーナルからは消す）
+    JOURNAL_STATES = ('discovered', 'downloading', 'verified', 'finalized', 'remote_deleted', 'done')
+    
+    def __init__(self, db_file: Path, legacy_file: Path = None, retention_days: int = 90):
+        """
+        初期化
+        
+        Args:
+            db_file: SQLiteデータベースファイルパス
+            legacy_file: 移行元のprocessed_files.txt（存在する場合のみ移行）
+            retention_days: Driveから削除済みのIDを保持する日数（0以下は無期限）
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.db_file = db_file
+        self.retention_days = retention_days
+        
+        self._lock = threading.Lock()
+        self._pending = {}
+        
+        # ファイルID -> 未コミットのジャーナル更新（同じファイルの更新はまとめて1行にする）
+        self._journal = {}
+        
+        self.db_file.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_file), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # ジャーナルはDriveから削除する前に確実にディスクへ書き出す必要があるため、コミットごとに同期する
+        # （コミットはまとめて行うため同期の回数は少ない）
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS processed_files ("
+            " file_id TEXT PRIMARY KEY,"
+            " processed_at TEXT NOT NULL,"
+            " remote_deleted INTEGER NOT NULL DEFAULT 0"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pending_files ("
+            " file_id TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " modified TEXT NOT NULL,"
+            " md5 TEXT NOT NULL,"
+            " first_seen_at REAL NOT NULL,"
+            " stable_since REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_journal ("
+            " file_id TEXT PRIMARY KEY,"
+            " state TEXT NOT NULL,"
+            " file_info TEXT NOT NULL,"
+            " temp_path TEXT,"
+            " final_path TEXT,"
+            " md5 TEXT,"
+            " updated_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.commit()
+        
+        if legacy_file is not None:
+            self._migrate_legacy_file(legacy_file)
+    
+    def _migrate_legacy_file(self, legacy_file: Path):
+        """processed_files.txtからの移行（移行後はファイル名を変更）"""
+        if not legacy_file.exists():
+            return
+        
+        try:
+            content = legacy_file.read_text(encoding='utf-8')
+            file_ids = {line.strip() for line in content.splitlines() if line.strip()}
+            now = datetime.now().isoformat()
+            
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO processed_files (file_id, processed_at, remote_deleted) VALUES (?, ?, 0)",
+                    ((file_id, now) for file_id in file_ids)
+                )
+                self._conn.commit()
+            
+            legacy_file.rename(legacy_file.with_name(legacy_file.name + ".migrated"))
+            self.logger.info(f"処理済みファイルリストを移行しました: {len(file_ids)}件")
+        
+        except Exception as e:
+            self.logger.error(f"処理済みファイルリスト移行エラー: {e}")
+    
+    def filter_processed(self, file_ids: Iterable[str]) -> Set[str]:
+        """
+        指定したIDのうち処理済みのものを取得
+        
+        Args:
+            file_ids: 確認するファイルIDのリスト
+        
+        Returns:
+            処理済みのファイルIDの集合
+        """
+        file_ids = list(file_ids)
+        
+        with self._lock:
+            processed = {file_id for file_id in file_ids if file_id in self._pending}
+            for i in range(0, len(file_ids), self.LOOKUP_BATCH_SIZE):
+                batch = file_ids[i:i + self.LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT file_id FROM processed_files WHERE file_id IN ({placeholders})", batch
+                )
+                processed.update(row[0] for row in rows)
+        
+        return processed
+    
+    def add(self, file_id: str, remote_deleted: bool = False):
+        """
+        処理済みIDを追加（コミットはまとめて実行）
+        
+        Args:
+            file_id: ファイルID
+            remote_deleted: Google Driveから削除済みかどうか
+        """
+        with self._lock:
+            self._pending[file_id] = (datetime.now().isoformat(), int(remote_deleted))
+            should_commit = len(self._pending) >= self.AUTO_COMMIT_SIZE
+        
+        if should_commit:
+            self.commit()
+    
+    def record_state(self, file_id: str, state: str, file_info: Optional[dict] = None, **fields):
+        """
+        ファイルの処理段階をジャーナルに記録（コミットはまとめて実行）
+        
+        Args:
+            file_id: ファイルID
+            state: 処理段階（JOURNAL_STATESのいずれか、doneはaddで記録する）
+            file_info: ファイル情報（最初の記録時に指定、再開時の処理に使用）
+            **fields: temp_path, final_path, md5（指定したものだけ更新）
+        """
+        if state not in self.JOURNAL_STATES[:-1]:
+            raise ValueError(f"不明な処理段階: {state}")
+        
+        with self._lock:
+            entry = self._journal.setdefault(file_id, {})
+            entry['state'] = state
+            entry['updated_at'] = time.time()
+            if file_info is not None:
+                entry['file_info'] = json.dumps(file_info, ensure_ascii=False)
+            for key in ('temp_path', 'final_path', 'md5'):
+                if fields.get(key) is not None:
+                    entry[key] = str(fields[key])
+            should_commit = len(self._journal) + len(self._pending) >= self.AUTO_COMMIT_SIZE
+        
+        if should_commit:
+            self.commit()
+    
+    def get_journal(self) -> Dict[str, JournalEntry]:
+        """処理が完了していないファイルのジャーナルを全件取得"""
+        self.commit()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file_id, state, file_info, temp_path, final_path, md5, updated_at FROM file_journal"
+            ).fetchall()
+        
+        return {
+            row[0]: JournalEntry(row[1], json.loads(row[2]), *row[3:])
+            for row in rows
+        }
+    
+    def commit(self):
+        """
+        未コミットの追加・ジャーナル更新をまとめて書き込み
+        
+        処理済みIDの追加とジャーナルからの削除は同じトランザクションで行うため、
+        途中で停止しても両方に残ったり両方から消えたりしない。
+        """
+        with self._lock:
+            if not self._pending and not self._journal:
+                return
+            
+            if self._journal:
+                # 未指定の項目は既存の値を残す
+                self._conn.executemany(
+                    "INSERT INTO file_journal (file_id, state, file_info, temp_path, final_path, md5, updated_at)"
+                    " VALUES (?, ?, COALESCE(?, '{}'), ?, ?, ?, ?)"
+                    " ON CONFLICT(file_id) DO UPDATE SET"
+                    " state = excluded.state,"
+                    " file_info = CASE WHEN ? IS NULL THEN file_info ELSE excluded.file_info END,"
+                    " temp_path = COALESCE(excluded.temp_path, temp_path),"
+                    " final_path = COALESCE(excluded.final_path, final_path),"
+                    " md5 = COALESCE(excluded.md5, md5),"
+                    " updated_at = excluded.updated_at",
+                    (
+                        (file_id, entry['state'], entry.get('file_info'), entry.get('temp_path'),
+                         entry.get('final_path'), entry.get('md5'), entry['updated_at'], entry.get('file_info'))
+                        for file_id, entry in self._journal.items()
+                    )
+                )
+            
+            if self._pending:
+                rows = [(file_id, processed_at, remote_deleted)
+                        for file_id, (processed_at, remote_deleted) in self._pending.items()]
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO processed_files (file_id, processed_at, remote_deleted) VALUES (?, ?, ?)",
+                    rows
+                )
+                # 処理済みになったファイルは完了待ち・ジャーナルから外す
+                self._conn.executemany(
+                    "DELETE FROM pending_files WHERE file_id = ?",
+                    ((file_id,) for file_id in self._pending)
+                )
+                self._conn.executemany(
+                    "DELETE FROM file_journal WHERE file_id = ?",
+                    ((file_id,) for file_id in self._pending)
+                )
+            
+            self._conn.commit()
+            self._pending.clear()
+            self._journal.clear()
+    
+    def get_pending_uploads(self) -> Dict[str, PendingUpload]:
+        """アップロード完了待ちファイルの観測記録を全件取得"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file_id, size, modified, md5, first_seen_at, stable_since FROM pending_files"
+            ).fetchall()
+        
+        return {row[0]: PendingUpload(*row[1:]) for row in rows}
+    
+    def save_pending_uploads(self, uploads: Dict[str, PendingUpload]):
+        """アップロード完了待ちファイルの観測記録を保存（既存は上書き）"""
+        if not uploads:
+            return
+        
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO pending_files"
+                " (file_id, size, modified, md5, first_seen_at, stable_since) VALUES (?, ?, ?, ?, ?, ?)",
+                ((file_id, *upload) for file_id, upload in uploads.items())
+            )
+            self._conn.commit()
+    
+    def remove_pending_uploads(self, file_ids: List[str]):
+        """アップロード完了待ちから除外（削除・移動されたファイル）"""
+        if not file_ids:
+            return
+        
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM pending_files WHERE file_id = ?", ((file_id,) for file_id in file_ids)
+            )
+            self._conn.commit()
+    
+    def compact(self) -> int:
+        """
+        保持期間を過ぎたDrive削除済みIDの削除と圧縮
+        
+        Driveに残っている可能性があるID（削除失敗）は再処理防止のため残す。
+        
+        Returns:
+            削除した件数
+        """
+        if self.retention_days <= 0:
+            return 0
+        
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).isoformat()
+        
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM processed_files WHERE remote_deleted = 1 AND processed_at < ?", (cutoff,)
+            )
+            deleted = cursor.rowcount
+            # ダウンロード前にDriveから消えるなどして更新されないまま残ったジャーナルも削除
+            # （ダウンロード済みの段階は毎回再開されるため残す）
+            self._conn.execute(
+                "DELETE FROM file_journal WHERE state IN ('discovered', 'downloading') AND updated_at < ?",
+                (time.time() - self.retention_days * 86400,)
+            )
+            self._conn.commit()
+            
+            if deleted >= self.VACUUM_THRESHOLD:
+                self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        
+        if deleted:
+            self.logger.info(f"保持期間切れの処理済みIDを削除: {deleted}件 (保持期間: {self.retention_days}日)")
+        return deleted
+    
+    def close(self):
+        """未コミット分を書き込んで接続を閉じる"""
+        self.commit()
+        with self._lock:
+            self._conn.close()
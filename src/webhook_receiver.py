@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機能:
+- Google Drive変更通知（changes.watch）を受け取るローカルHTTPサーバー
+- 連続した通知を1回の監視にまとめるデバウンス
+- 通知チャンネルの登録と期限前の自動更新
+"""
+
+import logging
+import secrets
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class ChangeNotificationReceiver:
+    """変更通知受信クラス"""
+    
+    def __init__(self, host: str, port: int, channel_token: str,
+                 debounce_sec: float = 5.0, max_delay_sec: float = 30.0):
+        """
+        初期化
+        
+        Args:
+            host: 待ち受けホスト
+            port: 待ち受けポート（0は空きポートを自動選択）
+            channel_token: 通知チャンネルに設定したトークン（X-Goog-Channel-Tokenで検証）
+            debounce_sec: 最後の通知からこの秒数だけ通知がなければ監視を開始
+            max_delay_sec: 通知が続いても最初の通知からこの秒数で監視を開始
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.channel_token = channel_token
+        self.debounce_sec = debounce_sec
+        self.max_delay_sec = max_delay_sec
+        
+        self._condition = threading.Condition()
+        self._pending = 0
+        self._first_at = 0.0
+        self._last_at = 0.0
+        self._interrupted = False
+        
+        self.stats = {
+            'notifications': 0,
+            'rejected': 0,
+            'triggers': 0,
+        }
+        
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def port(self) -> int:
+        """実際に待ち受けているポート"""
+        return self._server.server_address[1]
+    
+    def _make_handler(self):
+        """リクエストハンドラクラスを作成"""
+        receiver = self
+        
+        class NotificationHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                # 本文は使用しないが接続を再利用できるよう読み捨てる
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                
+                accepted = receiver.handle_notification(
+                    self.headers.get('X-Goog-Channel-Token', ''),
+                    self.headers.get('X-Goog-Resource-State', ''),
+                    self.headers.get('X-Goog-Channel-ID', ''),
+                )
+                self.send_response(200 if accepted else 403)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+            
+            def log_message(self, format, *args):
+                receiver.logger.debug(format, *args)
+        
+        return NotificationHandler
+    
+    def handle_notification(self, token: str, resource_state: str, channel_id: str = '') -> bool:
+        """
+        通知1件の処理
+        
+        Returns:
+            受け付けた場合True（トークン不一致はFalse）
+        """
+        if not secrets.compare_digest(token, self.channel_token):
+            self.stats['rejected'] += 1
+            self.logger.warning(f"不正な通知を拒否しました: channel={channel_id}")
+            return False
+        
+        # syncはチャンネル登録直後の確認通知
+        if resource_state == 'sync':
+            self.logger.debug("通知チャンネル確認: %s", channel_id)
+            return True
+        
+        with self._condition:
+            now = time.monotonic()
+            if not self._pending:
+                self._first_at = now
+            self._last_at = now
+            self._pending += 1
+            self.stats['notifications'] += 1
+            self._condition.notify_all()
+        
+        self.logger.debug("変更通知を受信: state=%s, channel=%s", resource_state, channel_id)
+        return True
+    
+    def start(self):
+        """受信サーバーを開始"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='webhook', daemon=True)
+        self._thread.start()
+        self.logger.info(f"変更通知の受信を開始: ポート{self.port}")
+    
+    def stop(self):
+        """受信サーバーを停止"""
+        self.interrupt()
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def interrupt(self):
+        """待機中のwaitを中断"""
+        with self._condition:
+            self._interrupted = True
+            self._condition.notify_all()
+    
+    def wait(self, timeout: float) -> bool:
+        """
+        通知が来るまで待機し、通知が落ち着くまでデバウンスする
+        
+        Args:
+            timeout: 通知がない場合の最大待機秒数
+        
+        Returns:
+            通知により起床した場合True、タイムアウト・中断時はFalse
+        """
+        deadline = time.monotonic() + timeout
+        
+        with self._condition:
+            while not self._pending and not self._interrupted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            
+            if self._interrupted:
+                return False
+            
+            # 最後の通知から静かになるまで（最大max_delay_sec）待ってまとめる
+            while not self._interrupted:
+                wake_at = min(self._last_at + self.debounce_sec, self._first_at + self.max_delay_sec)
+                remaining = wake_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            
+            count = self._pending
+            self._pending = 0
+            self.stats['triggers'] += 1
+        
+        self.logger.info(f"変更通知により監視を開始: {count}件の通知をまとめて処理")
+        return True
+
+
+class WatchChannel:
+    """変更通知チャンネル管理クラス"""
+    
+    def __init__(self, monitor, address: str, token: Optional[str] = None,
+                 ttl_sec: int = 86400, renew_margin_sec: int = 600):
+        """
+        初期化
+        
+        Args:
+            monitor: DriveMonitorインスタンス
+            address: Google Driveから到達可能な通知先URL（HTTPS）
+            token: 通知の検証用トークン（省略時は自動生成）
+            ttl_sec: チャンネルの有効期間
+            renew_margin_sec: 有効期限のこの秒数前に更新
+        """
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.monitor = monitor
+        self.address = address
+        self.token = token or secrets.token_urlsafe(24)
+        self.ttl_sec = ttl_sec
+        self.renew_margin_sec = renew_margin_sec
+        
+        self.channel_id = None
+        self.resource_id = None
+        self.expires_at = 0.0
+    
+    def ensure_active(self):
+        """チャンネルが未登録または期限が近い場合に登録・更新"""
+        if self.channel_id and time.time() < self.expires_at - self.renew_margin_sec:
+            return
+        
+        old_channel = (self.channel_id, self.resource_id)
+        channel_id = str(uuid.uuid4())
+        response = self.monitor.watch_changes(self.address, channel_id, self.token, self.ttl_sec)
+        
+        self.channel_id = channel_id
+        self.resource_id = response.get('resourceId')
+        expiration_ms = response.get('expiration')
+        self.expires_at = int(expiration_ms) / 1000 if expiration_ms else time.time() + self.ttl_sec
+        self.logger.info(f"変更通知チャンネルを登録: {channel_id} (期限: {time.ctime(self.expires_at)})")
+        
+        # 新しいチャンネルの登録後に古いチャンネルを停止（通知の空白を作らない）
+        if old_channel[0]:
+            self._stop_channel(*old_channel)
+    
+    def _stop_channel(self, channel_id: str, resource_id: str):
+        """チャンネルの停止"""
+        try:
+            self.monitor.stop_channel(channel_id, resource_id)
+            self.logger.info(f"変更通知チャンネルを停止: {channel_id}")
+        except Exception as e:
+            self.logger.warning(f"変更通知チャンネル停止エラー: {channel_id} - {e}")
+    
+    def stop(self):
+        """現在のチャンネルを停止"""
+        if self.channel_id:
+            self._stop_channel(self.channel_id, self.resource_id)
+            self.channel_id = None
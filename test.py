@@ -369,7 +369,7 @@ def main():
         print("\n⚠️ フォルダ診断で問題が見つかりました")
     
     # 既存ファイル処理オプション
-    processor = FileProcessor(config)
+    processor = FileProcessor(config, monitor)
     process_existing_files(monitor, processor)
     
     print(f"\n{'='*50}")
@@ -377,7 +377,7 @@ def main():
     print("💡 PyDrive2移行完了 - 次の手順:")
     print("   1. 手動実行: python main.py")
     print("   2. Task Scheduler設定で自動実行")
-    print("   3. 古いファイル（token.pickle, page_token.txt）を削除可能")
+    print("   3. 古いファイル（token.pickle）を削除可能")
     print(f"{'='*50}")
     
     return True
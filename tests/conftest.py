@@ -0,0 +1,154 @@
+"""
+テスト共通のフィクスチャ
+
+疑似Google Driveサーバー（fake_drive_server.py）を起動し、
+認証なしのセッションで本体のクラスを動かす。
+"""
+
+import copy
+import sys
+from pathlib import Path
+
+import pytest
+
+# プロジェクトルートをインポートパスに追加（src・fake_drive_serverを読み込むため）
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from fake_drive_server import (  # noqa: E402
+    FakeDriveHandler, FakeDriveServer, FakeDriveStore, FaultInjector, OfflineDriveSession,
+)
+from src.drive_monitor import DriveMonitor  # noqa: E402
+from src.file_processor import FileProcessor  # noqa: E402
+
+# 監視ルートフォルダのID
+ROOT_FOLDER_ID = 'root'
+
+
+def _merge(base: dict, overrides: dict) -> dict:
+    """設定辞書の再帰的な上書き"""
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+@pytest.fixture
+def drive_store():
+    """監視ルートフォルダだけを作成した疑似Driveのストア"""
+    store = FakeDriveStore()
+    store.add_folder('root', folder_id=ROOT_FOLDER_ID)
+    return store
+
+
+@pytest.fixture
+def fault_injector():
+    """注入する遅延・エラー（既定はなし、テスト内で変更可能）"""
+    return FaultInjector()
+
+
+@pytest.fixture
+def drive_server(drive_store, fault_injector):
+    """起動済みの疑似Driveサーバー"""
+    server = FakeDriveServer(drive_store, fault_injector)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def drive_session(drive_server):
+    """疑似サーバーに接続するセッション"""
+    return OfflineDriveSession(drive_server.url)
+
+
+@pytest.fixture
+def patch_dispatch(monkeypatch):
+    """
+    疑似サーバーのAPI処理の差し替え
+    
+    handler(ハンドラ, メソッド, パス, クエリ, Rangeヘッダー) がNoneを返した場合は通常どおり処理する。
+    """
+    original = FakeDriveHandler._dispatch
+    
+    def install(handler):
+        def dispatch(self, method, path, query, range_header):
+            result = handler(self, method, path, query, range_header)
+            return result if result is not None else original(self, method, path, query, range_header)
+        
+        monkeypatch.setattr(FakeDriveHandler, '_dispatch', dispatch)
+    
+    return install
+
+
+@pytest.fixture
+def media_ranges(patch_dispatch):
+    """ファイル本体の取得要求のRangeヘッダーの記録"""
+    ranges = []
+    
+    def record(handler, method, path, query, range_header):
+        if query.get('alt') == 'media':
+            ranges.append(range_header)
+    
+    patch_dispatch(record)
+    return ranges
+
+
+@pytest.fixture
+def make_config(tmp_path):
+    """
+    一時ディレクトリを保存先にした設定辞書の生成
+    
+    引数の辞書で既定値を再帰的に上書きする。
+    """
+    def factory(overrides: dict = None) -> dict:
+        config = {
+            'google_drive': {
+                'target_folders': [{'folder_id': ROOT_FOLDER_ID, 'download_path': str(tmp_path / 'downloads')}],
+                'use_changes_feed': True,
+                'upload_stable_sec': 0,
+                'client_secrets_file': 'client_secrets.json',
+                'credentials_file': 'credentials.json',
+            },
+            'file_processing': {
+                'download_path': str(tmp_path / 'downloads'),
+                'chunk_size_mb': 1,
+                'min_free_space_gb': 0,
+                'duplicate_action': 'off',
+                'max_workers': 3,
+            },
+            'state': {
+                'data_dir': str(tmp_path / 'data'),
+            },
+            'api': {
+                'requests_per_second': 0,
+            },
+        }
+        return _merge(config, copy.deepcopy(overrides or {}))
+    
+    return factory
+
+
+@pytest.fixture
+def make_processor(make_config, drive_session):
+    """
+    DriveMonitor・FileProcessorの生成（テスト終了時に閉じる）
+    
+    引数の辞書で設定を上書きし、(DriveMonitor, FileProcessor) を返す。
+    """
+    created = []
+    
+    def factory(overrides: dict = None):
+        config = make_config(overrides)
+        monitor = DriveMonitor(config, drive_session)
+        processor = FileProcessor(config, monitor)
+        created.append((monitor, processor))
+        return monitor, processor
+    
+    yield factory
+    for monitor, processor in created:
+        processor.close()
+        monitor.close()
@@ -0,0 +1,170 @@
+"""非同期クライアント（Keep-Alive接続プール・ダウンロード）のテスト"""
+
+import hashlib
+import threading
+
+import pytest
+from googleapiclient.errors import HttpError
+
+from conftest import ROOT_FOLDER_ID
+from fake_drive_server import FakeDriveHandler
+from src.async_drive import AsyncDriveClient
+from src.drive_api import DriveApi
+
+FILE_SIZE = 300 * 1024
+
+
+@pytest.fixture
+def make_client(drive_session):
+    """AsyncDriveClientの生成（テスト終了時に閉じる）"""
+    clients = []
+    
+    def factory(max_connections: int = 4) -> AsyncDriveClient:
+        api = DriveApi({'api': {'requests_per_second': 0, 'backoff_base_sec': 0.01, 'backoff_max_sec': 0.01}})
+        client = AsyncDriveClient(drive_session, api, {'async_client': {'max_connections': max_connections}})
+        clients.append(client)
+        return client
+    
+    yield factory
+    for client in clients:
+        client.close()
+
+
+@pytest.fixture
+def audio_file(drive_store):
+    """ダウンロード対象のファイル（ファイルID, 内容）"""
+    file_id = drive_store.add_file('take.wav', ROOT_FOLDER_ID, FILE_SIZE)
+    return file_id, drive_store.content(file_id)
+
+
+def test_keep_alive_reuses_connections(make_client, drive_store, drive_server):
+    drive_store.populate(ROOT_FOLDER_ID, 10, 0, 16)
+    client = make_client(max_connections=2)
+    query = f"'{ROOT_FOLDER_ID}' in parents and trashed=false"
+    
+    results = client.run_all(client.list_files(query) for _ in range(20))
+    
+    assert all(len(result['items']) == 10 for result in results)
+    stats = client.get_stats()
+    assert stats['http_requests'] == 20
+    assert stats['connections_opened'] <= 2
+    assert stats['connections_reused'] == 20 - stats['connections_opened']
+    assert drive_server.snapshot()['files.list'] == 20
+
+
+@pytest.mark.parametrize('chunked', [False, True], ids=['content-length', 'chunked'])
+def test_download_body_framing(make_client, drive_server, audio_file, tmp_path, chunked):
+    drive_server.chunked = chunked
+    file_id, content = audio_file
+    client = make_client(max_connections=1)
+    
+    for name in ('first', 'second'):
+        dest = tmp_path / name
+        written, md5 = client.run(client.download(file_id, dest))
+        assert written == FILE_SIZE
+        assert md5 == hashlib.md5(content).hexdigest()
+        assert dest.read_bytes() == content
+    
+    # 本文の終わりが分かる応答は接続を使い回せる
+    assert client.get_stats()['connections_opened'] == 1
+
+
+def test_download_resumes_after_mid_body_drop_and_503(make_client, drive_server, audio_file, tmp_path,
+                                                      monkeypatch, patch_dispatch):
+    file_id, content = audio_file
+    ranges = []
+    
+    # 1回目は本文の途中で接続を切り、2回目は503を返す
+    original_send = FakeDriveHandler._send
+    
+    def send(self, status, headers, payload, throttle=False):
+        if throttle and len(ranges) == 1:
+            self.send_response(status)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload[:100_001])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        return original_send(self, status, headers, payload, throttle)
+    
+    def dispatch(self, method, path, query, range_header):
+        if query.get('alt') != 'media':
+            return None
+        ranges.append(range_header)
+        if len(ranges) == 2:
+            return self._error(503, 'backendError')
+        return None
+    
+    monkeypatch.setattr(FakeDriveHandler, '_send', send)
+    patch_dispatch(dispatch)
+    
+    progress_threads = []
+    client = make_client()
+    written, md5 = client.run(client.download(
+        file_id, tmp_path / 'take.wav', progress_interval=64 * 1024,
+        on_progress=lambda written, md5: progress_threads.append(threading.current_thread().name)
+    ))
+    
+    assert written == FILE_SIZE
+    assert md5 == hashlib.md5(content).hexdigest()
+    assert (tmp_path / 'take.wav').read_bytes() == content
+    assert ranges == [None, 'bytes=100001-', 'bytes=100001-']
+    
+    # 書き込みと進捗の保存はイベントループのスレッドでは行わない
+    assert progress_threads
+    assert 'async-drive' not in progress_threads
+
+
+@pytest.mark.parametrize('status', [301, 302, 303, 307])
+def test_download_follows_redirects(make_client, drive_server, audio_file, tmp_path, patch_dispatch, status):
+    file_id, content = audio_file
+    
+    def dispatch(self, method, path, query, range_header):
+        if query.get('alt') == 'media' and not query.get('hop'):
+            location = f"{self.server.url}{path}?alt=media&hop=1"
+            return status, {'Location': location}, b''
+        return None
+    
+    patch_dispatch(dispatch)
+    client = make_client()
+    written, md5 = client.run(client.download(file_id, tmp_path / 'take.wav'))
+    
+    assert written == FILE_SIZE
+    assert md5 == hashlib.md5(content).hexdigest()
+    assert drive_server.snapshot()['files.get_media'] == 1
+
+
+def test_redirect_loop_is_an_error(make_client, drive_server, patch_dispatch):
+    def dispatch(self, method, path, query, range_header):
+        return 302, {'Location': f"{self.server.url}{path}?hop={int(query.get('hop', 0)) + 1}"}, b''
+    
+    patch_dispatch(dispatch)
+    client = make_client()
+    with pytest.raises(HttpError) as excinfo:
+        client.run(client.list_files("trashed=false"))
+    assert excinfo.value.resp.status == 302
+
+
+def test_unauthorized_refreshes_token_and_retries_once(make_client, drive_session, drive_server, patch_dispatch):
+    rejected = []
+    
+    def dispatch(self, method, path, query, range_header):
+        if len(rejected) < 1:
+            rejected.append(path)
+            return self._error(401, 'authError')
+        return None
+    
+    patch_dispatch(dispatch)
+    client = make_client()
+    assert client.run(client.list_files("trashed=false"))['items'] is not None
+    assert drive_session.stats['token_refreshes'] == 1
+
+
+def test_unauthorized_after_refresh_is_an_error(make_client, drive_session, drive_server, patch_dispatch):
+    patch_dispatch(lambda self, *args: self._error(401, 'authError'))
+    client = make_client()
+    with pytest.raises(HttpError) as excinfo:
+        client.run(client.list_files("trashed=false"))
+    assert excinfo.value.resp.status == 401
+    assert drive_session.stats['token_refreshes'] == 1
@@ -0,0 +1,64 @@
+"""常駐モード（run_daemon）の監視ループのテスト"""
+
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+CYCLE_SECONDS = 60
+
+
+class StubMonitor:
+    """圧縮の呼び出し時刻だけを記録するDriveMonitorの代わり"""
+    
+    upload_stable_sec = 0
+    
+    def __init__(self):
+        self.compactions = []
+    
+    def has_pending_uploads(self) -> bool:
+        return False
+    
+    def compact_state(self):
+        self.compactions.append(main.time.monotonic())
+
+
+@pytest.fixture
+def run_cycles(monkeypatch):
+    """1サイクルごとに時計をCYCLE_SECONDS進め、指定回数で停止する常駐モードの実行"""
+    def factory(cycles: int, daemon_config: dict) -> StubMonitor:
+        clock = [0.0]
+        stop = {}
+        monitor = StubMonitor()
+        
+        def run_sync_cycle(monitor, processor, logger, exporter=None):
+            clock[0] += CYCLE_SECONDS
+            if clock[0] >= cycles * CYCLE_SECONDS:
+                stop['event'].set()
+            return 0
+        
+        monkeypatch.setattr(main, 'time', SimpleNamespace(monotonic=lambda: clock[0]))
+        monkeypatch.setattr(main, 'run_sync_cycle', run_sync_cycle)
+        monkeypatch.setattr(main, 'install_shutdown_handlers',
+                            lambda stop_event, logger, on_stop=None: stop.setdefault('event', stop_event))
+        
+        config = {'daemon': dict({'min_interval_sec': 0, 'max_interval_sec': 0}, **daemon_config)}
+        main.run_daemon(config, monitor, None, logging.getLogger('test'))
+        return monitor
+    
+    return factory
+
+
+def test_daemon_compacts_state_every_interval(run_cycles):
+    monitor = run_cycles(5, {'compact_interval_sec': 100})
+    
+    # 起動時の圧縮後、100秒を過ぎたサイクルの終わりごとに圧縮する
+    assert monitor.compactions == [120, 240]
+
+
+def test_zero_interval_compacts_only_at_startup(run_cycles):
+    monitor = run_cycles(5, {'compact_interval_sec': 0})
+    
+    assert monitor.compactions == []
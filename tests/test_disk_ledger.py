@@ -0,0 +1,89 @@
+"""ディスク容量予約台帳（ボリュームごとの予約計算）のテスト"""
+
+import shutil
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.disk_ledger import DiskSpaceLedger
+
+MIN_FREE = 100
+
+
+@pytest.fixture
+def volumes(tmp_path, monkeypatch):
+    """
+    tmp_path直下のディレクトリ名をデバイスIDとみなす疑似ボリューム
+    
+    空き容量は辞書の値を返し、取得回数を記録する。
+    """
+    free = {1: 1000, 2: 500}
+    calls = []
+    
+    def device_of(path: Path) -> int:
+        return int(Path(path).relative_to(tmp_path).parts[0])
+    
+    def disk_usage(path):
+        calls.append(device_of(path))
+        return SimpleNamespace(free=free[device_of(path)])
+    
+    for device in free:
+        (tmp_path / str(device)).mkdir()
+    monkeypatch.setattr(DiskSpaceLedger, 'volume_id', classmethod(lambda cls, path: device_of(path)))
+    monkeypatch.setattr(shutil, 'disk_usage', disk_usage)
+    return free, calls
+
+
+def test_same_volume_reservations_add_up(tmp_path, volumes):
+    _, calls = volumes
+    ledger = DiskSpaceLedger(MIN_FREE)
+    temp_dir, download_dir = tmp_path / '1' / 'temp', tmp_path / '1' / 'downloads'
+    
+    # 一時ファイルと最終ファイルが同じボリュームなら必要量は合算
+    assert ledger.reserve('a', {temp_dir: 300, download_dir: 200}) is True
+    assert ledger.reserve('b', {temp_dir: 401}) is False
+    assert ledger.reserve('b', {temp_dir: 400}) is True
+    assert ledger.is_reserved('a') and ledger.is_reserved('b')
+    
+    # 他の予約が残っている間は解放しても予約可能量は戻らない
+    ledger.release('a')
+    assert ledger.reserve('c', {temp_dir: 1}) is False
+    
+    # 予約がなくなれば次回の予約時に空き容量を取り直す
+    ledger.release('b')
+    assert ledger.reserve('c', {temp_dir: 900}) is True
+    assert calls == [1, 1]
+
+
+def test_cross_volume_reservations_are_checked_per_volume(tmp_path, volumes):
+    ledger = DiskSpaceLedger(MIN_FREE)
+    temp_dir, download_dir = tmp_path / '1' / 'temp', tmp_path / '2' / 'downloads'
+    
+    # 合計はどちらの空き容量も超えるが、ボリュームごとには収まる
+    assert ledger.reserve('a', {temp_dir: 800, download_dir: 300}) is True
+    assert ledger.reserve('b', {download_dir: 101}) is False
+    assert ledger.reserve('b', {temp_dir: 100}) is True
+    
+    # 一方のボリュームが足りなければ他方にも予約を残さない
+    assert ledger.reserve('c', {temp_dir: 0, download_dir: 101}) is False
+    assert not ledger.is_reserved('c')
+    assert ledger.reserve('c', {download_dir: 100}) is True
+
+
+def test_refresh_keeps_live_reservations(tmp_path, volumes):
+    free, calls = volumes
+    ledger = DiskSpaceLedger(MIN_FREE)
+    temp_dir = tmp_path / '1' / 'temp'
+    assert ledger.reserve('a', {temp_dir: 600}) is True
+    
+    # 書き込み前で空き容量が減っていなくても、書き込み中の予約分は差し引く
+    ledger.refresh()
+    assert ledger.reserve('b', {temp_dir: 301}) is False
+    assert ledger.reserve('b', {temp_dir: 300}) is True
+    
+    # 実行ごとに空き容量を取り直す
+    free[1] = 2000
+    ledger.refresh()
+    assert ledger.reserve('c', {temp_dir: 1000}) is True
+    assert calls == [1, 1, 1]
@@ -0,0 +1,97 @@
+"""DriveApiの流量制限とバッチリクエストの枠消費のテスト"""
+
+import time
+
+import pytest
+
+from conftest import ROOT_FOLDER_ID
+from fake_drive_server import FakeDriveHandler
+from src import drive_api, rate_limiter
+from src.drive_api import DriveApi
+from src.drive_monitor import DriveMonitor
+
+
+class FakeClock:
+    """sleepで進むだけの時計（monotonic・sleep以外は本物のtimeモジュールに任せる）"""
+    
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+    
+    def monotonic(self) -> float:
+        return self.now
+    
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+    
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    monkeypatch.setattr(drive_api, 'time', clock)
+    return clock
+
+
+def test_throttle_charges_cost_tokens(clock):
+    api = DriveApi({'api': {'requests_per_second': 10}})
+    
+    # 容量（10）までは待たずに送信できる
+    api.throttle(cost=10)
+    assert clock.slept == []
+    
+    # 以降はコスト分の補充を待つ
+    api.throttle(cost=5)
+    assert clock.slept == [pytest.approx(0.5)]
+    assert api.stats['requests'] == 15
+    assert api.stats['throttle_seconds'] == pytest.approx(0.5)
+
+
+def test_batch_charges_one_token_per_inner_call(clock, make_config, drive_session, drive_store, drive_server):
+    file_ids = [drive_store.add_file(f"{i:03d}.wav", ROOT_FOLDER_ID, 16) for i in range(250)]
+    monitor = DriveMonitor(make_config({'api': {'requests_per_second': 10}}), drive_session)
+    try:
+        results = monitor.delete_files(file_ids)
+    finally:
+        monitor.close()
+    
+    assert all(error is None for error in results.values())
+    assert drive_server.snapshot()['batch'] == 3
+    assert monitor.stats['batch_requests'] == 3
+    
+    # 250件分の枠を消費し、容量（10）を超えた分は1秒10件の速度で待つ
+    assert monitor.api.stats['requests'] == 250
+    assert sum(clock.slept) == pytest.approx((250 - 10) / 10)
+
+
+def test_batch_retry_charges_only_resubmitted_calls(clock, make_config, drive_session, drive_store, drive_server,
+                                                     monkeypatch):
+    file_ids = [drive_store.add_file(f"{i:03d}.wav", ROOT_FOLDER_ID, 16) for i in range(20)]
+    flaky = set(file_ids[:3])
+    
+    # 3件だけ最初の1回を503にする
+    original = FakeDriveHandler._dispatch
+    
+    def dispatch(self, method, path, query, range_header):
+        file_id = path.rsplit('/', 1)[-1]
+        if method == 'DELETE' and file_id in flaky:
+            flaky.discard(file_id)
+            return self._error(503, 'backendError')
+        return original(self, method, path, query, range_header)
+    
+    monkeypatch.setattr(FakeDriveHandler, '_dispatch', dispatch)
+    config = make_config({'api': {'requests_per_second': 10, 'backoff_base_sec': 0.01, 'backoff_max_sec': 0.01}})
+    monitor = DriveMonitor(config, drive_session)
+    try:
+        results = monitor.delete_files(file_ids)
+    finally:
+        monitor.close()
+    
+    assert all(error is None for error in results.values())
+    assert monitor.stats['batch_requests'] == 2
+    assert monitor.stats['batched_calls'] == 23
+    assert monitor.api.stats['requests'] == 23
@@ -0,0 +1,207 @@
+"""DriveMonitorの一覧取得・差分取得のテスト"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from googleapiclient.errors import HttpError
+
+from conftest import ROOT_FOLDER_ID
+from fake_drive_server import FakeDriveHandler
+from src import drive_monitor as drive_monitor_module
+from src.drive_monitor import DriveMonitor
+
+
+@pytest.fixture
+def monitor(make_config, drive_session):
+    monitor = DriveMonitor(make_config(), drive_session)
+    yield monitor
+    monitor.close()
+
+
+def _prime(monitor: DriveMonitor):
+    """初回の全件取得でフォルダツリーを構築し、処理済みにしてページトークンを保存"""
+    for file_info in monitor.check_for_new_files():
+        monitor.mark_file_processed(file_info['id'])
+    assert monitor.commit_processed()
+    monitor.commit_page_token()
+    assert monitor.page_token_file.exists()
+    assert monitor.folder_tree.is_built
+
+
+def _reset_stats(monitor: DriveMonitor):
+    for key in monitor.stats:
+        monitor.stats[key] = 0
+
+
+def test_changes_poll_without_changes_costs_one_request(monitor, drive_store, drive_server):
+    drive_store.populate(ROOT_FOLDER_ID, 20, 2, 1024)
+    _prime(monitor)
+    
+    # 変更がない状態で保存済みトークンから差分取得
+    monitor.page_token_file.write_text(str(len(drive_store.changes)), encoding='utf-8')
+    _reset_stats(monitor)
+    before = drive_server.snapshot()
+    
+    assert monitor.check_for_new_files() == []
+    
+    after = drive_server.snapshot()
+    assert monitor.stats['api_requests'] == 1
+    assert monitor.stats['changes_polls'] == 1
+    assert monitor.stats['full_listings'] == 0
+    assert after.get('changes.list', 0) - before.get('changes.list', 0) == 1
+    assert after.get('files.list', 0) == before.get('files.list', 0)
+
+
+@pytest.mark.parametrize('status', sorted(DriveMonitor.INVALID_TOKEN_STATUSES))
+def test_invalid_page_token_falls_back_to_one_full_listing(monitor, drive_store, drive_server, monkeypatch, status):
+    drive_store.populate(ROOT_FOLDER_ID, 20, 2, 1024)
+    _prime(monitor)
+    drive_store.populate(ROOT_FOLDER_ID, 3, 0, 1024)
+    
+    # Changes APIだけ指定のステータスで失敗させる
+    original = FakeDriveHandler._dispatch
+    
+    def dispatch(self, method, path, query, range_header):
+        if path.endswith('/changes'):
+            self.server.count('changes.list')
+            return self._error(status, 'invalid')
+        return original(self, method, path, query, range_header)
+    
+    monkeypatch.setattr(FakeDriveHandler, '_dispatch', dispatch)
+    _reset_stats(monitor)
+    before = drive_server.snapshot()
+    
+    files = monitor.check_for_new_files()
+    
+    after = drive_server.snapshot()
+    assert len(files) == 3
+    assert monitor.stats['full_listings'] == 1
+    assert after['changes.list'] - before.get('changes.list', 0) == 1
+    assert after['changes.getStartPageToken'] - before.get('changes.getStartPageToken', 0) == 1
+    
+    # 全件取得はフォルダツリー1周分（ルート＋サブフォルダを1クエリにまとめる）のみ
+    assert after['files.list'] - before['files.list'] == monitor.stats['pages_fetched']
+
+
+def test_other_changes_errors_are_not_treated_as_invalid_token(monitor, drive_store, monkeypatch):
+    drive_store.populate(ROOT_FOLDER_ID, 5, 0, 1024)
+    _prime(monitor)
+    _reset_stats(monitor)
+    
+    original = FakeDriveHandler._dispatch
+    
+    def dispatch(self, method, path, query, range_header):
+        if path.endswith('/changes'):
+            return self._error(403, 'insufficientPermissions')
+        return original(self, method, path, query, range_header)
+    
+    monkeypatch.setattr(FakeDriveHandler, '_dispatch', dispatch)
+    with pytest.raises(HttpError):
+        list(monitor.iter_new_files())
+    assert monitor.stats['full_listings'] == 0
+
+
+def test_audio_extension_with_generic_mime_type_is_listed(monitor, drive_store):
+    wav_id = drive_store.add_file('x.wav', ROOT_FOLDER_ID, 1024)
+    drive_store.items[wav_id]['mimeType'] = 'application/octet-stream'
+    drive_store.add_file('notes.txt', ROOT_FOLDER_ID, 1024)
+    subfolder = drive_store.add_folder('sub', ROOT_FOLDER_ID)
+    nested_id = drive_store.add_file('voice memo.flac', subfolder, 1024)
+    
+    files = monitor.check_for_new_files()
+    
+    assert sorted(file_info['id'] for file_info in files) == sorted([wav_id, nested_id])
+
+
+def test_list_query_filters_only_trashed_on_server(monitor):
+    query = monitor._build_list_query(['a', 'b'])
+    assert query == "('a' in parents or 'b' in parents) and trashed=false"
+
+
+def test_pending_recheck_batches_metadata_lookups(make_config, drive_session, drive_store, drive_server):
+    drive_store.populate(ROOT_FOLDER_ID, 250, 0, 16)
+    monitor = DriveMonitor(make_config({'google_drive': {'upload_stable_sec': 3600}}), drive_session)
+    try:
+        # 初回は全件が完了待ちになる
+        assert monitor.check_for_new_files() == []
+        monitor.commit_page_token()
+        before = drive_server.snapshot()
+        
+        # 差分に現れない完了待ちはID指定でまとめて再確認（100件ずつ）
+        assert monitor.check_for_new_files() == []
+        after = drive_server.snapshot()
+    finally:
+        monitor.close()
+    
+    assert after.get('batch', 0) - before.get('batch', 0) == 3
+    assert after.get('batch_calls', 0) - before.get('batch_calls', 0) == 250
+    assert after.get('files.list', 0) == before.get('files.list', 0)
+    assert monitor.stats['pending_rechecks'] == 250
+
+
+def test_delete_of_missing_file_counts_as_success(monitor, drive_store, drive_server):
+    file_id = drive_store.add_file('take.wav', ROOT_FOLDER_ID, 16)
+    
+    results = monitor.delete_files([file_id, 'missing-file'])
+    
+    assert results == {file_id: None, 'missing-file': None}
+    assert drive_store.get(file_id) is None
+    assert drive_server.snapshot()['batch'] == 1
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """DriveMonitorの単調時計を手動で進める"""
+    now = [0.0]
+    monkeypatch.setattr(drive_monitor_module, 'time', SimpleNamespace(
+        monotonic=lambda: now[0], time=time.time, perf_counter=time.perf_counter, sleep=time.sleep
+    ))
+    return now
+
+
+def test_metadata_cache_drops_expired_entries_on_insert(monitor, clock):
+    monitor.metadata_cache_ttl = 600
+    monitor._cache_metadata({'id': 'a'})
+    clock[0] = 300
+    monitor._cache_metadata({'id': 'b'})
+    
+    # 読み出されないまま期限切れになったエントリも次の追加時に破棄する
+    clock[0] = 700
+    monitor._cache_metadata({'id': 'c'})
+    assert list(monitor._metadata_cache) == ['b', 'c']
+    assert monitor._get_cached_metadata('b') == {'id': 'b'}
+    assert monitor._get_cached_metadata('a') is None
+
+
+def test_metadata_cache_evicts_oldest_over_max_entries(monitor, clock, monkeypatch):
+    monkeypatch.setattr(DriveMonitor, 'MAX_METADATA_CACHE_ENTRIES', 3)
+    for i, file_id in enumerate(['a', 'b', 'c', 'd']):
+        clock[0] = i
+        monitor._cache_metadata({'id': file_id})
+    assert list(monitor._metadata_cache) == ['b', 'c', 'd']
+    
+    # 取り直したエントリは最も新しい扱いになる
+    clock[0] = 10
+    monitor._cache_metadata({'id': 'b'})
+    monitor._cache_metadata({'id': 'e'})
+    assert list(monitor._metadata_cache) == ['d', 'b', 'e']
+
+
+def test_file_details_lookups_are_batched(monitor, drive_store, drive_server):
+    drive_store.populate(ROOT_FOLDER_ID, 250, 0, 16)
+    file_ids = list(drive_store.items)[1:]
+    
+    # キャッシュにないものは100件ずつバッチで取得
+    details = monitor.get_files_details(file_ids + ['missing-file'])
+    after_first = drive_server.snapshot()
+    assert after_first.get('batch', 0) == 3
+    assert after_first.get('batch_calls', 0) == 251
+    assert details['missing-file'] is None
+    assert {file_id: details[file_id]['size'] for file_id in file_ids} == {file_id: '16' for file_id in file_ids}
+    
+    # 取得済みのものはキャッシュから返す
+    assert monitor.get_file_details(file_ids[0])['id'] == file_ids[0]
+    assert monitor.get_files_details(file_ids[:10]).keys() == set(file_ids[:10])
+    assert drive_server.snapshot() == after_first
+    assert monitor.stats['metadata_calls_saved'] == 11
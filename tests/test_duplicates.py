@@ -0,0 +1,142 @@
+"""重複ダウンロード防止（duplicate_action）とローカルファイル索引のテスト"""
+
+import logging
+import os
+from pathlib import Path
+
+import pytest
+
+from conftest import ROOT_FOLDER_ID
+from src.content_index import LocalFileIndex
+from src.file_processor import FileProcessor
+
+
+@pytest.fixture
+def drive_file(drive_store):
+    """Drive上の音声ファイル1件（ファイルID, 内容）"""
+    file_id = drive_store.add_file('take.wav', ROOT_FOLDER_ID, 4096)
+    return file_id, drive_store.content(file_id)
+
+
+def _prepare(make_processor, tmp_path, action: str, content: bytes):
+    """同じ内容のファイルをダウンロード先の別フォルダに置き、索引を作成してから一覧を取得"""
+    archived = tmp_path / 'downloads' / 'archive' / 'old_take.wav'
+    archived.parent.mkdir(parents=True)
+    archived.write_bytes(content)
+    
+    monitor, processor = make_processor({'file_processing': {'duplicate_action': action}})
+    if action != 'off':
+        assert processor.content_index.refresh() is True
+    return monitor, processor, archived
+
+
+def test_link_creates_hard_link_without_download(make_processor, drive_server, drive_file, tmp_path):
+    file_id, content = drive_file
+    monitor, processor, archived = _prepare(make_processor, tmp_path, 'link', content)
+    
+    assert processor.process_files(monitor.check_for_new_files()) == 1
+    
+    final_file = tmp_path / 'downloads' / 'take.wav'
+    assert final_file.read_bytes() == content
+    assert os.stat(final_file).st_ino == os.stat(archived).st_ino
+    assert drive_server.snapshot().get('files.get_media', 0) == 0
+    assert processor.stats['duplicates_reused'] == 1
+    assert file_id not in drive_server.store.items
+
+
+def test_skip_uses_existing_file(make_processor, drive_server, drive_file, tmp_path):
+    _, content = drive_file
+    monitor, processor, archived = _prepare(make_processor, tmp_path, 'skip', content)
+    
+    assert processor.process_files(monitor.check_for_new_files()) == 1
+    
+    assert not (tmp_path / 'downloads' / 'take.wav').exists()
+    assert archived.read_bytes() == content
+    assert drive_server.snapshot().get('files.get_media', 0) == 0
+    assert processor.stats['duplicates_reused'] == 1
+
+
+def test_off_downloads_even_if_copy_exists(make_processor, drive_server, drive_file, tmp_path):
+    _, content = drive_file
+    monitor, processor, _ = _prepare(make_processor, tmp_path, 'off', content)
+    
+    assert processor.process_files(monitor.check_for_new_files()) == 1
+    
+    assert (tmp_path / 'downloads' / 'take.wav').read_bytes() == content
+    assert drive_server.snapshot()['files.get_media'] >= 1
+    assert processor.stats['duplicates_reused'] == 0
+
+
+def test_link_avoids_overwriting_same_name(make_processor, drive_server, drive_file, tmp_path):
+    _, content = drive_file
+    monitor, processor, archived = _prepare(make_processor, tmp_path, 'link', content)
+    occupied = tmp_path / 'downloads' / 'take.wav'
+    occupied.write_bytes(b'different recording')
+    
+    assert processor.process_files(monitor.check_for_new_files()) == 1
+    
+    assert occupied.read_bytes() == b'different recording'
+    assert (tmp_path / 'downloads' / 'take (1).wav').read_bytes() == content
+
+
+def test_link_reuses_copy_already_in_destination(make_processor, drive_server, drive_file, tmp_path, caplog):
+    file_id, content = drive_file
+    existing = tmp_path / 'downloads' / 'old_take.wav'
+    existing.parent.mkdir(parents=True)
+    existing.write_bytes(content)
+    monitor, processor = make_processor({'file_processing': {'duplicate_action': 'link'}})
+    assert processor.content_index.refresh() is True
+    caplog.set_level(logging.INFO, logger='FileProcessor')
+    
+    assert processor.process_files(monitor.check_for_new_files()) == 1
+    
+    # 同じフォルダにリンクを増やさず、再利用したことを記録する
+    assert sorted(path.name for path in existing.parent.iterdir() if path.is_file()) == ['old_take.wav']
+    assert drive_server.snapshot().get('files.get_media', 0) == 0
+    assert processor.stats['duplicates_reused'] == 1
+    assert processor.stats['duplicates_in_destination'] == 1
+    assert any('保存先フォルダに同じ内容のファイルがあるため再利用' in record.getMessage() for record in caplog.records)
+    assert file_id not in drive_server.store.items
+
+
+def test_unique_path_appends_counter(tmp_path):
+    path = tmp_path / 'take.wav'
+    assert FileProcessor._unique_path(path) == path
+    
+    path.write_bytes(b'a')
+    (tmp_path / 'take (1).wav').write_bytes(b'b')
+    assert FileProcessor._unique_path(path) == tmp_path / 'take (2).wav'
+
+
+def test_background_refresh_respects_interval(tmp_path):
+    root = tmp_path / 'downloads'
+    root.mkdir()
+    (root / 'a.wav').write_bytes(b'a' * 10)
+    index = LocalFileIndex(tmp_path / 'state.db', [root])
+    try:
+        assert index.refresh_in_background(3600) is True
+        index.wait_refresh(10)
+        assert index.find('e09c80c42fda55f9d992e59ca6b3307d', 10) == root / 'a.wav'
+        assert index.last_refreshed > 0
+        
+        # 間隔内は走査しない
+        assert index.refresh_in_background(3600) is False
+        assert index.refresh_in_background(0) is True
+        index.wait_refresh(10)
+    finally:
+        index.close()
+
+
+def test_process_does_not_wait_for_index_walk(make_processor, drive_file, tmp_path, monkeypatch):
+    _, content = drive_file
+    monitor, processor = make_processor({'file_processing': {'duplicate_action': 'link'}})
+    
+    # 走査が終わらなくても処理が進むこと（走査は停止要求まで待ち続ける）
+    def slow_refresh(self):
+        self._stop.wait(30)
+        return False
+    
+    monkeypatch.setattr(LocalFileIndex, 'refresh', slow_refresh)
+    assert processor.process_files(monitor.check_for_new_files()) == 1
+    assert (tmp_path / 'downloads' / 'take.wav').read_bytes() == content
+    processor.close()
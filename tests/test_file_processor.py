@@ -0,0 +1,217 @@
+"""FileProcessorのダウンロード再開と整合性確認のテスト"""
+
+import hashlib
+import logging
+import shutil
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import ROOT_FOLDER_ID
+
+FILE_SIZE = 3 * 1024 * 1024 + 1000
+OFFSET = 1_000_000
+
+
+@pytest.fixture
+def drive_file(drive_store):
+    """Drive上の音声ファイル1件（ファイルID, 内容）"""
+    file_id = drive_store.add_file('take.wav', ROOT_FOLDER_ID, FILE_SIZE)
+    return file_id, drive_store.content(file_id)
+
+
+def _write_partial(processor, file_info: dict, content: bytes, offset: int):
+    """中断したダウンロードの部分ファイルと再開情報の作成"""
+    temp_file = processor._temp_file_for(file_info)
+    temp_file.write_bytes(content[:offset])
+    processor._save_resume_state(
+        processor._resume_state_file(temp_file), file_info,
+        {'offset': offset, 'partial_md5': hashlib.md5(content[:offset]).hexdigest()}
+    )
+    return temp_file
+
+
+def test_sequential_download_resumes_from_saved_offset(make_processor, drive_server, drive_file, media_ranges,
+                                                       tmp_path):
+    file_id, content = drive_file
+    monitor, processor = make_processor()
+    file_infos = monitor.check_for_new_files()
+    temp_file = _write_partial(processor, file_infos[0], content, OFFSET)
+    
+    assert processor.process_files(file_infos) == 1
+    
+    assert media_ranges[0].startswith(f'bytes={OFFSET}-')
+    assert (tmp_path / 'downloads' / 'take.wav').read_bytes() == content
+    assert processor.stats['bytes_downloaded'] == FILE_SIZE - OFFSET
+    assert not temp_file.exists()
+    assert not processor._resume_state_file(temp_file).exists()
+    assert file_id not in drive_server.store.items
+
+
+@pytest.mark.parametrize('changed', ['md5Checksum', 'modifiedTime'])
+def test_partial_download_is_discarded_when_remote_changed(make_processor, drive_server, drive_file, media_ranges,
+                                                           tmp_path, changed):
+    _, content = drive_file
+    monitor, processor = make_processor()
+    file_infos = monitor.check_for_new_files()
+    
+    # 部分ファイルは変更前のリモートファイルに対するもの
+    stale_info = dict(file_infos[0], **{changed: 'stale'})
+    _write_partial(processor, stale_info, content, OFFSET)
+    
+    assert processor.process_files(file_infos) == 1
+    
+    assert media_ranges[0].startswith('bytes=0-')
+    assert (tmp_path / 'downloads' / 'take.wav').read_bytes() == content
+    assert processor.stats['bytes_downloaded'] == FILE_SIZE
+
+
+def test_segmented_download_resumes_each_segment(make_processor, drive_server, drive_file, media_ranges, tmp_path):
+    file_id, content = drive_file
+    monitor, processor = make_processor({
+        'file_processing': {'segmented_download_threshold_mb': 1, 'segment_count': 2},
+    })
+    file_infos = monitor.check_for_new_files()
+    
+    # 各範囲の先頭OFFSETバイトまで取得済みの部分ファイル（事前確保済みで全体サイズ）
+    half = -(-FILE_SIZE // 2)
+    segments = [[0, OFFSET, half], [half, half + OFFSET, FILE_SIZE]]
+    partial = bytearray(FILE_SIZE)
+    for start, pos, _ in segments:
+        partial[start:pos] = content[start:pos]
+    temp_file = processor._temp_file_for(file_infos[0])
+    temp_file.write_bytes(bytes(partial))
+    processor._save_resume_state(processor._resume_state_file(temp_file), file_infos[0], {'segments': segments})
+    
+    assert processor.process_files(file_infos) == 1
+    
+    starts = {int(header[len('bytes='):].split('-')[0]) for header in media_ranges}
+    assert {OFFSET, half + OFFSET} <= starts
+    assert not starts & {0, half}
+    assert (tmp_path / 'downloads' / 'take.wav').read_bytes() == content
+    assert processor.stats['bytes_downloaded'] == FILE_SIZE - 2 * OFFSET
+    assert file_id not in drive_server.store.items
+
+
+@pytest.mark.parametrize('segmented', [False, True])
+def test_md5_mismatch_discards_download_and_keeps_remote(make_processor, drive_server, drive_file, tmp_path,
+                                                         segmented):
+    file_id, _ = drive_file
+    drive_server.store.get(file_id)['md5Checksum'] = '0' * 32
+    overrides = {'file_processing': {'segmented_download_threshold_mb': 1, 'segment_count': 2}} if segmented else {}
+    monitor, processor = make_processor(overrides)
+    file_infos = monitor.check_for_new_files()
+    temp_file = processor._temp_file_for(file_infos[0])
+    
+    assert processor.process_files(file_infos) == 0
+    
+    assert drive_server.snapshot().get('files.get_media', 0) > 0
+    assert not (tmp_path / 'downloads' / 'take.wav').exists()
+    assert not temp_file.exists()
+    assert not processor._resume_state_file(temp_file).exists()
+    assert file_id in drive_server.store.items
+    assert drive_server.snapshot().get('files.delete', 0) == 0
+
+
+def test_journal_entries_resume_without_download(make_processor, drive_server, drive_store, tmp_path):
+    verified_id = drive_store.add_file('verified.wav', ROOT_FOLDER_ID, 4096)
+    finalized_id = drive_store.add_file('finalized.wav', ROOT_FOLDER_ID, 4096)
+    monitor, processor = make_processor()
+    file_infos = {file_info['id']: file_info for file_info in monitor.check_for_new_files()}
+    store = monitor.processed_store
+    
+    # 前回は整合性確認まで（一時ファイルあり）と最終配置まで（最終ファイルあり）で中断
+    verified_content = drive_store.content(verified_id)
+    temp_file = processor._temp_file_for(file_infos[verified_id])
+    temp_file.write_bytes(verified_content)
+    store.record_state(verified_id, 'verified', file_infos[verified_id], temp_path=temp_file,
+                       md5=hashlib.md5(verified_content).hexdigest())
+    finalized_content = drive_store.content(finalized_id)
+    final_file = tmp_path / 'downloads' / 'finalized.wav'
+    final_file.write_bytes(finalized_content)
+    store.record_state(finalized_id, 'finalized', file_infos[finalized_id], final_path=final_file)
+    store.commit()
+    
+    # 再起動後の一覧にも同じファイルが現れる
+    assert processor.process_files(monitor.check_for_new_files()) == 2
+    
+    assert drive_server.snapshot().get('files.get_media', 0) == 0
+    assert processor.stats['journal_resumed'] == 2
+    assert (tmp_path / 'downloads' / 'verified.wav').read_bytes() == verified_content
+    assert not temp_file.exists()
+    assert final_file.read_bytes() == finalized_content
+    assert sorted(path.name for path in (tmp_path / 'downloads').iterdir() if path.is_file()) == [
+        'finalized.wav', 'verified.wav'
+    ]
+    assert verified_id not in drive_store.items
+    assert finalized_id not in drive_store.items
+    assert store.filter_processed([verified_id, finalized_id]) == {verified_id, finalized_id}
+    assert store.get_journal() == {}
+
+
+def test_throughput_log_reports_each_run_separately(make_processor, drive_server, drive_store, caplog):
+    monitor, processor = make_processor()
+    caplog.set_level(logging.INFO, logger='FileProcessor')
+    
+    # デーモンの2サイクル目は1サイクル目の転送量を含めない
+    totals = []
+    for name, size in (('first.wav', 4 * 1024 * 1024), ('second.wav', 512 * 1024)):
+        drive_store.add_file(name, ROOT_FOLDER_ID, size)
+        caplog.clear()
+        assert processor.process_files(monitor.check_for_new_files()) == 1
+        totals += [record.getMessage() for record in caplog.records if record.getMessage().startswith('スループット')]
+    
+    assert len(totals) == 2
+    assert '合計: 4.0MB' in totals[0]
+    assert '合計: 0.5MB' in totals[1]
+    assert processor.stats['bytes_downloaded'] == 4 * 1024 * 1024 + 512 * 1024
+
+
+def test_async_fetch_keeps_blocking_calls_off_the_event_loop(make_processor, drive_server, drive_store, tmp_path,
+                                                            monkeypatch):
+    file_ids = [drive_store.add_file(f"take{i}.wav", ROOT_FOLDER_ID, 4096) for i in range(3)]
+    monitor, processor = make_processor({'async_client': {'enabled': True}})
+    threads = {}
+    
+    def record_thread(owner, name):
+        original = getattr(owner, name)
+        
+        def wrapper(*args, **kwargs):
+            threads.setdefault(name, set()).add(threading.current_thread().name)
+            return original(*args, **kwargs)
+        
+        monkeypatch.setattr(owner, name, wrapper)
+    
+    for name in ('_fetch_locally', '_reserve_space', '_discard_partial'):
+        record_thread(processor, name)
+    record_thread(monitor, 'record_file_state')
+    
+    assert processor.process_files(monitor.check_for_new_files()) == 3
+    
+    assert set(threads) == {'_fetch_locally', '_reserve_space', '_discard_partial', 'record_file_state'}
+    assert all('async-drive' not in names for names in threads.values())
+    assert sorted(path.name for path in (tmp_path / 'downloads').iterdir() if path.is_file()) == [
+        'take0.wav', 'take1.wav', 'take2.wav'
+    ]
+    assert not set(file_ids) & set(drive_store.items)
+
+
+def test_verified_journal_entry_needs_no_space_for_the_temp_file(make_processor, drive_server, drive_store, tmp_path,
+                                                                 monkeypatch):
+    file_id = drive_store.add_file('verified.wav', ROOT_FOLDER_ID, 4096)
+    monitor, processor = make_processor()
+    file_info = monitor.check_for_new_files()[0]
+    content = drive_store.content(file_id)
+    temp_file = processor._temp_file_for(file_info)
+    temp_file.write_bytes(content)
+    monitor.processed_store.record_state(file_id, 'verified', file_info, temp_path=temp_file,
+                                         md5=hashlib.md5(content).hexdigest())
+    monitor.processed_store.commit()
+    
+    # ファイルサイズより少ない空き容量でも、書き込み済みの一時ファイルは配置できる
+    monkeypatch.setattr(shutil, 'disk_usage', lambda path: SimpleNamespace(free=1000))
+    assert processor.process_files([]) == 1
+    
+    assert (tmp_path / 'downloads' / 'verified.wav').read_bytes() == content
+    assert drive_server.snapshot().get('files.get_media', 0) == 0
@@ -0,0 +1,36 @@
+"""ログ出力（LogPipeline）の設定反映のテスト"""
+
+import logging
+
+import pytest
+
+from src.log_pipeline import LogPipeline
+
+
+@pytest.fixture
+def log_pipeline(tmp_path):
+    """LogPipelineの生成（終了時に停止し、ルートロガーを元に戻す）"""
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    pipeline = LogPipeline(tmp_path / 'logs')
+    yield pipeline
+    pipeline.stop()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_rotation_settings_use_log_backup_count(log_pipeline):
+    log_pipeline.configure({'max_log_files': 7, 'log_rotation_mb': 2, 'log_backup_count': 3})
+    
+    assert log_pipeline.file_handler.maxBytes == 2 * 1024 * 1024
+    assert log_pipeline.file_handler.backupCount == 3
+
+
+def test_max_log_files_does_not_change_backup_count(log_pipeline):
+    log_pipeline.configure({'max_log_files': 7})
+    
+    assert log_pipeline.file_handler.backupCount == 30
+
@@ -0,0 +1,90 @@
+"""処理パイプラインの削除保留と前段の一時停止のテスト"""
+
+import threading
+import time
+
+from src.pipeline import ProcessingPipeline
+from src.scheduler import DownloadScheduler
+
+
+class StubMetrics:
+    def observe(self, name, seconds):
+        pass
+
+
+class StubProcessor:
+    """各段階の処理を記録するだけのFileProcessorの代わり"""
+    
+    max_workers = 2
+    
+    def __init__(self):
+        self.metrics = StubMetrics()
+        self.lock = threading.Lock()
+        self.fetched = 0
+        self.deleted = []
+        self.listing_finished = threading.Event()
+        self.deleted_during_listing = 0
+    
+    def fetch_file(self, monitor, file_info):
+        with self.lock:
+            self.fetched += 1
+        return f"temp/{file_info['id']}"
+    
+    def complete_download(self, file_info, downloaded):
+        return f"final/{file_info['id']}"
+    
+    def finish_batch(self, items):
+        if not self.listing_finished.is_set():
+            self.deleted_during_listing += len(items)
+        self.deleted.extend(file_info['id'] for file_info, _ in items)
+        return 0
+
+
+class StubMonitor:
+    BATCH_LIMIT = 100
+    async_client = None
+
+
+def _run_pipeline(pipeline_config: dict, processor: StubProcessor, pages: int = 10, page_size: int = 5):
+    """一覧の最後のページの前で前段が詰まるまで待ってから完了させる"""
+    fetched_at_end = []
+    
+    def batches():
+        for page in range(pages):
+            if page == pages - 1:
+                time.sleep(0.5)
+                fetched_at_end.append(processor.fetched)
+            yield [{'id': f"{page}-{i}", 'name': f"{page}-{i}.wav", 'size': '1'} for i in range(page_size)]
+        processor.listing_finished.set()
+    
+    run = DownloadScheduler({'scheduler': {'policy': 'listing'}}).start_run(max_queued=5)
+    pipeline = ProcessingPipeline({'pipeline': pipeline_config}, processor, StubMonitor(), run)
+    result = []
+    worker = threading.Thread(target=lambda: result.append(pipeline.execute(batches())))
+    worker.start()
+    worker.join(30)
+    assert not worker.is_alive(), "パイプラインが終了しない"
+    return result[0], fetched_at_end[0]
+
+
+def test_held_deletes_cap_pauses_downloads_until_listing_done():
+    processor = StubProcessor()
+    config = {'max_held_deletes': 10, 'delete_queue_size': 2, 'verify_queue_size': 1, 'delete_batch_wait_sec': 0}
+    succeeded, fetched_at_end = _run_pipeline(config, processor)
+    
+    # 保留（上限10件＋最後に取り出したバッチの最大2件）＋削除キュー2件＋確認キュー1件＋確認中1件
+    # ＋ダウンロード中2件で止まる
+    assert fetched_at_end <= 18
+    assert succeeded == 50
+    assert sorted(processor.deleted) == sorted(f"{page}-{i}" for page in range(10) for i in range(5))
+    assert processor.deleted_during_listing == 0
+
+
+def test_unlimited_hold_keeps_downloading_during_listing():
+    processor = StubProcessor()
+    config = {'max_held_deletes': 0, 'delete_queue_size': 2, 'verify_queue_size': 1, 'delete_batch_wait_sec': 0}
+    succeeded, fetched_at_end = _run_pipeline(config, processor)
+    
+    assert fetched_at_end == 45
+    assert succeeded == 50
+    assert processor.deleted_during_listing == 0
@@ -0,0 +1,94 @@
+"""ダウンロード順序・実行ごとの上限のテスト"""
+
+import json
+import threading
+from pathlib import Path
+
+from src.scheduler import DownloadScheduler
+
+CONFIG_FILE = Path(__file__).resolve().parent.parent / 'config' / 'config.json'
+
+
+def _file(file_id: str, size: int, name: str = None) -> dict:
+    return {'id': file_id, 'name': name or f"{file_id}.wav", 'size': str(size), 'modifiedTime': ''}
+
+
+def _drain(run) -> list:
+    return [file_info['id'] for file_info in iter(run.next_file, None)]
+
+
+def test_listing_policy_streams_before_listing_completes():
+    run = DownloadScheduler({'scheduler': {'policy': 'listing'}}).start_run()
+    run.add([_file('a', 30), _file('b', 10)])
+    
+    # closeを待たずに取得順で取り出せる
+    assert run.next_file()['id'] == 'a'
+    run.close()
+    assert _drain(run) == ['b']
+
+
+def test_shipped_config_streams_before_listing_completes():
+    config = json.loads(CONFIG_FILE.read_text(encoding='utf-8'))
+    run = DownloadScheduler(config).start_run(max_queued=1000)
+    run.add([_file('a', 30, 'a.wav'), _file('b', 10, 'b.mp3')])
+    
+    started = []
+    worker = threading.Thread(target=lambda: started.append(run.next_file()))
+    worker.start()
+    
+    # 既定の設定では一覧の取得中からダウンロードを始める
+    worker.join(5)
+    run.close()
+    worker.join(5)
+    assert started[0]['id'] == 'a'
+    assert _drain(run) == ['b']
+
+
+def test_ordered_policy_holds_until_listing_completes():
+    run = DownloadScheduler({'scheduler': {'policy': 'smallest_first'}}).start_run(max_queued=1)
+    started = []
+    worker = threading.Thread(target=lambda: started.append(run.next_file()))
+    worker.start()
+    
+    # 2ページ目に小さいファイルがあっても全体の小さい順で取り出す（max_queuedで追加は止まらない）
+    run.add([_file('large', 300), _file('medium', 200)])
+    run.add([_file('small', 100)])
+    worker.join(0.3)
+    assert worker.is_alive()
+    
+    run.close()
+    worker.join(5)
+    assert started[0]['id'] == 'small'
+    assert _drain(run) == ['medium', 'large']
+
+
+def test_size_limit_is_applied_in_policy_order():
+    config = {'scheduler': {'policy': 'smallest_first', 'max_bytes_per_run_mb': 1}}
+    run = DownloadScheduler(config).start_run()
+    mb = 1024 * 1024
+    run.add([_file('big', mb), _file('half', mb // 2)])
+    run.add([_file('quarter', mb // 4)])
+    run.close()
+    
+    assert _drain(run) == ['quarter', 'half']
+    assert [file_info['id'] for file_info in run.deferred] == ['big']
+    assert run.total == 3
+
+
+def test_extension_priority_then_policy():
+    config = {'scheduler': {'policy': 'smallest_first', 'extension_priority': ['.mp3']}}
+    run = DownloadScheduler(config).start_run()
+    run.add([_file('w1', 10, 'w1.wav'), _file('m1', 50, 'm1.mp3'), _file('m2', 20, 'm2.mp3')])
+    run.close()
+    
+    assert _drain(run) == ['m2', 'm1', 'w1']
+
+
+def test_duplicate_ids_are_added_once():
+    run = DownloadScheduler({'scheduler': {'policy': 'oldest_first'}}).start_run()
+    run.add([_file('a', 10)])
+    run.add([_file('a', 10), _file('b', 10)])
+    run.close()
+    
+    assert sorted(_drain(run)) == ['a', 'b']
+    assert run.total == 2
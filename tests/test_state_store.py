@@ -0,0 +1,112 @@
+"""処理済みファイルストア（SQLite）の移行・保持期間・ジャーナルのテスト"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.state_store import ProcessedStore
+
+
+@pytest.fixture
+def make_store(tmp_path):
+    """ProcessedStoreの生成（テスト終了時に閉じる）"""
+    stores = []
+    
+    def factory(**kwargs) -> ProcessedStore:
+        store = ProcessedStore(tmp_path / 'state.db', **kwargs)
+        stores.append(store)
+        return store
+    
+    yield factory
+    for store in stores:
+        store.close()
+
+
+def test_legacy_file_is_migrated_and_renamed(make_store, tmp_path):
+    legacy_file = tmp_path / 'processed_files.txt'
+    legacy_file.write_text("file-a\nfile-b\n\nfile-a\n", encoding='utf-8')
+    
+    store = make_store(legacy_file=legacy_file)
+    
+    assert store.filter_processed(['file-a', 'file-b', 'file-c']) == {'file-a', 'file-b'}
+    assert not legacy_file.exists()
+    assert (tmp_path / 'processed_files.txt.migrated').read_text(encoding='utf-8').startswith('file-a')
+
+
+def test_migration_runs_only_once(make_store, tmp_path):
+    legacy_file = tmp_path / 'processed_files.txt'
+    legacy_file.write_text("file-a\n", encoding='utf-8')
+    make_store(legacy_file=legacy_file).close()
+    
+    # 移行済みのファイル名では再度読み込まない
+    store = make_store(legacy_file=legacy_file)
+    assert store.filter_processed(['file-a']) == {'file-a'}
+    assert not legacy_file.exists()
+
+
+def _backdate(store: ProcessedStore, file_id: str, days: int):
+    """処理済みIDの記録日時を過去にずらす"""
+    processed_at = (datetime.now() - timedelta(days=days)).isoformat()
+    store._conn.execute("UPDATE processed_files SET processed_at = ? WHERE file_id = ?", (processed_at, file_id))
+    store._conn.commit()
+
+
+def test_compact_removes_only_expired_remote_deleted_ids(make_store):
+    store = make_store(retention_days=30)
+    store.add('old-deleted', remote_deleted=True)
+    store.add('old-kept', remote_deleted=False)
+    store.add('new-deleted', remote_deleted=True)
+    store.commit()
+    _backdate(store, 'old-deleted', 31)
+    _backdate(store, 'old-kept', 31)
+    
+    assert store.compact() == 1
+    
+    # Driveに残っている可能性があるIDは保持期間を過ぎても残す
+    assert store.filter_processed(['old-deleted', 'old-kept', 'new-deleted']) == {'old-kept', 'new-deleted'}
+
+
+def test_compact_removes_stale_journal_before_download_only(make_store):
+    store = make_store(retention_days=30)
+    store.record_state('stale-discovered', 'discovered', {'id': 'stale-discovered'})
+    store.record_state('stale-finalized', 'finalized', {'id': 'stale-finalized'}, final_path='/tmp/x.wav')
+    store.record_state('fresh-discovered', 'discovered', {'id': 'fresh-discovered'})
+    store.commit()
+    old = time.time() - 31 * 86400
+    store._conn.execute(
+        "UPDATE file_journal SET updated_at = ? WHERE file_id IN ('stale-discovered', 'stale-finalized')", (old,)
+    )
+    store._conn.commit()
+    
+    store.compact()
+    
+    assert set(store.get_journal()) == {'stale-finalized', 'fresh-discovered'}
+
+
+def test_compact_is_disabled_without_retention(make_store):
+    store = make_store(retention_days=0)
+    store.add('old-deleted', remote_deleted=True)
+    store.commit()
+    _backdate(store, 'old-deleted', 3650)
+    
+    assert store.compact() == 0
+    assert store.filter_processed(['old-deleted']) == {'old-deleted'}
+
+
+def test_processed_commit_clears_journal(make_store):
+    store = make_store()
+    store.record_state('file-a', 'finalized', {'id': 'file-a'}, final_path='/tmp/a.wav', md5='abc')
+    store.commit()
+    assert store.get_journal()['file-a'].final_path == '/tmp/a.wav'
+    
+    # 段階の更新は未指定の項目を残す
+    store.record_state('file-a', 'remote_deleted')
+    entry = store.get_journal()['file-a']
+    assert (entry.state, entry.final_path, entry.md5, entry.file_info) == (
+        'remote_deleted', '/tmp/a.wav', 'abc', {'id': 'file-a'})
+    
+    store.add('file-a', remote_deleted=True)
+    store.commit()
+    assert store.get_journal() == {}
+    assert store.filter_processed(['file-a']) == {'file-a'}
@@ -0,0 +1,138 @@
+"""変更通知の受信・デバウンス・チャンネル更新のテスト"""
+
+import http.client
+import threading
+import time
+
+import pytest
+
+from src import webhook_receiver
+from src.webhook_receiver import ChangeNotificationReceiver, WatchChannel
+
+TOKEN = 'channel-token'
+
+
+@pytest.fixture
+def receiver():
+    receiver = ChangeNotificationReceiver('127.0.0.1', 0, TOKEN, debounce_sec=0.2, max_delay_sec=1.0)
+    receiver.start()
+    yield receiver
+    receiver.stop()
+
+
+def _post(receiver: ChangeNotificationReceiver, token=None, state: str = 'change') -> int:
+    """通知1件を送信してHTTPステータスを返す"""
+    headers = {'X-Goog-Resource-State': state, 'X-Goog-Channel-ID': 'channel-1'}
+    if token is not None:
+        headers['X-Goog-Channel-Token'] = token
+    connection = http.client.HTTPConnection('127.0.0.1', receiver.port, timeout=5)
+    try:
+        connection.request('POST', '/', body=b'', headers=headers)
+        return connection.getresponse().status
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize('token', [None, '', 'wrong-token'])
+def test_bad_or_missing_token_is_rejected_without_waking(receiver, token):
+    assert _post(receiver, token) == 403
+    assert receiver.stats['rejected'] == 1
+    assert receiver.wait(0.3) is False
+    assert receiver.stats['triggers'] == 0
+
+
+def test_sync_state_does_not_trigger_poll(receiver):
+    assert _post(receiver, TOKEN, state='sync') == 200
+    assert receiver.wait(0.3) is False
+    assert receiver.stats['notifications'] == 0
+
+
+def test_burst_collapses_into_one_wakeup(receiver):
+    count = 10
+    for _ in range(count):
+        assert _post(receiver, TOKEN) == 200
+    
+    started_at = time.monotonic()
+    assert receiver.wait(5) is True
+    elapsed = time.monotonic() - started_at
+    
+    # 最後の通知からdebounce_sec後（最大でも最初の通知からmax_delay_sec後）に1回だけ起床
+    assert elapsed <= receiver.max_delay_sec + 0.5
+    assert receiver.stats['notifications'] == count
+    assert receiver.stats['triggers'] == 1
+    assert receiver.wait(0.3) is False
+
+
+def test_continuous_notifications_are_capped_by_max_delay(receiver):
+    stop = threading.Event()
+    
+    def flood():
+        while not stop.is_set():
+            _post(receiver, TOKEN)
+            time.sleep(0.05)
+    
+    sender = threading.Thread(target=flood, daemon=True)
+    sender.start()
+    try:
+        started_at = time.monotonic()
+        assert receiver.wait(5) is True
+        assert time.monotonic() - started_at <= receiver.max_delay_sec + 0.5
+    finally:
+        stop.set()
+        sender.join()
+    assert receiver.stats['triggers'] == 1
+
+
+def test_interrupt_releases_waiter(receiver):
+    threading.Timer(0.1, receiver.interrupt).start()
+    assert receiver.wait(5) is False
+
+
+class RecordingMonitor:
+    """watch_changes・stop_channelの呼び出しを記録するDriveMonitorの代わり"""
+    
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+        self.sequence = 0
+    
+    def watch_changes(self, address, channel_id, token, ttl_sec):
+        self.sequence += 1
+        self.calls.append(('watch', channel_id))
+        return {
+            'resourceId': f"resource-{self.sequence}",
+            'expiration': str(int((self.clock[0] + ttl_sec) * 1000)),
+        }
+    
+    def stop_channel(self, channel_id, resource_id):
+        self.calls.append(('stop', channel_id, resource_id))
+
+
+def test_watch_channel_renews_before_expiration(monkeypatch):
+    clock = [1_000_000.0]
+    monkeypatch.setattr(webhook_receiver.time, 'time', lambda: clock[0])
+    monitor = RecordingMonitor(clock)
+    channel = WatchChannel(monitor, 'https://example.com/notify', token=TOKEN, ttl_sec=3600, renew_margin_sec=600)
+    
+    channel.ensure_active()
+    first_channel = channel.channel_id
+    assert monitor.calls == [('watch', first_channel)]
+    
+    # 期限のrenew_margin_sec秒より前は更新しない
+    clock[0] += 3600 - 600 - 1
+    channel.ensure_active()
+    assert len(monitor.calls) == 1
+    
+    # 期限のrenew_margin_sec秒前を過ぎたら新しいチャンネルを登録してから古いチャンネルを停止
+    clock[0] += 1
+    channel.ensure_active()
+    assert monitor.calls[1] == ('watch', channel.channel_id)
+    assert monitor.calls[2] == ('stop', first_channel, 'resource-1')
+    assert channel.channel_id != first_channel
+    assert channel.resource_id == 'resource-2'
+    assert channel.expires_at == clock[0] + 3600
+    
+    second_channel = channel.channel_id
+    channel.stop()
+    assert monitor.calls[3] == ('stop', second_channel, 'resource-2')
+    assert channel.channel_id is None